@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Optional, Tuple
+
+from flaat.user_infos import UserInfos
+from pydantic import BaseModel, Field
+
+
+class TokenCacheStats(BaseModel):
+    """Model with the usage of the token validation cache of the current process."""
+
+    hits: int = Field(description="Lookups answered by a valid token entry.")
+    negative_hits: int = Field(description="Lookups answered by an invalid entry.")
+    misses: int = Field(description="Lookups which had to validate the token.")
+    size: int = Field(description="Number of cached tokens.")
+    max_size: int = Field(description="Maximum number of cached tokens.")
+
+
+class TokenCache:
+    """Thread safe LRU cache of the token validation results.
+
+    Tokens are keyed by their SHA-256 digest, so that the cache never holds the
+    tokens themselves. The infos of a valid token are kept until the token expires;
+    invalid tokens are kept for a short time, so that clients retrying with a
+    rejected token do not reach the identity provider on every request.
+    """
+
+    def __init__(self, *, max_size: int, negative_ttl: float) -> None:
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.entries: "OrderedDict[str, Tuple[float, Optional[UserInfos]]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Return the key of the given token."""
+        return sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Tuple[bool, Optional[UserInfos]]:
+        """Return whether the token is cached and its infos (None if invalid).
+
+        Expired entries are removed and counted as misses.
+        """
+        key = self.hash_token(token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[1]
+
+    def set(self, token: str, user_infos: Optional[UserInfos]) -> None:
+        """Store the validation result of a token.
+
+        Valid tokens whose expiration is unknown are not stored.
+        """
+        if user_infos is None:
+            ttl = self.negative_ttl
+        else:
+            ttl = user_infos.valid_for_secs
+            if ttl is None:
+                return
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        key = self.hash_token(token)
+        with self.lock:
+            self.entries[key] = (monotonic() + ttl, user_infos)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.negative_hits = self.misses = 0
+
+    def get_stats(self) -> TokenCacheStats:
+        """Return the counters and the size of the cache."""
+        with self.lock:
+            return TokenCacheStats(
+                hits=self.hits,
+                negative_hits=self.negative_hits,
+                misses=self.misses,
+                size=len(self.entries),
+                max_size=self.max_size,
+            )
@@ -1,20 +1,30 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasicCredentials, HTTPBearer
+from fastapi.security.utils import get_authorization_scheme_param
 from flaat.config import AccessLevel
+from flaat.exceptions import FlaatException, FlaatUnauthenticated
 from flaat.fastapi import Flaat
 from flaat.requirements import IsTrue
 from flaat.user_infos import UserInfos
 
+from app.auth.cache import TokenCache
+from app.auth.jwks import LocalJWTVerifier
 from app.config import get_settings
 
 strict_security = HTTPBearer()
 lazy_security = HTTPBearer(auto_error=False)
+admin_emails = frozenset(get_settings().ADMIN_EMAIL_LIST)
 
 
 def has_write_access(user_infos: UserInfos) -> bool:
-    """Target user has write access on CMDB."""
-    settings = get_settings()
-    return user_infos.user_info.get("email") in settings.ADMIN_EMAIL_LIST
+    """Target user has write access on CMDB.
+
+    The email is looked up in the user info, the introspection info and the token
+    claims, in this order.
+    """
+    return user_infos.get("email") in admin_emails
 
 
 flaat = Flaat()
@@ -22,19 +32,94 @@ flaat.set_access_levels([AccessLevel("write", IsTrue(has_write_access))])
 flaat.set_trusted_OP_list(get_settings().TRUSTED_IDP_LIST)
 flaat.set_request_timeout(30)
 
+token_cache = TokenCache(
+    max_size=get_settings().TOKEN_CACHE_SIZE,
+    negative_ttl=get_settings().TOKEN_CACHE_NEGATIVE_TTL,
+)
+
+jwt_verifier: Optional[LocalJWTVerifier] = None
+if get_settings().JWT_LOCAL_VERIFICATION:
+    jwt_verifier = LocalJWTVerifier(
+        trusted_issuers=get_settings().TRUSTED_IDP_LIST,
+        timeout=30,
+        refresh_interval=get_settings().JWKS_REFRESH_INTERVAL,
+        min_refresh_interval=get_settings().JWKS_MIN_REFRESH_INTERVAL,
+    )
+
+
+def get_user_infos(token: str) -> UserInfos:
+    """Return the infos of the token owner, validating the token at most once.
+
+    Validation results, valid or not, are cached: only tokens never seen, or whose
+    entry expired, are validated. With local verification, JWTs of the trusted
+    identity providers are verified in-process; other tokens, and JWTs signed by keys
+    not fetched yet, are validated by the identity provider. Raise 401 for invalid
+    tokens and for tokens which could not be validated, for example because the
+    issuer is not trusted or the identity provider failed; the latter are not
+    cached, since the failure may be temporary.
+    """
+    found, user_infos = token_cache.get(token)
+    if not found:
+        user_infos = None
+        try:
+            if jwt_verifier is not None:
+                user_infos = jwt_verifier.verify(token)
+            if user_infos is None:
+                user_infos = flaat.get_user_infos_from_access_token(token)
+        except FlaatUnauthenticated:
+            pass
+        except FlaatException as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Access token could not be validated",
+                headers={"WWW-Authenticate": "Bearer"},
+            ) from e
+        token_cache.set(token, user_infos)
+    if user_infos is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid access token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_infos
+
 
 def check_read_access(
     client_credentials: HTTPBasicCredentials = Depends(lazy_security),
 ) -> bool:
     """Return True if the request contains a valid token."""
     if client_credentials:
-        flaat.is_authenticated()
+        if not flaat.authentication_disabled:
+            get_user_infos(client_credentials.credentials)
         return True
     return False
 
 
 def check_write_access(
     client_credentials: HTTPBasicCredentials = Depends(strict_security),
-) -> bool:
+) -> None:
     """At first, validate user authentication, then, check user write access rights."""
-    flaat.access_level("write")
+    if flaat.authentication_disabled:
+        return
+    user_infos = get_user_infos(client_credentials.credentials)
+    if not flaat.authorization_disabled and not has_write_access(user_infos):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Write access required"
+        )
+
+
+def get_access_level(authorization: Optional[str]) -> str:
+    """Return the access level granted by the given Authorization header.
+
+    It is "anonymous" without a bearer token, "write" for users with write access
+    and "read" for the other users. Raise 401 for invalid tokens.
+    """
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return "anonymous"
+    if flaat.authentication_disabled:
+        return "write" if flaat.authorization_disabled else "read"
+    user_infos = get_user_infos(token)
+    if flaat.authorization_disabled or has_write_access(user_infos):
+        return "write"
+    return "read"
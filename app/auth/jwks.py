@@ -0,0 +1,205 @@
+import logging
+from threading import Lock, RLock, Thread
+from time import monotonic
+from typing import Dict, List, Optional
+
+import jwt
+import requests
+from flaat.access_tokens import AccessTokenInfo
+from flaat.exceptions import FlaatUnauthenticated
+from flaat.user_infos import UserInfos
+
+logger = logging.getLogger(__name__)
+
+# Asymmetric algorithms only: JWKS keys are public, so HMAC signatures made with
+# them would prove nothing.
+LOCAL_JWT_ALGORITHMS = [
+    "RS256",
+    "RS384",
+    "RS512",
+    "PS256",
+    "PS384",
+    "PS512",
+    "ES256",
+    "ES384",
+    "ES512",
+    "EdDSA",
+]
+
+
+class IssuerKeys:
+    """Signing keys of a trusted issuer, read from the JWKS of its OIDC discovery
+    document.
+
+    Keys are fetched on first use, then refreshed in a background thread when they
+    are older than the refresh interval or when a token is signed by an unknown key
+    (the issuer rotated its keys). Only the first fetch is made while serving a
+    request; when it fails, the following ones run in background too. Fetches run
+    one at a time and, after the first one, at most one every min_refresh_interval
+    seconds, whether they succeeded or not, so that tokens with forged key ids or
+    an unreachable issuer can't flood it.
+    """
+
+    def __init__(
+        self,
+        *,
+        issuer: str,
+        timeout: float,
+        refresh_interval: float,
+        min_refresh_interval: float,
+    ) -> None:
+        self.issuer = issuer
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.keys: Dict[str, jwt.PyJWK] = {}
+        self.fetched_at: Optional[float] = None
+        self.attempted_at: Optional[float] = None
+        self.refreshing = False
+        self.lock = Lock()
+        self.fetch_lock = RLock()
+
+    def fetch(self) -> None:
+        """Download the discovery document and the JWKS and replace the keys.
+
+        Keys used for encryption, without a key id or of unsupported types are
+        skipped.
+        """
+        url = f"{self.issuer}/.well-known/openid-configuration"
+        discovery = requests.get(url, timeout=self.timeout)
+        discovery.raise_for_status()
+        jwks = requests.get(discovery.json()["jwks_uri"], timeout=self.timeout)
+        jwks.raise_for_status()
+        keys: Dict[str, jwt.PyJWK] = {}
+        for data in jwks.json().get("keys", []):
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            try:
+                keys[data["kid"]] = jwt.PyJWK(data)
+            except jwt.PyJWTError:
+                continue
+        with self.lock:
+            self.keys = keys
+            self.fetched_at = monotonic()
+
+    def refresh(self) -> None:
+        """Fetch the keys, logging failures: current keys are kept on errors.
+
+        Concurrent refreshes run one after the other.
+        """
+        with self.fetch_lock:
+            try:
+                self.fetch()
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.warning("Failed to fetch the keys of %s: %s", self.issuer, e)
+            finally:
+                with self.lock:
+                    self.attempted_at = monotonic()
+                    self.refreshing = False
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh, unless one is running or the last one is too recent."""
+        with self.lock:
+            if self.refreshing or (
+                self.attempted_at is not None
+                and monotonic() - self.attempted_at < self.min_refresh_interval
+            ):
+                return
+            self.refreshing = True
+        Thread(target=self.refresh, daemon=True).start()
+
+    def fetch_first(self) -> None:
+        """Fetch the keys, unless already attempted.
+
+        Concurrent first calls wait for the same fetch.
+        """
+        with self.fetch_lock:
+            with self.lock:
+                if self.attempted_at is not None:
+                    return
+                self.refreshing = True
+            self.refresh()
+
+    def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """Return the key with the given id, if known.
+
+        The first call fetches the keys; later ones never wait for the issuer.
+        """
+        if self.attempted_at is None:
+            self.fetch_first()
+        with self.lock:
+            key = self.keys.get(kid)
+            expired = (
+                self.fetched_at is None
+                or monotonic() - self.fetched_at > self.refresh_interval
+            )
+        if key is None or expired:
+            self.refresh_in_background()
+        return key
+
+
+class LocalJWTVerifier:
+    """Verifier of the JWT access tokens issued by the trusted identity providers.
+
+    Signature, issuer and expiration are verified in-process against the cached
+    issuer keys, without calling the identity provider.
+    """
+
+    def __init__(
+        self,
+        *,
+        trusted_issuers: List[str],
+        timeout: float,
+        refresh_interval: float,
+        min_refresh_interval: float,
+    ) -> None:
+        self.issuers = {
+            i.rstrip("/"): IssuerKeys(
+                issuer=i.rstrip("/"),
+                timeout=timeout,
+                refresh_interval=refresh_interval,
+                min_refresh_interval=min_refresh_interval,
+            )
+            for i in trusted_issuers
+        }
+
+    def verify(self, token: str) -> Optional[UserInfos]:
+        """Return the infos, built from the token claims, of a verified token.
+
+        Return None when the token can't be verified locally: it is not a JWT, it
+        has no key id, its issuer is not trusted or its key is unknown. Raise
+        FlaatUnauthenticated when the token is invalid.
+        """
+        try:
+            unverified = jwt.api_jwt.decode_complete(
+                token, options={"verify_signature": False}
+            )
+        except jwt.PyJWTError:
+            return None
+        issuer = unverified["payload"].get("iss")
+        kid = unverified["header"].get("kid")
+        if not isinstance(issuer, str) or not isinstance(kid, str):
+            return None
+        keys = self.issuers.get(issuer.rstrip("/"))
+        if keys is None:
+            return None
+        key = keys.get_key(kid)
+        if key is None or key.algorithm_name not in LOCAL_JWT_ALGORITHMS:
+            return None
+        try:
+            decoded = jwt.api_jwt.decode_complete(
+                token,
+                key.key,
+                algorithms=[key.algorithm_name],
+                issuer=issuer,
+                options={"verify_aud": False, "require": ["exp", "iss", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise FlaatUnauthenticated(f"Could not verify JWT: {e}") from e
+        return UserInfos(
+            access_token_info=AccessTokenInfo(
+                decoded, verification={"algorithm": key.algorithm_name}
+            ),
+            user_info=dict(decoded["payload"]),
+            introspection_info=None,
+        )
@@ -0,0 +1,190 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from neomodel import StructuredNode, db
+from neomodel.match import _rel_helper, _rel_merge_helper
+
+NodeRef = Tuple[Type[StructuredNode], str]
+
+RelKey = Tuple[Type[StructuredNode], str, Type[StructuredNode]]
+
+
+class BulkWriter:
+    """Collect changes on nodes and relationships and write them with UNWIND
+    statements.
+
+    Nodes are grouped by model and relationships by source model, relationship name
+    and target model. Each group is written with a single statement whatever the
+    number of its items, and all the statements run in the same transaction.
+
+    Nodes are identified by their uid; relationships can point to queued nodes or to
+    nodes already in the database.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[Type[StructuredNode], List[Dict[str, Any]]] = defaultdict(list)
+        self.updates: Dict[
+            Type[StructuredNode], Dict[str, Dict[str, Any]]
+        ] = defaultdict(dict)
+        self.deletions: Dict[Type[StructuredNode], Set[str]] = defaultdict(set)
+        self.relationships: Dict[RelKey, List[Dict[str, Any]]] = defaultdict(list)
+        self.disconnections: Dict[RelKey, List[Dict[str, Any]]] = defaultdict(list)
+
+    def add_node(self, *, model: Type[StructuredNode], data: Dict[str, Any]) -> str:
+        """Queue the creation of a node and return its uid.
+
+        Properties are deflated, and default values generated, as done by
+        StructuredNode.create.
+        """
+        properties = model.deflate(data, skip_empty=True)
+        self.nodes[model].append(properties)
+        return properties["uid"]
+
+    def update_node(
+        self, *, model: Type[StructuredNode], uid: str, data: Dict[str, Any]
+    ) -> None:
+        """Queue the update of some properties of an existing node.
+
+        Properties are deflated as done by StructuredNode.save; None values remove the
+        property. Updates of the same node are merged.
+        """
+        properties = model.defined_properties(aliases=False, rels=False)
+        self.updates[model].setdefault(uid, {}).update(
+            {
+                k: properties[k].deflate(v) if v is not None else None
+                for k, v in data.items()
+            }
+        )
+
+    def delete_node(self, *, model: Type[StructuredNode], uid: str) -> None:
+        """Queue the deletion of an existing node and of all its relationships."""
+        self.deletions[model].add(uid)
+
+    def connect(
+        self,
+        *,
+        source: NodeRef,
+        name: str,
+        target: NodeRef,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Queue the creation of the relationship 'name' of the source model between
+        the given nodes.
+
+        As done by RelationshipManager.connect, the relationship is merged and its
+        properties, if any, are deflated through the relationship model.
+        """
+        source_model, source_uid = source
+        target_model, target_uid = target
+        rel_model = getattr(source_model, name).definition["model"]
+        if rel_model is not None:
+            tmp = rel_model(**properties) if properties else rel_model()
+            properties = rel_model.deflate(tmp.__properties__)
+        self.relationships[(source_model, name, target_model)].append(
+            {"source": source_uid, "target": target_uid, "properties": properties}
+        )
+
+    def disconnect(self, *, source: NodeRef, name: str, target: NodeRef) -> None:
+        """Queue the deletion of the relationship 'name' of the source model between
+        the given nodes.
+        """
+        source_model, source_uid = source
+        target_model, target_uid = target
+        self.disconnections[(source_model, name, target_model)].append(
+            {"source": source_uid, "target": target_uid}
+        )
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        """Return, for each kind of change, the number of queued items per node label
+        or relationship type.
+
+        Kinds without items are omitted.
+        """
+        connected: Dict[str, int] = defaultdict(int)
+        for (source_model, name, _), rows in self.relationships.items():
+            rel_type = getattr(source_model, name).definition["relation_type"]
+            connected[rel_type] += len(rows)
+        disconnected: Dict[str, int] = defaultdict(int)
+        for (source_model, name, _), rows in self.disconnections.items():
+            rel_type = getattr(source_model, name).definition["relation_type"]
+            disconnected[rel_type] += len(rows)
+        summary = {
+            "created": {k.__label__: len(v) for k, v in self.nodes.items()},
+            "updated": {k.__label__: len(v) for k, v in self.updates.items()},
+            "deleted": {k.__label__: len(v) for k, v in self.deletions.items()},
+            "connected": dict(connected),
+            "disconnected": dict(disconnected),
+        }
+        return {k: v for k, v in summary.items() if v}
+
+    def get_statements(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return the queries, and their parameters, writing the queued items.
+
+        Nodes are created and updated before the relationships using them; stale
+        relationships are deleted before the new ones are merged, so that a
+        relationship can be replaced; nodes are deleted last.
+        """
+        statements = []
+        for model, rows in self.nodes.items():
+            labels = ":".join(model.inherited_labels())
+            statements.append(
+                (f"UNWIND $rows AS row CREATE (n:{labels}) SET n = row", {"rows": rows})
+            )
+        for model, updates in self.updates.items():
+            rows = [{"uid": k, "properties": v} for k, v in updates.items()]
+            statements.append(
+                (
+                    f"UNWIND $rows AS row MATCH (n:{model.__label__} {{uid: row.uid}}) "
+                    "SET n += row.properties",
+                    {"rows": rows},
+                )
+            )
+        for (source_model, name, target_model), rows in self.disconnections.items():
+            definition = getattr(source_model, name).definition
+            pattern = _rel_helper(lhs="a", rhs="b", ident="r", **definition)
+            statements.append(
+                (
+                    "UNWIND $rows AS row "
+                    f"MATCH (a:{source_model.__label__} {{uid: row.source}}) "
+                    f"MATCH (b:{target_model.__label__} {{uid: row.target}}) "
+                    f"MATCH {pattern} DELETE r",
+                    {"rows": rows},
+                )
+            )
+        for (source_model, name, target_model), rows in self.relationships.items():
+            definition = getattr(source_model, name).definition
+            rel_props = None
+            if definition["model"] is not None:
+                rel_props = {k: f"row.properties.{k}" for k in rows[0]["properties"]}
+            pattern = _rel_merge_helper(
+                lhs="a", rhs="b", ident="r", relation_properties=rel_props, **definition
+            )
+            statements.append(
+                (
+                    "UNWIND $rows AS row "
+                    f"MATCH (a:{source_model.__label__} {{uid: row.source}}) "
+                    f"MATCH (b:{target_model.__label__} {{uid: row.target}}) "
+                    f"MERGE {pattern}",
+                    {"rows": rows},
+                )
+            )
+        for model, uids in self.deletions.items():
+            statements.append(
+                (
+                    "UNWIND $uids AS uid "
+                    f"MATCH (n:{model.__label__} {{uid: uid}}) DETACH DELETE n",
+                    {"uids": sorted(uids)},
+                )
+            )
+        return statements
+
+    def write(self) -> None:
+        """Execute all the statements in a single transaction.
+
+        When a transaction is already active, the statements become part of it.
+        """
+        active = db._active_transaction is not None
+        with nullcontext() if active else db.write_transaction:
+            for query, params in self.get_statements():
+                db.cypher_query(query, params)
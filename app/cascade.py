@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional, Type
+
+from neomodel import StructuredNode, db
+from pydantic import BaseModel
+
+from app.transaction import record_write
+
+
+class CascadeStep(BaseModel):
+    """Set of nodes owned by the ones of a previous set.
+
+    The pattern goes from a node of the 'source' set, referred as (s), to an owned
+    node, referred as (x). The optional condition, on (x), excludes the nodes shared
+    with items outside the deleted subgraph; it can refer to the previous sets by
+    name.
+    """
+
+    name: str
+    source: str
+    pattern: str
+    condition: Optional[str] = None
+
+
+def build_cascade_query(
+    *, model: Type[StructuredNode], root: str, steps: List[CascadeStep]
+) -> str:
+    """Return the query deleting a node and the subgraph it exclusively owns.
+
+    The root node is the only item of the 'root' set. Each step collects its set with
+    a COLLECT subquery, so that later steps and conditions can use it. All the
+    collected nodes are removed with a single DETACH DELETE: relationships towards
+    shared nodes are deleted with them, leaving the shared nodes in place.
+    """
+    query = f"MATCH (n:{model.__label__} {{uid: $uid}}) WITH n, [n] AS {root} "
+    for step in steps:
+        where = f" WHERE {step.condition}" if step.condition else ""
+        query += (
+            f"WITH *, COLLECT {{ UNWIND {step.source} AS s "
+            f"MATCH {step.pattern}{where} RETURN DISTINCT x }} AS {step.name} "
+        )
+    nodes = " + ".join([root, *[i.name for i in steps]])
+    query += (
+        f"UNWIND {nodes} AS x WITH DISTINCT x WITH x, labels(x) AS x_labels "
+        "DETACH DELETE x RETURN x_labels, count(*)"
+    )
+    return query
+
+
+def cascade_delete(
+    *, model: Type[StructuredNode], uid: str, root: str, steps: List[CascadeStep]
+) -> Dict[str, int]:
+    """Delete a node and the subgraph it exclusively owns with a single statement.
+
+    Return the number of deleted nodes per label. Nodes are counted under the label
+    of the neomodel class they inflate to (for example ComputeService, not Service).
+    """
+    query = build_cascade_query(model=model, root=root, steps=steps)
+    results, _ = db.cypher_query(query, {"uid": uid})
+    counts: Dict[str, int] = {}
+    for labels, total in results:
+        label = db._NODE_CLASS_REGISTRY[frozenset(labels)].__label__
+        counts[label] = counts.get(label, 0) + total
+    record_write({i for labels, _ in results for i in labels})
+    return counts
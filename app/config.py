@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional
 
 from neomodel import config
 from pydantic import AnyHttpUrl, AnyUrl, BaseSettings, EmailStr, validator
+from pydantic.fields import ModelField
 
 
 class Neo4jUriScheme(Enum):
@@ -13,6 +14,15 @@ class Neo4jUriScheme(Enum):
     BOLTS: str = "bolt+s"
 
 
+# Settings forwarded to the neomodel options used to create the driver.
+NEOMODEL_POOL_OPTIONS = {
+    "NEO4J_MAX_CONNECTION_POOL_SIZE": "MAX_CONNECTION_POOL_SIZE",
+    "NEO4J_CONNECTION_ACQUISITION_TIMEOUT": "CONNECTION_ACQUISITION_TIMEOUT",
+    "NEO4J_MAX_CONNECTION_LIFETIME": "MAX_CONNECTION_LIFETIME",
+    "NEO4J_KEEP_ALIVE": "KEEP_ALIVE",
+}
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "CMDB"
     API_V1_STR: str = "/api/v1"
@@ -23,6 +33,14 @@ class Settings(BaseSettings):
     NEO4J_PASSWORD: str = "password"
     NEO4J_URI_SCHEME: Neo4jUriScheme = Neo4jUriScheme.BOLT.value
     NEOMODEL_DATABASE_URL: Optional[AnyUrl] = None
+    # Maximum number of database reads of the async endpoints running at once.
+    NEO4J_MAX_CONCURRENT_READS: int = 40
+    # Driver connection pool, shared by all the threads of a process (see
+    # app.pool.share_drivers): these limits apply to each worker process.
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 100
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = 60.0
+    NEO4J_MAX_CONNECTION_LIFETIME: int = 3600
+    NEO4J_KEEP_ALIVE: bool = True
 
     @validator("NEO4J_URI_SCHEME")
     def get_enum_val(cls, v: Neo4jUriScheme) -> str:
@@ -43,8 +61,33 @@ class Settings(BaseSettings):
         config.DATABASE_URL = v
         return v
 
+    @validator(*NEOMODEL_POOL_OPTIONS.keys())
+    def save_pool_option(cls, v: Any, field: ModelField) -> Any:
+        setattr(config, NEOMODEL_POOL_OPTIONS[field.name], v)
+        return v
+
     ADMIN_EMAIL_LIST: List[EmailStr] = []
     TRUSTED_IDP_LIST: List[AnyHttpUrl] = []
+    # Token validation cache. Valid tokens are kept until they expire, invalid ones
+    # for TOKEN_CACHE_NEGATIVE_TTL seconds.
+    TOKEN_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_NEGATIVE_TTL: int = 30
+    # Verify JWT access tokens of trusted identity providers against their cached
+    # JWKS, instead of calling the identity providers. Keys are refreshed every
+    # JWKS_REFRESH_INTERVAL seconds and, at most every JWKS_MIN_REFRESH_INTERVAL
+    # seconds, when a token is signed by an unknown key.
+    JWT_LOCAL_VERIFICATION: bool = False
+    JWKS_REFRESH_INTERVAL: int = 3600
+    JWKS_MIN_REFRESH_INTERVAL: int = 60
+    # Responses of the read endpoints kept by each process for RESPONSE_CACHE_TTL
+    # seconds. Writes invalidate them. A size or TTL of 0 disables the cache.
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL: int = 60
+    # Seconds before reading again the registry version, used to build the ETags.
+    # With 0 the version is read by each GET request, in its transaction. Otherwise
+    # writes of the other processes are seen, by ETags and cached responses, after
+    # at most this delay.
+    REGISTRY_VERSION_TTL: int = 0
 
     @validator("TRUSTED_IDP_LIST")
     def validate_list(cls, v: List[AnyHttpUrl], values: Dict[str, Any]) -> AnyHttpUrl:
@@ -1,7 +1,38 @@
-from typing import Generic, List, Optional, Type, TypeVar, Union
+from contextvars import ContextVar
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from neomodel import StructuredNode
-from pydantic import BaseModel
+from fastapi import HTTPException, status
+from neo4j import READ_ACCESS
+from neomodel import NodeSet, Q, StructuredNode, config, db
+from neomodel.exceptions import InflateError
+from neomodel.match import QueryBuilder
+from pydantic import BaseModel, ValidationError
+
+from app.projection import prefetch_relations, read_extended
+from app.query import (
+    CypherFilter,
+    CypherSort,
+    DbQueryCommonParams,
+    Pagination,
+    decode_cursor,
+    encode_cursor,
+)
+from app.transaction import record_write
+
+STREAM_BATCH_SIZE = 100
 
 ModelType = TypeVar("ModelType", bound=StructuredNode)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -12,6 +43,53 @@ ReadShortSchemaType = TypeVar("ReadShortSchemaType", bound=BaseModel)
 ReadExtendedSchemaType = TypeVar("ReadExtendedSchemaType", BaseModel, None)
 ReadExtendedPublicSchemaType = TypeVar("ReadExtendedPublicSchemaType", BaseModel, None)
 
+WRITE_METHODS = ("create", "update", "remove")
+
+
+# True while a CRUD write method runs: writes it makes through other CRUD objects
+# are part of it.
+nested_write: ContextVar[bool] = ContextVar("nested_write", default=False)
+
+# Called before the outermost CRUD writes with the written item (None when
+# creating); each returns the function to call with the result of the write, if it
+# changed something.
+WriteHook = Callable[[Optional[StructuredNode]], Callable[[Any], None]]
+
+write_hooks: List[WriteHook] = []
+
+
+def register_write_hook(hook: WriteHook) -> WriteHook:
+    """Register a function called around the outermost CRUD writes."""
+    write_hooks.append(hook)
+    return hook
+
+
+def records_write(method: Callable) -> Callable:
+    """Return a CRUD method marking the model labels as written when it changed
+    something (it returned a truthy value), to invalidate the cached responses.
+
+    The outermost write also runs the registered write hooks.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        callbacks = []
+        if not nested_write.get():
+            callbacks = [hook(kwargs.get("db_obj")) for hook in write_hooks]
+        token = nested_write.set(True)
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            nested_write.reset(token)
+        if result:
+            record_write(self.model.inherited_labels())
+            for callback in callbacks:
+                callback(result)
+        return result
+
+    wrapper.records_write = True
+    return wrapper
+
 
 class CRUDBase(
     Generic[
@@ -25,6 +103,14 @@ class CRUDBase(
         ReadExtendedPublicSchemaType,
     ]
 ):
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Wrap the write methods overridden by subclasses with records_write."""
+        super().__init_subclass__(**kwargs)
+        for name in WRITE_METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "records_write", False):
+                setattr(cls, name, records_write(method))
+
     def __init__(
         self,
         *,
@@ -68,21 +154,124 @@ class CRUDBase(
         skip: int = 0,
         limit: Optional[int] = None,
         sort: Optional[str] = None,
+        page: int = 0,
+        size: Optional[int] = None,
+        cursor: Optional[str] = None,
         **kwargs,
     ) -> List[ModelType]:
-        if kwargs:
-            items = self.model.nodes.filter(**kwargs).order_by(sort).all()
-        else:
-            items = self.model.nodes.order_by(sort).all()
+        """Retrieve the items matching the given filters.
+
+        Skip, limit, page and size are merged into a single window which is sent to
+        the database, together with the sort rule, as SKIP, LIMIT and ORDER BY
+        clauses. Only the rows belonging to that window are loaded.
+
+        When a cursor is given, use keyset pagination: skip and page are ignored and
+        only the items following the one the cursor points to are loaded.
+
+        Cypher filters add raw conditions, such as relationship patterns, to the
+        WHERE clause. A Cypher sort, such as a distance, takes precedence over the
+        sort rule, which breaks ties; it is ignored with cursors.
+        """
+        query_builder = self.__get_query_builder(
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            page=page,
+            size=size,
+            cursor=cursor,
+            **kwargs,
+        )
+        if query_builder is None:
+            return []
+        results, _ = db.cypher_query(
+            query_builder.build_query(),
+            query_builder._query_params,
+            resolve_objects=True,
+        )
+        return [row[0] for row in results]
+
+    def stream_multi(
+        self, *, batch_size: int = STREAM_BATCH_SIZE, **kwargs
+    ) -> Iterator[List[ModelType]]:
+        """Retrieve, in batches, the items matching the given filters.
+
+        Accept the same arguments of get_multi. Records are pulled from the Neo4j
+        result cursor batch_size at a time, so only one batch is kept in memory.
+
+        The query is built, and the cursor and sort rule validated, by this call:
+        streamed responses consume the returned iterator after sending the status
+        code, when errors can no longer be reported.
+        """
+        query_builder = self.__get_query_builder(**kwargs)
+        if query_builder is None:
+            return iter([])
+        return self.__stream_batches(
+            query=query_builder.build_query(),
+            params=query_builder._query_params,
+            batch_size=batch_size,
+        )
+
+    def __stream_batches(
+        self, *, query: str, params: Dict[str, Any], batch_size: int
+    ) -> Iterator[List[ModelType]]:
+        """Run the query in a read session of its own and yield the inflated items
+        in batches.
+        """
+        if not db.url:
+            db.set_connection(config.DATABASE_URL)
+        with db.driver.session(
+            database=db._database_name,
+            default_access_mode=READ_ACCESS,
+            fetch_size=batch_size,
+        ) as session:
+            batch = []
+            for record in session.run(query, params):
+                batch.append(self.model.inflate(record[0]))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
 
-        return self.__apply_limit_and_skip(items=items, skip=skip, limit=limit)
+    def count(
+        self, *, cypher_filters: Optional[List[CypherFilter]] = None, **kwargs
+    ) -> int:
+        """Count the items matching the given filters.
 
+        The count is computed by the database (RETURN count(n)) without reading the
+        items.
+        """
+        query_builder = QueryBuilder(self.model.nodes.filter(**kwargs)).build_ast()
+        self.__add_cypher_filters(
+            query_builder=query_builder, cypher_filters=cypher_filters
+        )
+        return query_builder._count()
+
+    def get_next_cursor(
+        self, *, items: List[ModelType], comm: DbQueryCommonParams, page: Pagination
+    ) -> Optional[str]:
+        """Return the cursor pointing to the last of the given items.
+
+        Return None when not using keyset pagination or when the received items do
+        not fill the requested page, meaning there are no more items to read.
+        """
+        if page.cursor is None or not self.__is_page_full(
+            count=len(items), limit=comm.limit, size=page.size
+        ):
+            return None
+        sort = self.__get_cursor_sort(cursor=page.cursor, sort=comm.sort)
+        return encode_cursor(
+            sort=sort, values=self.__get_sort_key(item=items[-1], sort=sort)
+        )
+
+    @records_write
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in = self.create_schema.parse_obj(obj_in)
         obj_in_data = obj_in.dict(exclude_none=True)
         db_obj = self.model.create(obj_in_data)[0]
         return db_obj
 
+    @records_write
     def update(
         self,
         *,
@@ -101,18 +290,10 @@ class CRUDBase(
                 setattr(db_obj, field, update_data[field])
         return db_obj.save()
 
+    @records_write
     def remove(self, *, db_obj: ModelType) -> bool:
         return db_obj.delete()
 
-    def paginate(
-        self, *, items: List[ModelType], page: int, size: Optional[int]
-    ) -> List[ModelType]:
-        if size is None:
-            return items
-        start = page * size
-        end = start + size
-        return items[start:end]
-
     def choose_out_schema(
         self, *, items: List[ModelType], auth: bool, short: bool, with_conn: bool
     ) -> Union[
@@ -124,19 +305,356 @@ class CRUDBase(
     ]:
         if auth:
             if with_conn:
-                return [self.read_extended_schema.from_orm(i) for i in items]
+                return read_extended(
+                    items=items, model=self.model, schema=self.read_extended_schema
+                )
             if short:
-                return [self.read_short_schema.from_orm(i) for i in items]
-            return [self.read_schema.from_orm(i) for i in items]
+                return self.__read(items=items, schema=self.read_short_schema)
+            return self.__read(items=items, schema=self.read_schema)
         if with_conn:
-            return [self.read_extended_public_schema.from_orm(i) for i in items]
-        return [self.read_public_schema.from_orm(i) for i in items]
+            return read_extended(
+                items=items, model=self.model, schema=self.read_extended_public_schema
+            )
+        return self.__read(items=items, schema=self.read_public_schema)
 
-    def __apply_limit_and_skip(
-        self, *, items: List[ModelType], skip: int = 0, limit: Optional[int] = None
-    ) -> List[ModelType]:
-        if limit is None:
-            return items[skip:]
+    def get_multi_fields(
+        self, *, auth: bool, fields: str, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Retrieve only the requested attributes of the items matching the filters.
+
+        Accept the same arguments of get_multi. The database returns only the
+        requested properties (RETURN n{.uid, .name}) and only the matching fields of
+        the read schema validate them.
+        """
+        items, _ = self.get_multi_fields_with_cursor(auth=auth, fields=fields, **kwargs)
+        return items
+
+    def get_multi_fields_with_cursor(
+        self, *, auth: bool, fields: str, **kwargs
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Retrieve only the requested attributes of the items matching the filters
+        and the cursor pointing to the last of them, as get_next_cursor does.
+
+        With a cursor, the database returns the sort property too, to encode the next
+        cursor, which is dropped from the items when not requested.
+        """
+        names = self.__get_field_names(auth=auth, fields=fields)
+        query_builder = self.__get_query_builder(**kwargs)
+        if query_builder is None:
+            return [], None
+        cursor = kwargs.get("cursor")
+        sort = None
+        if cursor is not None:
+            sort = self.__get_cursor_sort(cursor=cursor, sort=kwargs.get("sort"))
+        prop, _ = self.__split_sort_rule(sort)
+        keys = names if prop is None or prop in names else [*names, prop]
+        ident = query_builder._ast["return"]
+        projection = ", ".join(f".{i}" for i in keys)
+        query_builder._ast["return"] = f"{ident}{{{projection}}}"
+        results, _ = db.cypher_query(
+            query_builder.build_query(), query_builder._query_params
+        )
+        rows = [row[0] for row in results]
+        items = [
+            self.__validate_fields(
+                auth=auth,
+                data={
+                    k: row[k]
+                    if row[k] is None
+                    else getattr(self.model, k).inflate(row[k])
+                    for k in names
+                },
+            )
+            for row in rows
+        ]
+        if cursor is None or not self.__is_page_full(
+            count=len(rows), limit=kwargs.get("limit"), size=kwargs.get("size")
+        ):
+            return items, None
+        values = [rows[-1]["uid"]]
+        if prop is not None and prop != "uid":
+            values.insert(0, rows[-1][prop])
+        return items, encode_cursor(sort=sort, values=values)
+
+    def choose_out_fields(
+        self, *, items: List[ModelType], auth: bool, fields: str
+    ) -> List[Dict[str, Any]]:
+        """Return only the requested attributes of the given items."""
+        names = self.__get_field_names(auth=auth, fields=fields)
+        return [
+            self.__validate_fields(auth=auth, data={k: getattr(i, k) for k in names})
+            for i in items
+        ]
+
+    def stream_out_schema(
+        self,
+        *,
+        auth: bool,
+        short: bool,
+        with_conn: bool,
+        batch_size: int = STREAM_BATCH_SIZE,
+        schema_options: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """Serialize, as newline delimited JSON, the items matching the given filters.
+
+        Items are read with stream_multi and each batch goes through
+        choose_out_schema, with the given schema options, so streamed items match
+        the ones returned by the standard reads. Consumed by streamed responses,
+        after the request transaction: the relationships of each batch are read by
+        queries of their own, which may see writes committed while streaming.
+        """
+        batches = self.stream_multi(batch_size=batch_size, **kwargs)
+        return self.__serialize_batches(
+            batches=batches,
+            auth=auth,
+            short=short,
+            with_conn=with_conn,
+            **(schema_options or {}),
+        )
+
+    def __serialize_batches(
+        self, *, batches: Iterator[List[ModelType]], **kwargs
+    ) -> Iterator[str]:
+        """Serialize each batch with choose_out_schema, one JSON object per line."""
+        for items in batches:
+            for item in self.choose_out_schema(items=items, **kwargs):
+                yield f"{item.json()}\n"
+
+    def __read(self, *, items: List[ModelType], schema: Type[BaseModel]) -> List[Any]:
+        """Serialize items after prefetching, for the whole page, the relationships
+        shown by the schema.
+        """
+        prefetch_relations(items=items, model=self.model, schema=schema)
+        return [schema.from_orm(i) for i in items]
+
+    def __get_field_names(self, *, auth: bool, fields: str) -> List[str]:
+        """Return the requested attributes which are both schema fields and model
+        properties. The uid is always returned.
+        """
+        schema = self.read_schema if auth else self.read_public_schema
+        properties = dict(self.model.__all_properties__)
+        names = ["uid"]
+        for name in fields.split(","):
+            name = name.strip()
+            if name in schema.__fields__ and name in properties and name not in names:
+                names.append(name)
+        return names
+
+    def __validate_fields(self, *, auth: bool, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate the given values with the matching read schema fields."""
+        schema = self.read_schema if auth else self.read_public_schema
+        item = {}
+        errors = []
+        for k, v in data.items():
+            item[k], error = schema.__fields__[k].validate(v, item, loc=k, cls=schema)
+            if error:
+                errors.append(error)
+        if errors:
+            raise ValidationError(errors, schema)
+        return item
+
+    def __get_query_builder(
+        self,
+        *,
+        cypher_filters: Optional[List[CypherFilter]] = None,
+        cypher_sort: Optional[CypherSort] = None,
+        **kwargs,
+    ) -> Optional[QueryBuilder]:
+        """Return the query builder, with the Cypher filters and sort, selecting the
+        requested items.
+
+        Return None when the requested window is empty.
+        """
+        items = self.__get_node_set(**kwargs)
+        if items is None:
+            return None
+        query_builder = QueryBuilder(items).build_ast()
+        self.__add_cypher_filters(
+            query_builder=query_builder, cypher_filters=cypher_filters
+        )
+        if cypher_sort is not None and kwargs.get("cursor") is None:
+            self.__add_cypher_sort(query_builder=query_builder, cypher_sort=cypher_sort)
+        return query_builder
+
+    def __add_cypher_filters(
+        self,
+        *,
+        query_builder: QueryBuilder,
+        cypher_filters: Optional[List[CypherFilter]],
+    ) -> None:
+        """Add the Cypher filters' conditions to the WHERE clause."""
+        ident = query_builder._ast["return"]
+        for cypher_filter in cypher_filters or []:
+            query_builder._ast.setdefault("where", []).append(
+                f"({cypher_filter.condition.replace('{node}', ident)})"
+            )
+            query_builder._query_params.update(cypher_filter.params)
+
+    def __add_cypher_sort(
+        self, *, query_builder: QueryBuilder, cypher_sort: CypherSort
+    ) -> None:
+        """Sort on the Cypher expression first, then on the sort rule, if any."""
+        ident = query_builder._ast["return"]
+        order_by = query_builder._ast.get("order_by")
+        query_builder._ast["order_by"] = [
+            cypher_sort.expression.replace("{node}", ident),
+            *(order_by if isinstance(order_by, list) else []),
+        ]
+        query_builder._query_params.update(cypher_sort.params)
+
+    def __get_node_set(
+        self,
+        *,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort: Optional[str] = None,
+        page: int = 0,
+        size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[NodeSet]:
+        """Return the node set selecting the requested items.
+
+        Return None when the requested window is empty.
+        """
+        if cursor is not None:
+            return self.__get_node_set_after_cursor(
+                cursor=cursor, sort=sort, limit=limit, size=size, **kwargs
+            )
+        start, stop = self.__get_window(skip=skip, limit=limit, page=page, size=size)
+        if stop is not None and stop <= start:
+            return None
+        self.__check_sort_rule(sort)
+        items = self.model.nodes.filter(**kwargs).order_by(sort)
+        return items[start:stop]
+
+    def __get_node_set_after_cursor(
+        self,
+        *,
+        cursor: str,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        size: Optional[int] = None,
+        **kwargs,
+    ) -> Optional[NodeSet]:
+        """Select the items following the one the cursor points to.
+
+        Items are sorted on the cursor's sort rule and on the uid, which breaks ties.
+        The WHERE clause compares the sort key with the one stored in the cursor, so
+        reading a deep page costs as reading the first one and items created or
+        deleted while crawling do not shift the following pages.
+
+        Cursors are opaque only by convention: reject, with a `bad request` error,
+        the ones sorting on unknown properties or holding values of the wrong type.
+        """
+        sort = self.__get_cursor_sort(cursor=cursor, sort=sort)
+        _, values = decode_cursor(cursor)
+        size = self.__get_page_size(limit=limit, size=size)
+        if size == 0:
+            return None
+
+        self.__check_sort_rule(sort)
+        prop, desc = self.__split_sort_rule(sort)
+        uid_sort = "-uid" if desc else "uid"
+        items = self.model.nodes.filter(**kwargs)
+        if values:
+            items = items.filter(self.__get_keyset_filter(sort=sort, values=values))
+        if prop is None or prop == "uid":
+            items = items.order_by(uid_sort)
+        else:
+            items = items.order_by(sort, uid_sort)
+        return items[:size]
+
+    def __get_keyset_filter(self, *, sort: Optional[str], values: List[Any]) -> Q:
+        """Return the filter selecting the items following the given sort key.
+
+        Neo4j puts null values last when sorting in ascending order and first when
+        sorting in descending order.
+        """
+        prop, desc = self.__split_sort_rule(sort)
+        op = "lt" if desc else "gt"
+        uid = values[-1]
+        if prop is None or prop == "uid":
+            return Q(**{f"uid__{op}": uid})
+
+        value = values[0]
+        if value is None:
+            after = Q(**{f"{prop}__isnull": True, f"uid__{op}": uid})
+            return Q(**{f"{prop}__isnull": False}) | after if desc else after
+
+        try:
+            value = getattr(self.model, prop).inflate(value)
+        except InflateError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor value '{value}' for '{prop}'",
+            ) from e
+        after = Q(**{f"{prop}__{op}": value}) | Q(**{prop: value, f"uid__{op}": uid})
+        return after if desc else after | Q(**{f"{prop}__isnull": True})
+
+    def __get_sort_key(self, *, item: ModelType, sort: Optional[str]) -> List[Any]:
+        """Return the deflated values of the sort property and the uid of an item."""
+        prop, _ = self.__split_sort_rule(sort)
+        if prop is None or prop == "uid":
+            return [item.uid]
+        value = getattr(item, prop)
+        if value is not None:
+            value = getattr(self.model, prop).deflate(value)
+        return [value, item.uid]
+
+    def __get_cursor_sort(self, *, cursor: str, sort: Optional[str]) -> Optional[str]:
+        """Return the sort rule stored in the cursor, otherwise the given one."""
+        cursor_sort, values = decode_cursor(cursor)
+        return cursor_sort if values else sort
+
+    def __get_page_size(
+        self, *, limit: Optional[int], size: Optional[int]
+    ) -> Optional[int]:
+        """Return the maximum number of items to return in a keyset paginated read."""
+        sizes = [i for i in (limit, size) if i is not None]
+        return min(sizes) if sizes else None
+
+    def __check_sort_rule(self, sort: Optional[str]) -> None:
+        """Reject, with a `bad request` error, sort rules on unknown properties."""
+        prop, _ = self.__split_sort_rule(sort)
+        if prop is not None and prop not in self.model.defined_properties(
+            aliases=False, rels=False
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid sort rule '{sort}'",
+            )
+
+    def __is_page_full(
+        self, *, count: int, limit: Optional[int], size: Optional[int]
+    ) -> bool:
+        """Return True when the read items fill the requested keyset page, meaning
+        there may be more items to read.
+        """
+        size = self.__get_page_size(limit=limit, size=size)
+        return count > 0 and size is not None and count >= size
+
+    def __split_sort_rule(self, sort: Optional[str]) -> Tuple[Optional[str], bool]:
+        """Split a sort rule into the property name and the descending flag."""
+        if sort is None:
+            return None, False
+        sort = sort.strip()
+        if sort.startswith("-"):
+            return sort[1:], True
+        return sort, False
+
+    def __get_window(
+        self, *, skip: int, limit: Optional[int], page: int, size: Optional[int]
+    ) -> Tuple[int, Optional[int]]:
+        """Return start and stop indexes of the requested items.
+
+        Pagination applies on the items already filtered by skip and limit.
+        """
         start = skip
-        end = skip + limit
-        return items[start:end]
+        stop = None if limit is None else skip + limit
+        if size is not None:
+            start += page * size
+            end = start + size
+            stop = end if stop is None else min(stop, end)
+        return start, stop
@@ -0,0 +1,81 @@
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+from anyio.lowlevel import RunVar
+
+from app.config import get_settings
+from app.crud import CRUDBase
+from app.transaction import in_request_transaction
+
+T = TypeVar("T")
+
+_limiter: RunVar[CapacityLimiter] = RunVar("db_limiter")
+
+
+def get_db_limiter() -> CapacityLimiter:
+    """Return the limiter of the database reads running in the current event loop.
+
+    Reads do not use the default thread limiter, shared with the sync endpoints and
+    dependencies, so bursts of reads are queued by the event loop without starving
+    the other requests.
+    """
+    try:
+        return _limiter.get()
+    except LookupError:
+        limiter = CapacityLimiter(get_settings().NEO4J_MAX_CONCURRENT_READS)
+        _limiter.set(limiter)
+        return limiter
+
+
+async def run_db_call(func: Callable[..., T], **kwargs) -> T:
+    """Run a blocking database call without blocking the event loop.
+
+    The call runs in a worker thread, bound to the request transaction, and the
+    caller waits for it as a coroutine. Calls of the same request must be awaited
+    one after the other since they share the transaction.
+    """
+    return await to_thread.run_sync(
+        partial(in_request_transaction(func), **kwargs), limiter=get_db_limiter()
+    )
+
+
+class AsyncCRUD:
+    """Async read access to a CRUD object, used by the async read endpoints.
+
+    Each method awaits the homonymous CRUD method; arguments are forwarded as they
+    are. The installed neo4j driver (4.4, pinned by neomodel) has no async API, so
+    each running call still holds a worker thread; at most
+    NEO4J_MAX_CONCURRENT_READS of them run at the same time, the other ones wait on
+    the event loop. This class is the only place to change when moving to an async
+    driver.
+    """
+
+    def __init__(self, *, crud: CRUDBase) -> None:
+        self.crud = crud
+
+    async def get(self, **kwargs) -> Any:
+        return await run_db_call(self.crud.get, **kwargs)
+
+    async def get_multi(self, **kwargs) -> List[Any]:
+        return await run_db_call(self.crud.get_multi, **kwargs)
+
+    async def get_multi_fields(self, **kwargs) -> List[Dict[str, Any]]:
+        return await run_db_call(self.crud.get_multi_fields, **kwargs)
+
+    async def get_multi_fields_with_cursor(
+        self, **kwargs
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await run_db_call(self.crud.get_multi_fields_with_cursor, **kwargs)
+
+    async def count(self, **kwargs) -> int:
+        return await run_db_call(self.crud.count, **kwargs)
+
+    async def choose_out_schema(self, **kwargs) -> List[Any]:
+        return await run_db_call(self.crud.choose_out_schema, **kwargs)
+
+    async def choose_out_fields(self, **kwargs) -> List[Dict[str, Any]]:
+        return await run_db_call(self.crud.choose_out_fields, **kwargs)
+
+    async def get_next_cursor(self, **kwargs) -> Optional[str]:
+        return await run_db_call(self.crud.get_next_cursor, **kwargs)
@@ -1,14 +1,15 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 from app.flavor.api.dependencies import (
     valid_flavor_id,
     validate_new_flavor_values,
 )
-from app.flavor.crud import flavor
+from app.flavor.crud import async_flavor, flavor
 from app.flavor.models import Flavor
 from app.flavor.schemas import (
     FlavorQuery,
@@ -21,12 +22,18 @@ from app.flavor.schemas_extended import (
     FlavorReadExtended,
     FlavorReadExtendedPublic,
 )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/flavors", tags=["flavors"])
+router = APIRouter(prefix="/flavors", tags=["flavors"], route_class=TransactionRoute)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -41,23 +48,57 @@ router = APIRouter(prefix="/flavors", tags=["flavors"])
         It is possible to filter on flavors attributes and other \
         common query parameters.",
 )
-def get_flavors(
+async def get_flavors(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: FlavorQuery = Depends(),
 ):
-    items = flavor.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            flavor.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_flavor.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_flavor.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_flavor.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_flavor.count(**item.dict(exclude_none=True))
     )
-    items = flavor.paginate(items=items, page=page.page, size=page.size)
-    return flavor.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_flavor.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @router.get(
     "/{flavor_uid}",
     response_model=Union[
@@ -72,17 +113,22 @@ def get_flavors(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_flavor(
+async def get_flavor(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Flavor = Depends(valid_flavor_id),
 ):
-    return flavor.choose_out_schema(
+    if size.fields is not None:
+        items = await async_flavor.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_flavor.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{flavor_uid}",
     status_code=status.HTTP_200_OK,
@@ -112,7 +158,6 @@ def put_flavor(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{flavor_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.flavor.models import Flavor
 from app.flavor.schemas import (
     FlavorCreate,
@@ -128,3 +129,5 @@ flavor = CRUDFlavor(
     read_extended_schema=FlavorReadExtended,
     read_extended_public_schema=FlavorReadExtendedPublic,
 )
+
+async_flavor = AsyncCRUD(crud=flavor)
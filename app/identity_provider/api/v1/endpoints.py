@@ -1,10 +1,12 @@
 from typing import List, Optional, Union
 
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+
 # from app.user_group.api.dependencies import is_unique_user_group
 # from app.user_group.crud import user_group
 # from app.user_group.schemas import UserGroupCreate
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 
@@ -13,7 +15,7 @@ from app.identity_provider.api.dependencies import (
     valid_identity_provider_id,
     validate_new_identity_provider_values,
 )
-from app.identity_provider.crud import identity_provider
+from app.identity_provider.crud import async_identity_provider, identity_provider
 from app.identity_provider.models import IdentityProvider
 from app.identity_provider.schemas import (
     IdentityProviderQuery,
@@ -26,16 +28,26 @@ from app.identity_provider.schemas_extended import (
     IdentityProviderReadExtended,
     IdentityProviderReadExtendedPublic,
 )
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 
 # from app.project.schemas_extended import UserGroupReadExtended
 # from app.provider.api.dependencies import valid_provider_id
 # from app.provider.models import Provider
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/identity_providers", tags=["identity_providers"])
+router = APIRouter(
+    prefix="/identity_providers",
+    tags=["identity_providers"],
+    route_class=TransactionRoute,
+)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -50,23 +62,57 @@ router = APIRouter(prefix="/identity_providers", tags=["identity_providers"])
         It is possible to filter on identity providers attributes and other \
         common query parameters.",
 )
-def get_identity_providers(
+async def get_identity_providers(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: IdentityProviderQuery = Depends(),
 ):
-    items = identity_provider.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            identity_provider.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_identity_provider.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_identity_provider.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_identity_provider.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_identity_provider.count(**item.dict(exclude_none=True))
     )
-    items = identity_provider.paginate(items=items, page=page.page, size=page.size)
-    return identity_provider.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_identity_provider.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @router.get(
     "/{identity_provider_uid}",
     response_model=Union[
@@ -81,17 +127,22 @@ def get_identity_providers(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_identity_provider(
+async def get_identity_provider(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: IdentityProvider = Depends(valid_identity_provider_id),
 ):
-    return identity_provider.choose_out_schema(
+    if size.fields is not None:
+        items = await async_identity_provider.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_identity_provider.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{identity_provider_uid}",
     status_code=status.HTTP_200_OK,
@@ -121,7 +172,6 @@ def put_identity_provider(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{identity_provider_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
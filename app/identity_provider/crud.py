@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.identity_provider.models import IdentityProvider
 from app.identity_provider.schemas import (
     IdentityProviderCreate,
@@ -162,3 +163,5 @@ identity_provider = CRUDIdentityProvider(
     read_extended_schema=IdentityProviderReadExtended,
     read_extended_public_schema=IdentityProviderReadExtendedPublic,
 )
+
+async_identity_provider = AsyncCRUD(crud=identity_provider)
@@ -1,14 +1,15 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 from app.image.api.dependencies import (
     valid_image_id,
     validate_new_image_values,
 )
-from app.image.crud import image
+from app.image.crud import async_image, image
 from app.image.models import Image
 from app.image.schemas import (
     ImageQuery,
@@ -21,12 +22,18 @@ from app.image.schemas_extended import (
     ImageReadExtended,
     ImageReadExtendedPublic,
 )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/images", tags=["images"])
+router = APIRouter(prefix="/images", tags=["images"], route_class=TransactionRoute)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -41,23 +48,57 @@ router = APIRouter(prefix="/images", tags=["images"])
         It is possible to filter on images attributes and other \
         common query parameters.",
 )
-def get_images(
+async def get_images(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: ImageQuery = Depends(),
 ):
-    items = image.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            image.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_image.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_image.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_image.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_image.count(**item.dict(exclude_none=True))
     )
-    items = image.paginate(items=items, page=page.page, size=page.size)
-    return image.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_image.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @router.get(
     "/{image_uid}",
     response_model=Union[
@@ -72,17 +113,22 @@ def get_images(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_image(
+async def get_image(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Image = Depends(valid_image_id),
 ):
-    return image.choose_out_schema(
+    if size.fields is not None:
+        items = await async_image.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_image.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{image_uid}",
     status_code=status.HTTP_200_OK,
@@ -112,7 +158,6 @@ def put_image(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{image_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.image.models import Image
 from app.image.schemas import (
     ImageCreate,
@@ -131,3 +132,5 @@ image = CRUDImage(
     read_extended_schema=ImageReadExtended,
     read_extended_public_schema=ImageReadExtendedPublic,
 )
+
+async_image = AsyncCRUD(crud=image)
@@ -0,0 +1,142 @@
+import argparse
+import importlib
+import sys
+from typing import Dict, List, Optional, Tuple, Type
+
+from neomodel import StructuredNode, db
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.crud import CRUDBase
+from app.location.models import WGS84PointProperty
+from app.provider.snapshot import SNAPSHOT_CONSTRAINT
+from app.search.crud import get_search_index_statement
+from app.version import REGISTRY_VERSION_CONSTRAINT
+
+ENTITIES = [
+    "flavor",
+    "identity_provider",
+    "image",
+    "location",
+    "network",
+    "project",
+    "provider",
+    "quota",
+    "region",
+    "service",
+    "sla",
+    "user_group",
+]
+
+# neomodel lookups compiled into operators a range index can serve. The string
+# lookups (contains, startswith...) are compiled into regular expressions (=~),
+# which no index can serve.
+RANGE_LOOKUPS = {"exact", "lt", "gt", "lte", "gte", "in"}
+
+# Properties derived from other ones, set on the items stored before their
+# introduction.
+BACKFILL_STATEMENTS = [
+    "MATCH (n:Location) WHERE n.coordinates IS NULL AND n.latitude IS NOT NULL "
+    "AND n.longitude IS NOT NULL "
+    "SET n.coordinates = point({latitude: n.latitude, longitude: n.longitude})",
+]
+
+
+def get_query_models() -> List[Tuple[Type[StructuredNode], Optional[Type[BaseModel]]]]:
+    """Return each DB model managed by a CRUD object with its query model.
+
+    The query model is the one named after the DB model defined in the same module
+    of the CRUD read schemas, if any.
+    """
+    models = {}
+    for entity in ENTITIES:
+        module = importlib.import_module(f"app.{entity}.crud")
+        for obj in vars(module).values():
+            if isinstance(obj, CRUDBase) and obj.model not in models:
+                schemas = sys.modules[obj.read_schema.__module__]
+                models[obj.model] = getattr(schemas, f"{obj.model.__name__}Query", None)
+    return list(models.items())
+
+
+def get_schema_statements(
+    models: List[Tuple[Type[StructuredNode], Optional[Type[BaseModel]]]],
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Return the statements creating the needed constraints and indexes and, for
+    each label, the filters no index can serve.
+
+    Properties with 'unique_index' (uid included) get a uniqueness constraint;
+    properties with 'index' or used by a query model filter served by a range index
+    get a range index; point properties get a point index.
+    """
+    statements = []
+    unindexed = {}
+    for model, query in models:
+        label = model.__label__
+        properties = dict(model.__all_properties__)
+        unique = [k for k, v in properties.items() if v.unique_index]
+        indexed = [k for k, v in properties.items() if v.index and k not in unique]
+        points = [k for k, v in properties.items() if isinstance(v, WGS84PointProperty)]
+
+        not_served = []
+        for name in query.__fields__.keys() if query is not None else []:
+            prop, _, lookup = name.partition("__")
+            if prop in properties and (lookup or "exact") in RANGE_LOOKUPS:
+                if prop not in unique and prop not in indexed:
+                    indexed.append(prop)
+            else:
+                not_served.append(name)
+        if not_served:
+            unindexed[label] = not_served
+
+        for prop in unique:
+            statements.append(
+                f"CREATE CONSTRAINT {label}_{prop}_unique IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+            )
+        for prop in indexed:
+            statements.append(
+                f"CREATE RANGE INDEX {label}_{prop}_range IF NOT EXISTS "
+                f"FOR (n:{label}) ON (n.{prop})"
+            )
+        for prop in points:
+            statements.append(
+                f"CREATE POINT INDEX {label}_{prop}_point IF NOT EXISTS "
+                f"FOR (n:{label}) ON (n.{prop})"
+            )
+    return statements, unindexed
+
+
+def main() -> None:
+    """Create the constraints and indexes needed by the registry's queries and report
+    the filters which are still executed with label scans.
+    """
+    parser = argparse.ArgumentParser(
+        description="Create the neo4j constraints and indexes needed by the query "
+        "filters exposed by the API."
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the statements without executing them.",
+    )
+    args = parser.parse_args()
+
+    statements, unindexed = get_schema_statements(get_query_models())
+    statements.append(get_search_index_statement())
+    statements.append(REGISTRY_VERSION_CONSTRAINT)
+    statements.append(SNAPSHOT_CONSTRAINT)
+    statements.extend(BACKFILL_STATEMENTS)
+    if not args.dry_run:
+        get_settings()
+    for statement in statements:
+        print(statement)
+        if not args.dry_run:
+            db.cypher_query(statement)
+
+    print("\nFilters not served by any index:")
+    for label, filters in unindexed.items():
+        print(f"{label}: {', '.join(filters)}")
+
+
+if __name__ == "__main__":
+    main()
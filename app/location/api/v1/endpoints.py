@@ -1,14 +1,15 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 from app.location.api.dependencies import (
     valid_location_id,
     validate_new_location_values,
 )
-from app.location.crud import location
+from app.location.crud import async_location, location
 from app.location.models import Location
 from app.location.schemas import (
     LocationQuery,
@@ -21,15 +22,24 @@ from app.location.schemas_extended import (
     LocationReadExtended,
     LocationReadExtendedPublic,
 )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    GeoQuery,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
+from app.transaction import TransactionRoute
 
 # from app.region.models import Region
 # from app.region.api.dependencies import valid_region_id
 
-router = APIRouter(prefix="/locations", tags=["locations"])
+router = APIRouter(
+    prefix="/locations", tags=["locations"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -42,25 +52,71 @@ router = APIRouter(prefix="/locations", tags=["locations"])
     summary="Read all locations",
     description="Retrieve all locations stored in the database. \
         It is possible to filter on locations attributes and other \
-        common query parameters.",
+        common query parameters. It is also possible to filter locations \
+        by their distance from a point or by a bounding box and to sort \
+        them by distance.",
 )
-def get_locations(
+async def get_locations(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: LocationQuery = Depends(),
+    geo: GeoQuery = Depends(),
 ):
-    items = location.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    cypher_filters, cypher_sort = location.get_geo_filters(geo=geo)
+    if stream:
+        return StreamingResponse(
+            location.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                cypher_filters=cypher_filters,
+                cypher_sort=cypher_sort,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_location.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_location.get_multi(
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_location.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_location.count(
+            cypher_filters=cypher_filters, **item.dict(exclude_none=True)
+        )
     )
-    items = location.paginate(items=items, page=page.page, size=page.size)
-    return location.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_location.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @router.get(
     "/{location_uid}",
     response_model=Union[
@@ -75,17 +131,22 @@ def get_locations(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_location(
+async def get_location(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Location = Depends(valid_location_id),
 ):
-    return location.choose_out_schema(
+    if size.fields is not None:
+        items = await async_location.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_location.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{location_uid}",
     status_code=status.HTTP_200_OK,
@@ -115,7 +176,6 @@ def put_location(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{location_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
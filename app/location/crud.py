@@ -1,5 +1,8 @@
+from typing import List, Optional, Tuple
+
 from app.crud import CRUDBase
-from app.location.models import Location
+from app.crud_async import AsyncCRUD
+from app.location.models import Location, get_point
 from app.location.schemas import (
     LocationCreate,
     LocationRead,
@@ -11,6 +14,7 @@ from app.location.schemas_extended import (
     LocationReadExtended,
     LocationReadExtendedPublic,
 )
+from app.query import CypherFilter, CypherSort, GeoQuery, parse_floats
 from app.region.models import Region
 
 
@@ -28,6 +32,59 @@ class CRUDLocation(
 ):
     """Location Create, Read, Update and Delete operations."""
 
+    def get_geo_filters(
+        self, *, geo: GeoQuery, path: Optional[str] = None
+    ) -> Tuple[List[CypherFilter], Optional[CypherSort]]:
+        """Return the Cypher filters and sort selecting items by the coordinates of
+        their locations.
+
+        The path, if given, is a pattern going from the item, referred as {node}, to
+        its locations, referred as (location); items match when any of their
+        locations does and are sorted on the nearest one. Without path, the items
+        are the locations. Conditions use the coordinates point index.
+        """
+        conditions = []
+        params = {}
+        if geo.near is not None:
+            latitude, longitude = parse_floats(name="near", value=geo.near, count=2)
+            params["near"] = get_point(latitude=latitude, longitude=longitude)
+        if geo.radius_km is not None:
+            conditions.append(
+                "point.distance(location.coordinates, $near) <= $radius_m"
+            )
+            params["radius_m"] = geo.radius_km * 1000
+        if geo.bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = parse_floats(
+                name="bbox", value=geo.bbox, count=4
+            )
+            conditions.append(
+                "point.withinBBox(location.coordinates, $bbox_min, $bbox_max)"
+            )
+            params["bbox_min"] = get_point(latitude=min_lat, longitude=min_lon)
+            params["bbox_max"] = get_point(latitude=max_lat, longitude=max_lon)
+
+        filters = []
+        if conditions:
+            condition = " AND ".join(conditions)
+            if path is None:
+                condition = condition.replace("location.", "{node}.")
+            else:
+                condition = f"EXISTS {{ MATCH {path} WHERE {condition} }}"
+            filters.append(CypherFilter(condition=condition, params=params))
+
+        sort = None
+        if geo.sort_by_distance:
+            distance = "point.distance(location.coordinates, $near)"
+            if path is None:
+                expression = distance.replace("location.", "{node}.")
+            else:
+                expression = (
+                    f"COLLECT {{ MATCH {path} WITH {distance} AS d "
+                    "RETURN d ORDER BY d LIMIT 1 }[0]"
+                )
+            sort = CypherSort(expression=expression, params={"near": params["near"]})
+        return filters, sort
+
     def create(self, *, obj_in: LocationCreate, region: Region) -> Location:
         """Create a new Location.
 
@@ -56,3 +113,5 @@ location = CRUDLocation(
     read_extended_schema=LocationReadExtended,
     read_extended_public_schema=LocationReadExtendedPublic,
 )
+
+async_location = AsyncCRUD(crud=location)
@@ -1,11 +1,42 @@
+from typing import Any, Dict, Optional
+
+from neo4j.spatial import WGS84Point
 from neomodel import (
     FloatProperty,
     OneOrMore,
+    Property,
     RelationshipFrom,
     StringProperty,
     StructuredNode,
     UniqueIdProperty,
 )
+from neomodel.properties import validator
+
+
+class WGS84PointProperty(Property):
+    """Neo4j point in the WGS-84 coordinate system (longitude, latitude).
+
+    The driver converts points on both directions: values are stored as they are.
+    """
+
+    @validator
+    def inflate(self, value: WGS84Point) -> WGS84Point:
+        return value
+
+    @validator
+    def deflate(self, value: WGS84Point) -> WGS84Point:
+        if not isinstance(value, WGS84Point):
+            raise TypeError(f"WGS84Point expected, got {value!r}")
+        return value
+
+
+def get_point(
+    *, latitude: Optional[float], longitude: Optional[float]
+) -> Optional[WGS84Point]:
+    """Return the point with the given coordinates, None if any of them is missing."""
+    if latitude is None or longitude is None:
+        return None
+    return WGS84Point((longitude, latitude))
 
 
 class Location(StructuredNode):
@@ -21,6 +52,8 @@ class Location(StructuredNode):
         country (str): Country name.
         latitude (float): Latitude coordinate.
         longitude (float): Longitude coordinate.
+        coordinates (WGS84Point): Point built from latitude and longitude, used by
+            the proximity filters through a point index.
     """
 
     uid = UniqueIdProperty()
@@ -29,7 +62,24 @@ class Location(StructuredNode):
     country = StringProperty(required=True)
     latitude = FloatProperty()
     longitude = FloatProperty()
+    coordinates = WGS84PointProperty()
 
     regions = RelationshipFrom(
         "..region.models.Region", "LOCATED_AT", cardinality=OneOrMore
     )
+
+    @classmethod
+    def derive_properties(cls, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the properties computed from the given ones: the coordinates."""
+        return {
+            "coordinates": get_point(
+                latitude=properties.get("latitude"),
+                longitude=properties.get("longitude"),
+            )
+        }
+
+    @classmethod
+    def deflate(cls, properties, obj=None, skip_empty=False):
+        """Deflate the given properties, recomputing the derived ones."""
+        properties = {**properties, **cls.derive_properties(properties)}
+        return super().deflate(properties, obj=obj, skip_empty=skip_empty)
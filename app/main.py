@@ -1,8 +1,12 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth.cache import TokenCacheStats
+from app.auth.dependencies import check_write_access, token_cache
 from app.config import get_settings
+from app.pool import PoolStats, get_pool_stats
+from app.response_cache import ResponseCacheStats, response_cache
 from app.router import router_v1
 
 summary = """
@@ -53,6 +57,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],
     )
 
 sub_app_v1 = FastAPI(
@@ -66,5 +71,46 @@ sub_app_v1.include_router(router_v1)
 app.mount(settings.API_V1_STR, sub_app_v1)
 
 
+@app.get(
+    "/metrics/neo4j-pool",
+    response_model=PoolStats,
+    dependencies=[Depends(check_write_access)],
+    summary="Read the database connection pool state",
+    description="Retrieve the number of in use and idle connections of the \
+        driver pools of the serving worker and the histogram of the time spent \
+        waiting for a connection. Values are per process: with multiple workers, \
+        each one reports its own pools.",
+)
+def get_neo4j_pool_stats():
+    return get_pool_stats()
+
+
+@app.get(
+    "/metrics/token-cache",
+    response_model=TokenCacheStats,
+    dependencies=[Depends(check_write_access)],
+    summary="Read the token validation cache usage",
+    description="Retrieve the hits and misses of the cache of the access token \
+        validation results and its size. Values are per process: with multiple \
+        workers, each one reports its own cache.",
+)
+def get_token_cache_stats():
+    return token_cache.get_stats()
+
+
+@app.get(
+    "/metrics/response-cache",
+    response_model=ResponseCacheStats,
+    dependencies=[Depends(check_write_access)],
+    summary="Read the response cache usage",
+    description="Retrieve the hits and misses of the cache of the read endpoint \
+        responses, its size and its generation, incremented by each committed write. \
+        Values are per process: with multiple workers, each one reports its own \
+        cache.",
+)
+def get_response_cache_stats():
+    return response_cache.get_stats()
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0")
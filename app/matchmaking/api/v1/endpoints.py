@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.auth.dependencies import check_read_access
+from app.crud_async import run_db_call
+from app.matchmaking.crud import find_candidates
+from app.matchmaking.schemas import MatchCandidate, MatchRequirements
+from app.transaction import TransactionRoute
+
+router = APIRouter(
+    prefix="/matchmaking", tags=["matchmaking"], route_class=TransactionRoute
+)
+
+
+@router.get(
+    "/",
+    response_model=List[MatchCandidate],
+    summary="Find deployment candidates for a user group",
+    description="Retrieve the (provider, region, project, compute service, \
+        flavor, image, network) combinations a user group can use, through \
+        its active SLAs, satisfying the given resource requirements. \
+        Identify the user group by its *uid* or by its name and the \
+        endpoint of its identity provider. Candidates are sorted by \
+        increasing flavor size, so that the closest fit comes first. \
+        Authentication is required.",
+)
+async def get_candidates(
+    auth: bool = Depends(check_read_access),
+    requirements: MatchRequirements = Depends(),
+    user_group_uid: Optional[str] = None,
+    idp_endpoint: Optional[str] = None,
+    user_group_name: Optional[str] = None,
+    skip: int = Query(default=0, ge=0, description="Number of candidates to skip."),
+    limit: int = Query(
+        default=20, ge=1, le=100, description="Maximum number of candidates."
+    ),
+):
+    if not auth:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    if (user_group_uid is None) == (idp_endpoint is None or user_group_name is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give either 'user_group_uid' or both 'idp_endpoint' and "
+            "'user_group_name'",
+        )
+    return await run_db_call(
+        find_candidates,
+        requirements=requirements,
+        user_group_uid=user_group_uid,
+        idp_endpoint=idp_endpoint,
+        user_group_name=user_group_name,
+        skip=skip,
+        limit=limit,
+    )
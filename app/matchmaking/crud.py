@@ -0,0 +1,134 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from neomodel import db
+
+from app.matchmaking.schemas import MatchCandidate, MatchRequirements
+
+# Project quotas do not limit a resource when it is unset or negative (unlimited).
+QUOTA_FITS = """all(q IN COLLECT {
+        MATCH (project)-[:USE_SERVICE_WITH]->(q:ComputeQuota)-[:APPLY_TO]->(service)
+        RETURN q
+    } WHERE (q.cores IS NULL OR q.cores < 0 OR q.cores >= flavor.vcpus)
+    AND (q.ram IS NULL OR q.ram < 0 OR q.ram >= flavor.ram)
+    AND (q.instances IS NULL OR q.instances <> 0))"""
+
+# Network the project can use in the candidate region, preferring default ones.
+PROJECT_NETWORK = """COLLECT {
+        MATCH (project)-[:USE_SERVICE_WITH]->(:NetworkQuota)-[:APPLY_TO]->
+            (ns:NetworkService)<-[:SUPPLY]-(region)
+        MATCH (ns)-[:AVAILABLE_NETWORK]->(n:Network)
+        WHERE n.is_shared OR (project)-[:CAN_USE_NETWORK]->(n)
+        RETURN n ORDER BY n.is_default DESC, n.name LIMIT 1
+    }[0]"""
+
+
+def build_match_query(*, by_uid: bool, requirements: MatchRequirements) -> str:
+    """Return the query finding the deployment candidates of a user group.
+
+    The traversal follows the active SLAs of the user group to their projects, then
+    the project compute quotas to the compute services they apply to, as done by
+    UserGroup.services; flavors and images are the public ones of the service plus
+    the ones granted to the project, as done by Project.public_flavors and
+    Project.private_flavors (images alike). Filters on unset requirements are
+    omitted.
+    """
+    if by_uid:
+        query = "MATCH (g:UserGroup {uid: $user_group_uid}) "
+    else:
+        query = (
+            "MATCH (g:UserGroup {name: $user_group_name})"
+            "-[:BELONG_TO]->(:IdentityProvider {endpoint: $idp_endpoint}) "
+        )
+    query += (
+        "MATCH (g)-[:AGREE]->(sla:SLA)-[:REFER_TO]->(project:Project)"
+        "<-[:BOOK_PROJECT_FOR_SLA]-(provider:Provider) "
+        "WHERE sla.start_date <= $today AND sla.end_date >= $today "
+        "MATCH (provider)-[:DIVIDED_INTO]->(region:Region)-[:SUPPLY]->"
+        "(service:ComputeService) "
+    )
+    if requirements.region_name is not None:
+        query += "WHERE region.name = $region_name "
+    if requirements.country is not None:
+        query += (
+            "MATCH (region)-[:LOCATED_AT]->(location:Location) "
+            "WHERE toLower(location.country) = toLower($country) "
+        )
+    query += (
+        "MATCH (project)-[:USE_SERVICE_WITH]->(:ComputeQuota)-[:APPLY_TO]->(service) "
+        "WITH DISTINCT provider, region, project, service "
+    )
+
+    flavor_filters = [
+        "(flavor.is_public OR (project)-[:CAN_USE_VM_FLAVOR]->(flavor))",
+        "flavor.vcpus >= $min_vcpus",
+        "flavor.ram >= $min_ram",
+        "flavor.disk >= $min_disk",
+        "flavor.gpus >= $min_gpus",
+    ]
+    if requirements.gpu_model is not None:
+        flavor_filters.append("toLower(flavor.gpu_model) = toLower($gpu_model)")
+    flavor_filters.append(QUOTA_FITS)
+    query += "MATCH (service)-[:AVAILABLE_VM_FLAVOR]->(flavor:Flavor) "
+    query += f"WHERE {' AND '.join(flavor_filters)} "
+
+    image_filters = ["(image.is_public OR (project)-[:CAN_USE_VM_IMAGE]->(image))"]
+    if requirements.os_distro is not None:
+        image_filters.append("toLower(image.os_distro) = toLower($os_distro)")
+    if requirements.architecture is not None:
+        image_filters.append("toLower(image.architecture) = toLower($architecture)")
+    query += "MATCH (service)-[:AVAILABLE_VM_IMAGE]->(image:Image) "
+    query += f"WHERE {' AND '.join(image_filters)} "
+
+    query += (
+        "WITH provider, region, project, service, flavor, image "
+        "ORDER BY flavor.gpus, flavor.vcpus, flavor.ram, flavor.disk, "
+        "provider.name, region.name, image.name "
+        "SKIP $skip LIMIT $limit "
+        "RETURN provider, region, project, service, flavor, image, "
+        f"{PROJECT_NETWORK}"
+    )
+    return query
+
+
+def find_candidates(
+    *,
+    requirements: MatchRequirements,
+    user_group_uid: Optional[str] = None,
+    idp_endpoint: Optional[str] = None,
+    user_group_name: Optional[str] = None,
+    today: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> List[MatchCandidate]:
+    """Return the placements satisfying the requirements for a user group.
+
+    The user group is identified by its uid or by its name and the endpoint of its
+    identity provider. Candidates are sorted by increasing flavor size (GPUs, vCPUs,
+    RAM and disk), so that the closest fit comes first.
+    """
+    params: Dict[str, Any] = {
+        **requirements.dict(),
+        "user_group_uid": user_group_uid,
+        "idp_endpoint": idp_endpoint,
+        "user_group_name": user_group_name,
+        "today": (today or date.today()).isoformat(),
+        "skip": skip,
+        "limit": limit,
+    }
+    query = build_match_query(
+        by_uid=user_group_uid is not None, requirements=requirements
+    )
+    results, _ = db.cypher_query(query, params, resolve_objects=True)
+    return [
+        MatchCandidate(
+            provider=provider,
+            region=region,
+            project=project,
+            compute_service=service,
+            flavor=flavor,
+            image=image,
+            network=network,
+        )
+        for provider, region, project, service, flavor, image, network in results
+    ]
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.flavor.schemas import FlavorRead
+from app.image.schemas import ImageRead
+from app.network.schemas import NetworkRead
+from app.project.schemas import ProjectRead
+from app.provider.schemas import ProviderRead
+from app.region.schemas import RegionRead
+from app.service.schemas import ComputeServiceRead
+
+
+class MatchRequirements(BaseModel):
+    """Model with the resources a deployment needs.
+
+    Unset attributes do not restrict the candidates.
+    """
+
+    min_vcpus: int = Field(default=0, ge=0, description="Minimum number of vCPUs.")
+    min_ram: int = Field(default=0, ge=0, description="Minimum RAM size (MB).")
+    min_disk: int = Field(default=0, ge=0, description="Minimum disk size (GB).")
+    min_gpus: int = Field(default=0, ge=0, description="Minimum number of GPUs.")
+    gpu_model: Optional[str] = Field(default=None, description="GPU model name.")
+    os_distro: Optional[str] = Field(default=None, description="Image OS distro.")
+    architecture: Optional[str] = Field(default=None, description="Image architecture.")
+    region_name: Optional[str] = Field(default=None, description="Region name.")
+    country: Optional[str] = Field(
+        default=None, description="Country of the region location."
+    )
+
+
+class MatchCandidate(BaseModel):
+    """Model with a placement satisfying a deployment requirements.
+
+    The project is the one the user group can use on the provider through its SLA;
+    flavor and image are available on the compute service and public or granted to
+    the project. The network, if any, is one the project can use in the same region,
+    default networks first.
+    """
+
+    provider: ProviderRead
+    region: RegionRead
+    project: ProjectRead
+    compute_service: ComputeServiceRead
+    flavor: FlavorRead
+    image: ImageRead
+    network: Optional[NetworkRead] = None
@@ -4,8 +4,11 @@ from uuid import UUID
 
 from neo4j.time import DateTime
 from neomodel import One, OneOrMore, ZeroOrMore, ZeroOrOne
+from neomodel.relationship_manager import RelationshipManager
 from pydantic import BaseModel, Field, root_validator
 
+from app.projection import get_prefetched_relation
+
 
 class BaseNode(BaseModel):
     description: str = Field(default="", description="Brief item description")
@@ -53,21 +56,30 @@ class BaseNodeRead(BaseModel):
         From OneOrMore or ZeroOrMore relationships get all relationships; if that
         relationships has a model return a dict with the data stored in the
         relationship.
+
+        Only relationships shown by the schema are resolved. Relationships prefetched
+        for the whole page are read from memory.
         """
         relations = {}
         for k, v in data.items():
+            if k not in cls.__fields__ or not isinstance(v, RelationshipManager):
+                continue
+            prefetched = get_prefetched_relation(v)
+            if prefetched is None:
+                prefetched = [
+                    (node, v.relationship(node) if v.definition.get("model") else None)
+                    for node in v.all()
+                ]
             if isinstance(v, One) or isinstance(v, ZeroOrOne):
-                relations[k] = v.single()
+                relations[k] = prefetched[0][0] if prefetched else None
             elif isinstance(v, OneOrMore) or isinstance(v, ZeroOrMore):
                 if v.definition.get("model") is None:
-                    relations[k] = v.all()
+                    relations[k] = [node for node, _ in prefetched]
                 else:
-                    items = []
-                    for node in v.all():
-                        item = node.__dict__
-                        item["relationship"] = v.relationship(node)
-                        items.append(item)
-                    relations[k] = items
+                    relations[k] = [
+                        {**node.__dict__, "relationship": relationship}
+                        for node, relationship in prefetched
+                    ]
         return {**data, **relations}
 
     @root_validator
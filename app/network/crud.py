@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.network.models import Network
 from app.network.schemas import (
     NetworkCreate,
@@ -92,3 +93,5 @@ network = CRUDNetwork(
     read_extended_schema=NetworkReadExtended,
     read_extended_public_schema=NetworkReadExtendedPublic,
 )
+
+async_network = AsyncCRUD(crud=network)
@@ -0,0 +1,151 @@
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+from weakref import WeakSet
+
+from neomodel.util import Database
+from pydantic import BaseModel, Field
+
+# Upper bounds, in seconds, of the connection acquisition wait histogram buckets.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class WaitHistogram:
+    """Thread safe histogram of the time spent waiting for a pool connection."""
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Add a measured wait."""
+        with self.lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+
+    def get_cumulative_counts(self) -> Tuple[Dict[str, int], int, float]:
+        """Return the cumulative count of each bucket, the count and the sum of all
+        the measured waits.
+
+        Buckets are keyed by their upper bound, the last one being "+Inf", as done by
+        Prometheus histograms.
+        """
+        with self.lock:
+            counts = list(self.counts)
+            total = self.total
+        cumulative: Dict[str, int] = {}
+        partial = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            partial += count
+            cumulative[bound] = partial
+        return cumulative, partial, total
+
+
+class AcquisitionWait(BaseModel):
+    buckets: Dict[str, int] = Field(
+        description="Number of acquisitions which waited at most the given seconds."
+    )
+    count: int = Field(description="Number of connection acquisitions.")
+    sum: float = Field(description="Total seconds spent waiting for a connection.")
+
+
+class PoolStats(BaseModel):
+    """Model with the state of the connection pools of the current process."""
+
+    drivers: int = Field(description="Number of drivers, one for each database.")
+    max_size: int = Field(
+        description="Maximum number of connections of the process to each database."
+    )
+    in_use: int = Field(description="Connections currently running a transaction.")
+    idle: int = Field(description="Open connections ready to be acquired.")
+    acquisition_wait: AcquisitionWait
+
+
+acquisition_wait = WaitHistogram()
+
+_pools: "WeakSet[Any]" = WeakSet()
+_pools_lock = Lock()
+
+_drivers: Dict[Tuple[str, int], Any] = {}
+_drivers_lock = Lock()
+
+
+def share_drivers() -> None:
+    """Make all the threads of the process use the same driver for a database URL.
+
+    neomodel's Database is thread local: each thread connecting builds its own
+    driver, with its own connection pool, so the pool limits would apply to each
+    thread and not to the process. The first driver built by the process is kept and
+    given to the other threads, the ones they build are closed before opening any
+    connection. Drivers are keyed by process id too, so forked workers build their
+    own.
+    """
+    set_connection = Database.set_connection
+    if getattr(set_connection, "shares_drivers", False):
+        return
+
+    @wraps(set_connection)
+    def set_shared_connection(self: Database, url: str) -> None:
+        set_connection(self, url)
+        with _drivers_lock:
+            driver = _drivers.setdefault((self.url, self._pid), self.driver)
+        if driver is not self.driver:
+            self.driver.close()
+            self.driver = driver
+
+    set_shared_connection.shares_drivers = True
+    Database.set_connection = set_shared_connection
+
+
+def instrument_driver(driver: Any) -> None:
+    """Track the connection pool of the given driver and time its acquisitions.
+
+    Each driver is instrumented once, the first time it is seen.
+    """
+    pool = driver._pool
+    with _pools_lock:
+        if pool in _pools:
+            return
+        _pools.add(pool)
+    acquire = pool.acquire
+
+    @wraps(acquire)
+    def timed_acquire(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return acquire(*args, **kwargs)
+        finally:
+            acquisition_wait.observe(perf_counter() - start)
+
+    pool.acquire = timed_acquire
+
+
+def get_pool_stats() -> PoolStats:
+    """Return the connections of all the tracked pools and the acquisition waits."""
+    with _pools_lock:
+        pools: List[Any] = list(_pools)
+    in_use = idle = max_size = 0
+    for pool in pools:
+        max_size = pool.pool_config.max_connection_pool_size
+        with pool.lock:
+            for connections in pool.connections.values():
+                for connection in connections:
+                    if connection.in_use:
+                        in_use += 1
+                    else:
+                        idle += 1
+    buckets, count, total = acquisition_wait.get_cumulative_counts()
+    return PoolStats(
+        drivers=len(pools),
+        max_size=max_size,
+        in_use=in_use,
+        idle=idle,
+        acquisition_wait=AcquisitionWait(buckets=buckets, count=count, sum=total),
+    )
+
+
+share_drivers()
@@ -1,7 +1,8 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 
@@ -19,7 +20,7 @@ from app.project.api.dependencies import (
     valid_project_id,
     validate_new_project_values,
 )
-from app.project.crud import project
+from app.project.crud import async_project, project
 from app.project.models import Project
 from app.project.schemas import (
     ProjectQuery,
@@ -32,13 +33,18 @@ from app.project.schemas_extended import (
     ProjectReadExtended,
     ProjectReadExtendedPublic,
 )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
-from app.region.schemas import RegionQuery
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=TransactionRoute)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -53,26 +59,63 @@ router = APIRouter(prefix="/projects", tags=["projects"])
         It is possible to filter on projects attributes and other \
         common query parameters.",
 )
-def get_projects(
+async def get_projects(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: ProjectQuery = Depends(),
     region_name: Optional[str] = None,
 ):
-    items = project.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            project.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                schema_options={"region_name": region_name},
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_project.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_project.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_project.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_project.count(**item.dict(exclude_none=True))
     )
-    items = project.paginate(items=items, page=page.page, size=page.size)
-    region_query = RegionQuery(name=region_name)
-    items = filter_on_region_attr(items=items, region_query=region_query)
-    return project.choose_out_schema(
-        items=items, auth=auth, short=size.short, with_conn=size.with_conn
+    if size.fields is not None:
+        return response
+    return await async_project.choose_out_schema(
+        items=items,
+        auth=auth,
+        short=size.short,
+        with_conn=size.with_conn,
+        region_name=region_name,
     )
 
 
-@db.read_transaction
 @router.get(
     "/{project_uid}",
     response_model=Union[
@@ -87,51 +130,27 @@ def get_projects(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_project(
+async def get_project(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Project = Depends(valid_project_id),
     region_name: Optional[str] = None,
 ):
-    region_query = RegionQuery(name=region_name)
-    items = filter_on_region_attr(items=[item], region_query=region_query)
-    items = project.choose_out_schema(
-        items=items, auth=auth, short=size.short, with_conn=size.with_conn
+    if size.fields is not None:
+        items = await async_project.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_project.choose_out_schema(
+        items=[item],
+        auth=auth,
+        short=size.short,
+        with_conn=size.with_conn,
+        region_name=region_name,
     )
     return items[0]
 
 
-def filter_on_region_attr(  # noqa: C901
-    items: List[Project], region_query: RegionQuery
-) -> List[Project]:
-    """
-    Filter projects based on region access.
-    """
-    attrs = region_query.dict(exclude_none=True)
-    if not attrs:
-        return items
-
-    for item in items:
-        for quota in item.quotas:
-            service = quota.service.single()
-            if not service.region.get_or_none(**attrs):
-                item.quotas = item.quotas.exclude(uid=quota.uid)
-        for flavor in item.private_flavors:
-            service = flavor.service.single()
-            if not service.region.get_or_none(**attrs):
-                item.private_flavors = item.private_flavors.exclude(uid=flavor.uid)
-        for image in item.private_images:
-            service = image.service.single()
-            if not service.region.get_or_none(**attrs):
-                item.private_images = item.private_images.exclude(uid=image.uid)
-        for network in item.private_networks:
-            service = network.service.single()
-            if not service.region.get_or_none(**attrs):
-                item.private_networks = item.private_networks.exclude(uid=network.uid)
-    return items
-
-
-@db.write_transaction
 @router.patch(
     "/{project_uid}",
     status_code=status.HTTP_200_OK,
@@ -161,7 +180,6 @@ def put_project(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{project_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -1,4 +1,7 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.project.models import Project
 from app.project.schemas import (
     ProjectCreate,
@@ -11,11 +14,32 @@ from app.project.schemas_extended import (
     ProjectReadExtended,
     ProjectReadExtendedPublic,
 )
+from app.projection import read_extended
 from app.provider.models import Provider
 from app.quota.crud import block_storage_quota, compute_quota
 from app.quota.models import BlockStorageQuota, ComputeQuota
+from app.service.enum import ServiceType
 from app.sla.crud import sla
 
+# Cypher condition true when the service at the end of the pattern, referred as
+# '{path}', is supplied by the region with the given name.
+REGION_CONDITION = (
+    "EXISTS { MATCH {path}<-[:SUPPLY]-(region) WHERE region.name = $region_name }"
+)
+
+# Public resources are the ones available on the services the project has quotas on;
+# private ones are directly linked to the project.
+PUBLIC_RESOURCES = {
+    "flavors": (ServiceType.COMPUTE, "AVAILABLE_VM_FLAVOR", "is_public"),
+    "images": (ServiceType.COMPUTE, "AVAILABLE_VM_IMAGE", "is_public"),
+    "networks": (ServiceType.NETWORK, "AVAILABLE_NETWORK", "is_shared"),
+}
+PRIVATE_RESOURCES = {
+    "flavors": "CAN_USE_VM_FLAVOR",
+    "images": "CAN_USE_VM_IMAGE",
+    "networks": "CAN_USE_NETWORK",
+}
+
 
 class CRUDProject(
     CRUDBase[
@@ -29,7 +53,7 @@ class CRUDProject(
         ProjectReadExtendedPublic,
     ]
 ):
-    """Flavor Create, Read, Update and Delete operations."""
+    """Project Create, Read, Update and Delete operations."""
 
     def create(self, *, obj_in: ProjectCreate, provider: Provider) -> Project:
         """Create a new Project.
@@ -56,6 +80,73 @@ class CRUDProject(
             sla.remove(db_obj=item)
         return super().remove(db_obj=db_obj)
 
+    def choose_out_schema(
+        self,
+        *,
+        items: List[Project],
+        auth: bool,
+        short: bool,
+        with_conn: bool,
+        region_name: Optional[str] = None,
+    ) -> Union[
+        List[ProjectReadPublic],
+        List[ProjectReadShort],
+        List[ProjectRead],
+        List[ProjectReadExtendedPublic],
+        List[ProjectReadExtended],
+    ]:
+        """Serialize the given projects.
+
+        Extended schemas are populated with a single query returning the quotas and the
+        public and private flavors, images and networks of each project. When a region
+        name is given, these lists only contain the items belonging to services of
+        that region; the projects themselves are not filtered.
+        """
+        if not with_conn:
+            return super().choose_out_schema(
+                items=items, auth=auth, short=short, with_conn=with_conn
+            )
+        schema = self.read_extended_schema if auth else self.read_extended_public_schema
+        conditions, lists, params = self.__get_extended_queries(region_name=region_name)
+        return read_extended(
+            items=items,
+            model=self.model,
+            schema=schema,
+            conditions=conditions,
+            lists=lists,
+            params=params,
+        )
+
+    def __get_extended_queries(
+        self, *, region_name: Optional[str] = None
+    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
+        """Return the conditions on the quotas, the Cypher lists computing the
+        project's flavors, images and networks and the parameters they use.
+        """
+        conditions = {}
+        params = {}
+        if region_name is not None:
+            conditions["quotas"] = REGION_CONDITION.replace(
+                "{path}", "({node})-[:APPLY_TO]->()"
+            )
+            params["region_name"] = region_name
+
+        lists = {}
+        for name, (service_type, rel_type, attr) in PUBLIC_RESOURCES.items():
+            public_where = f"q.type = '{service_type.value}' AND u.{attr} = true"
+            private_where = ""
+            if region_name is not None:
+                public_where += f" AND {REGION_CONDITION.replace('{path}', '(s)')}"
+                private_where = " WHERE " + REGION_CONDITION.replace(
+                    "{path}", f"(u)<-[:{rel_type}]-()"
+                )
+            lists[name] = (
+                "[({node})-[:USE_SERVICE_WITH]->(q)-[:APPLY_TO]->(s)"
+                f"-[:{rel_type}]->(u) WHERE {public_where} | u] + "
+                f"[({{node}})-[:{PRIVATE_RESOURCES[name]}]->(u){private_where} | u]"
+            )
+        return conditions, lists, params
+
 
 project = CRUDProject(
     model=Project,
@@ -66,3 +157,5 @@ project = CRUDProject(
     read_extended_schema=ProjectReadExtended,
     read_extended_public_schema=ProjectReadExtendedPublic,
 )
+
+async_project = AsyncCRUD(crud=project)
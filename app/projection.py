@@ -0,0 +1,384 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from neomodel import One, StructuredNode, StructuredRel, ZeroOrOne, db
+from neomodel.match import _rel_helper
+from neomodel.relationship_manager import RelationshipDefinition, RelationshipManager
+from pydantic import BaseModel
+
+RelationsTree = Dict[str, Tuple[List[RelationshipDefinition], "RelationsTree"]]
+
+NamesTree = Dict[str, "NamesTree"]
+
+PREFETCH_ATTR = "_prefetched_relations"
+
+PrefetchedRelations = Dict[str, List[Tuple[StructuredNode, Optional[StructuredRel]]]]
+
+
+def get_relations_tree(
+    *, models: List[Type[StructuredNode]], schemas: List[Type[BaseModel]]
+) -> RelationsTree:
+    """Return the relationships to traverse to populate the given schemas.
+
+    Walk the schemas' fields and keep the ones matching a relationship defined on one
+    of the given models or on their subclasses (a relationship can point to a base
+    class, for example regions point to generic services). Then recurse on the schemas
+    of those fields. When multiple schemas (Union fields) require a relationship with
+    the same name, merge their definitions and sub-trees.
+    """
+    tree: RelationsTree = {}
+    models = _with_subclasses(models)
+    for schema in schemas:
+        for name, field in schema.__fields__.items():
+            rel = _get_relationship(models=models, name=name)
+            if rel is None:
+                continue
+            rel._lookup_node_class()
+            sub_schemas = [
+                i
+                for i in _get_types(field.type_)
+                if isinstance(i, type) and issubclass(i, BaseModel)
+            ]
+            sub_tree = get_relations_tree(
+                models=[rel.definition["node_class"]], schemas=sub_schemas
+            )
+            rels, old_sub_tree = tree.get(name, ([], {}))
+            if not any(_same_relationship(rel, i) for i in rels):
+                rels = [*rels, rel]
+            tree[name] = (rels, _merge_trees(old_sub_tree, sub_tree))
+    return tree
+
+
+def get_names_tree(
+    *, models: List[Type[StructuredNode]], names: NamesTree
+) -> RelationsTree:
+    """Return the relationships to traverse to follow the given names.
+
+    As done by get_relations_tree, a name can match a relationship defined on the
+    given models or on their subclasses.
+    """
+    tree: RelationsTree = {}
+    models = _with_subclasses(models)
+    for name, sub_names in names.items():
+        rel = _get_relationship(models=models, name=name)
+        rel._lookup_node_class()
+        sub_tree = get_names_tree(
+            models=[rel.definition["node_class"]], names=sub_names
+        )
+        tree[name] = ([rel], sub_tree)
+    return tree
+
+
+def build_projection(
+    *,
+    ident: str,
+    tree: RelationsTree,
+    conditions: Optional[Dict[str, str]] = None,
+    lists: Optional[Dict[str, str]] = None,
+) -> str:
+    """Return a Cypher map with the node and, recursively, its related nodes.
+
+    Each relationship is resolved with a pattern comprehension. When a relationship has
+    a model, the relationship itself is returned too.
+
+    'conditions' maps a relationship to a Cypher condition on the related node,
+    referred as '{node}'. Nested relationships are named by their dotted path, as in
+    'slas.projects'. 'lists' maps a name to a Cypher list expression of nodes
+    computed from the source node, referred as '{node}'; these nodes are returned
+    without relationships.
+    """
+    conditions = conditions or {}
+    rels = []
+    for i, (name, (definitions, sub_tree)) in enumerate(tree.items()):
+        sub_ident = f"{ident}_{i}"
+        rel_ident = f"{sub_ident}_r"
+        condition = conditions.get(name)
+        where = f" WHERE {condition.replace('{node}', sub_ident)}" if condition else ""
+        sub_conditions = {
+            k[len(name) + 1 :]: v
+            for k, v in conditions.items()
+            if k.startswith(f"{name}.")
+        }
+        comprehensions = []
+        for rel in definitions:
+            pattern = _rel_helper(
+                lhs=ident, rhs=sub_ident, ident=rel_ident, **rel.definition
+            )
+            projection = build_projection(
+                ident=sub_ident, tree=sub_tree, conditions=sub_conditions
+            )
+            if rel.definition.get("model") is not None:
+                projection = f"{projection[:-1]}, rel: {rel_ident}}}"
+            comprehensions.append(f"[{pattern}{where} | {projection}]")
+        rels.append(f"{name}: {' + '.join(comprehensions)}")
+    for i, (name, expression) in enumerate((lists or {}).items()):
+        sub_ident = f"{ident}_l{i}"
+        rels.append(
+            f"{name}: [{sub_ident} IN ({expression.replace('{node}', ident)}) | "
+            f"{{node: {sub_ident}, rels: {{}}}}]"
+        )
+    return f"{{node: {ident}, rels: {{{', '.join(rels)}}}}}"
+
+
+def get_tree_paths(*, tree: RelationsTree) -> List[str]:
+    """Return the patterns of the paths from the root of the tree to each of its
+    nodes.
+
+    Patterns start from the root, which is omitted, and end with the reached node,
+    as in '-[:A]->()<-[:B]-()'.
+    """
+    paths = []
+    for definitions, sub_tree in tree.values():
+        for rel in definitions:
+            step = _rel_helper(lhs="", rhs="", ident="", **rel.definition)[2:]
+            paths.append(step)
+            paths.extend(step + i for i in get_tree_paths(tree=sub_tree))
+    return paths
+
+
+def hydrate(*, data: Dict[str, Any], tree: RelationsTree) -> Dict[str, Any]:
+    """Build, from the projection result, the data used to populate a schema.
+
+    Inflate nodes and relationships through the neomodel classes matching their labels,
+    so that values are the same ones read through the ORM. Single relationships (One
+    and ZeroOrOne) become an item or None. Relationship data are stored in the
+    'relationship' key, as done by BaseNodeRead.get_relations.
+    """
+    node = db._NODE_CLASS_REGISTRY[frozenset(data["node"].labels)].inflate(data["node"])
+    item = {k: getattr(node, k) for k, _ in node.__all_properties__}
+    rel = data.get("rel")
+    if rel is not None:
+        item["relationship"] = db._NODE_CLASS_REGISTRY[frozenset([rel.type])].inflate(
+            rel
+        )
+    for name, (definitions, sub_tree) in tree.items():
+        values = [hydrate(data=i, tree=sub_tree) for i in data["rels"][name]]
+        if issubclass(definitions[0].manager, (One, ZeroOrOne)):
+            item[name] = values[0] if values else None
+        else:
+            item[name] = values
+    return item
+
+
+def read_extended(
+    *,
+    items: List[StructuredNode],
+    model: Type[StructuredNode],
+    schema: Type[BaseModel],
+    conditions: Optional[Dict[str, str]] = None,
+    lists: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> List[BaseModel]:
+    """Read the given items, and all the relationships required by the schema, with a
+    single query.
+
+    'conditions' and 'lists' are forwarded to build_projection; 'params' are the
+    parameters they use. Nodes returned by the lists populate the schema attributes
+    with the same name.
+
+    Items whose relationships have been narrowed in Python (the relationship manager
+    has been replaced by a filtered node set) keep being serialized from the ORM
+    object to preserve that filtering; their other relationships are prefetched.
+
+    Schemas overriding from_orm compute some attributes from the ORM object; unless
+    the lists computing them are given, all the items are serialized from the ORM
+    object.
+    """
+    conditions = conditions or {}
+    lists = lists or {}
+    if not lists and _overrides_from_orm(schema):
+        prefetch_relations(items=items, model=model, schema=schema)
+        return [schema.from_orm(i) for i in items]
+    query, tree = _get_query(
+        model=model,
+        schema=schema,
+        conditions=tuple(conditions.items()),
+        lists=tuple(lists.items()),
+    )
+    ids = [i.id for i in items if not _is_narrowed(item=i, tree=tree)]
+    projected = {}
+    if ids:
+        results, _ = db.cypher_query(query, {**(params or {}), "ids": ids})
+        for (data,) in results:
+            item = hydrate(data=data, tree=tree)
+            for name in lists.keys():
+                item[name] = [hydrate(data=i, tree={}) for i in data["rels"][name]]
+            projected[data["node"].id] = schema.parse_obj(item)
+    narrowed = [i for i in items if i.id not in projected]
+    prefetch_relations(items=narrowed, model=model, schema=schema)
+    return [projected.get(i.id) or schema.from_orm(i) for i in items]
+
+
+def read_tree(
+    *, items: List[StructuredNode], model: Type[StructuredNode], tree: RelationsTree
+) -> List[Dict[str, Any]]:
+    """Read the given items, and all the relationships in the tree, with a single
+    query and return them hydrated, in the same order.
+    """
+    if not items:
+        return []
+    projection = build_projection(ident="n", tree=tree)
+    query = f"MATCH (n:{model.__label__}) WHERE id(n) IN $ids RETURN {projection}"
+    results, _ = db.cypher_query(query, {"ids": [i.id for i in items]})
+    hydrated = {data["node"].id: hydrate(data=data, tree=tree) for (data,) in results}
+    return [hydrated[i.id] for i in items]
+
+
+def prefetch_relations(
+    *,
+    items: List[StructuredNode],
+    model: Type[StructuredNode],
+    schema: Type[BaseModel],
+) -> None:
+    """Load the relationships required by the schema for all the given items.
+
+    Each relationship definition is resolved, for the whole page, with a single UNWIND
+    query. Related nodes are cached on the source node, then the same is done on them
+    for the nested relationships. BaseNodeRead.get_relations reads the cached values
+    instead of querying the database once per item and per relationship.
+    """
+    if not items:
+        return
+    _, tree = _get_query(model=model, schema=schema)
+    _prefetch_level(items=items, tree=tree)
+
+
+def get_prefetched_relation(
+    manager: RelationshipManager,
+) -> Optional[List[Tuple[StructuredNode, Optional[StructuredRel]]]]:
+    """Return the cached related nodes, and relationships, or None if not prefetched."""
+    return getattr(manager.source, PREFETCH_ATTR, {}).get(manager.name)
+
+
+def _fetch(
+    *, ids: List[int], definition: Dict
+) -> List[Tuple[int, StructuredNode, Optional[StructuredRel]]]:
+    """Return the nodes connected to the given ones through a relationship definition.
+
+    Nodes are inflated through the class matching their labels, since relationships
+    can point to a base class. Relationships are inflated only when they have a model.
+    """
+    pattern = _rel_helper(lhs="n", rhs="m", ident="r", **definition)
+    query = f"UNWIND $ids AS id MATCH (n) WHERE id(n) = id MATCH {pattern} "
+    query += "RETURN id, m, r"
+    results, _ = db.cypher_query(query, {"ids": ids})
+    rel_model = definition.get("model")
+    return [
+        (
+            source_id,
+            db._NODE_CLASS_REGISTRY[frozenset(node.labels)].inflate(node),
+            rel_model.inflate(rel) if rel_model is not None else None,
+        )
+        for source_id, node, rel in results
+    ]
+
+
+@lru_cache
+def _get_query(
+    *,
+    model: Type[StructuredNode],
+    schema: Type[BaseModel],
+    conditions: Tuple[Tuple[str, str], ...] = (),
+    lists: Tuple[Tuple[str, str], ...] = (),
+) -> Tuple[str, RelationsTree]:
+    """Return the projection query, and the traversed tree, for a model and a schema."""
+    tree = get_relations_tree(models=[model], schemas=[schema])
+    projection = build_projection(
+        ident="n", tree=tree, conditions=dict(conditions), lists=dict(lists)
+    )
+    query = f"MATCH (n:{model.__label__}) WHERE id(n) IN $ids RETURN {projection}"
+    return query, tree
+
+
+def _get_relationship(
+    *, models: List[Type[StructuredNode]], name: str
+) -> Union[RelationshipDefinition, None]:
+    """Return the first relationship with the given name defined on the models."""
+    for model in models:
+        rels = model.defined_properties(aliases=False, properties=False, rels=True)
+        if name in rels:
+            return rels[name]
+    return None
+
+
+def _get_types(type_: Any) -> List[Any]:
+    """Return the types composing a Union or the type itself."""
+    if get_origin(type_) is Union:
+        return list(get_args(type_))
+    return [type_]
+
+
+def _is_narrowed(*, item: StructuredNode, tree: RelationsTree) -> bool:
+    """Check if any of the item's relationships is no more a relationship manager."""
+    return any(
+        not isinstance(item.__dict__.get(name), RelationshipManager)
+        for name in tree.keys()
+    )
+
+
+def _merge_trees(tree1: RelationsTree, tree2: RelationsTree) -> RelationsTree:
+    """Merge two relationships trees."""
+    tree = dict(tree1)
+    for name, (rels, sub_tree) in tree2.items():
+        old_rels, old_sub_tree = tree.get(name, ([], {}))
+        new_rels = [
+            i for i in rels if not any(_same_relationship(i, j) for j in old_rels)
+        ]
+        tree[name] = ([*old_rels, *new_rels], _merge_trees(old_sub_tree, sub_tree))
+    return tree
+
+
+def _prefetch_level(*, items: List[StructuredNode], tree: RelationsTree) -> None:
+    """Cache the relationships in the tree on the given items and recurse on the
+    related nodes.
+
+    Relationships replaced by a filtered node set are not prefetched.
+    """
+    for name, (definitions, sub_tree) in tree.items():
+        sources = defaultdict(list)
+        for item in items:
+            if isinstance(item.__dict__.get(name), RelationshipManager):
+                sources[item.id].append(item)
+        if not sources:
+            continue
+        related = defaultdict(list)
+        for rel in definitions:
+            for source_id, node, relationship in _fetch(
+                ids=list(sources.keys()), definition=rel.definition
+            ):
+                related[source_id].append((node, relationship))
+        for source_id, same_sources in sources.items():
+            for source in same_sources:
+                cache: PrefetchedRelations = source.__dict__.setdefault(
+                    PREFETCH_ATTR, {}
+                )
+                cache[name] = related[source_id]
+        children = [node for values in related.values() for node, _ in values]
+        _prefetch_level(items=children, tree=sub_tree)
+
+
+def _overrides_from_orm(schema: Type[BaseModel]) -> bool:
+    """Return True if the schema, or one of its bases, overrides from_orm."""
+    return schema.from_orm.__func__ is not BaseModel.from_orm.__func__
+
+
+def _same_relationship(
+    rel1: RelationshipDefinition, rel2: RelationshipDefinition
+) -> bool:
+    """Check if two relationships match the same edges."""
+    return (
+        rel1.definition["relation_type"] == rel2.definition["relation_type"]
+        and rel1.definition["direction"] == rel2.definition["direction"]
+    )
+
+
+def _with_subclasses(
+    models: List[Type[StructuredNode]],
+) -> List[Type[StructuredNode]]:
+    """Return the given models followed by all their subclasses."""
+    result = []
+    for model in models:
+        result.append(model)
+        result += _with_subclasses(model.__subclasses__())
+    return result
@@ -1,5 +1,8 @@
 from typing import List, Optional, Union
 
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+
 # from app.service.api.dependencies import valid_service_endpoint
 # from app.service.crud import (
 #     block_storage_service,
@@ -18,10 +21,11 @@ from typing import List, Optional, Union
 #     ComputeServiceReadExtended,
 #     IdentityServiceReadExtended,
 # )
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
+from app.crud_async import run_db_call
+from app.location.crud import location
 
 # from app.auth_method.schemas import AuthMethodCreate
 # from app.identity_provider.api.dependencies import (
@@ -41,7 +45,7 @@ from app.provider.api.dependencies import (
     valid_provider_id,
     validate_new_provider_values,
 )
-from app.provider.crud import provider
+from app.provider.crud import async_provider, provider
 from app.provider.models import Provider
 from app.provider.schemas import (
     ProviderQuery,
@@ -55,12 +59,22 @@ from app.provider.schemas_extended import (
     ProviderReadExtended,
     ProviderReadExtendedPublic,
 )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.provider.snapshot import get_snapshot
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    GeoQuery,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/providers", tags=["providers"])
+router = APIRouter(
+    prefix="/providers", tags=["providers"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -73,25 +87,73 @@ router = APIRouter(prefix="/providers", tags=["providers"])
     summary="Read all providers",
     description="Retrieve all providers stored in the database. \
         It is possible to filter on providers attributes and other \
-        common query parameters.",
+        common query parameters. It is also possible to filter providers \
+        by their distance from a point or by a bounding box and to sort \
+        them by distance.",
 )
-def get_providers(
+async def get_providers(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: ProviderQuery = Depends(),
+    geo: GeoQuery = Depends(),
 ):
-    items = provider.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    cypher_filters, cypher_sort = location.get_geo_filters(
+        geo=geo, path="({node})-[:DIVIDED_INTO]->()-[:LOCATED_AT]->(location)"
+    )
+    if stream:
+        return StreamingResponse(
+            provider.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                cypher_filters=cypher_filters,
+                cypher_sort=cypher_sort,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_provider.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_provider.get_multi(
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_provider.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_provider.count(
+            cypher_filters=cypher_filters, **item.dict(exclude_none=True)
+        )
     )
-    items = provider.paginate(items=items, page=page.page, size=page.size)
-    return provider.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_provider.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.write_transaction
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -109,7 +171,6 @@ def post_provider(item: ProviderCreateExtended):
     return provider.create(obj_in=item)
 
 
-@db.read_transaction
 @router.get(
     "/{provider_uid}",
     response_model=Union[
@@ -124,17 +185,26 @@ def post_provider(item: ProviderCreateExtended):
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_provider(
+async def get_provider(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Provider = Depends(valid_provider_id),
 ):
-    return provider.choose_out_schema(
+    if size.fields is not None:
+        items = await async_provider.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    if size.with_conn:
+        snapshot = await run_db_call(get_snapshot, uid=item.uid, auth=auth)
+        if snapshot is not None:
+            return Response(content=snapshot, media_type="application/json")
+    items = await async_provider.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{provider_uid}",
     status_code=status.HTTP_200_OK,
@@ -164,7 +234,6 @@ def put_provider(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{provider_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
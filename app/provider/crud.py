@@ -1,8 +1,15 @@
-from typing import Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from app.crud import CRUDBase
-from app.identity_provider.crud import identity_provider
-from app.project.crud import project
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from neomodel import StructuredNode
+
+from app.bulk import BulkWriter
+from app.cascade import CascadeStep, cascade_delete
+from app.crud import CRUDBase, register_write_hook
+from app.crud_async import AsyncCRUD
+from app.projection import read_tree
+from app.provider.diff import ProviderDiff, get_provider_tree
 from app.provider.models import Provider
 from app.provider.schemas import (
     ProviderCreate,
@@ -16,7 +23,47 @@ from app.provider.schemas_extended import (
     ProviderReadExtended,
     ProviderReadExtendedPublic,
 )
-from app.region.crud import region
+from app.provider.snapshot import (
+    delete_snapshots,
+    get_affected_provider_uids,
+    save_snapshot,
+)
+from app.region.crud import REGION_CASCADE
+
+# Nodes owned by the deleted provider: its projects, with their quotas and the SLAs
+# pointing only to them, its regions (see REGION_CASCADE) and the identity providers
+# used only by this provider, with their user groups and SLAs.
+PROVIDER_CASCADE = [
+    CascadeStep(
+        name="projects", source="providers", pattern="(s)-[:BOOK_PROJECT_FOR_SLA]->(x)"
+    ),
+    CascadeStep(
+        name="project_quotas",
+        source="projects",
+        pattern="(s)-[:USE_SERVICE_WITH]->(x)",
+    ),
+    CascadeStep(
+        name="project_slas",
+        source="projects",
+        pattern="(s)<-[:REFER_TO]-(x)",
+        condition="NOT EXISTS { MATCH (x)-[:REFER_TO]->(o) WHERE NOT o IN projects }",
+    ),
+    CascadeStep(name="regions", source="providers", pattern="(s)-[:DIVIDED_INTO]->(x)"),
+    *REGION_CASCADE,
+    CascadeStep(
+        name="identity_providers",
+        source="providers",
+        pattern="(s)-[:ALLOW_AUTH_THROUGH]->(x)",
+        condition="NOT EXISTS { MATCH (x)<-[:ALLOW_AUTH_THROUGH]-(o) "
+        "WHERE NOT o IN providers }",
+    ),
+    CascadeStep(
+        name="user_groups", source="identity_providers", pattern="(s)<-[:BELONG_TO]-(x)"
+    ),
+    CascadeStep(
+        name="user_group_slas", source="user_groups", pattern="(s)-[:AGREE]->(x)"
+    ),
+]
 
 
 class CRUDProvider(
@@ -38,31 +85,47 @@ class CRUDProvider(
 
         For each received project, identity provider and region, create the
         corresponding entity.
+
+        The whole tree is flattened into node and relationship batches written, in a
+        single transaction, with one UNWIND statement per label and per relationship
+        type (see ProviderDiff). The resulting graph is the one built creating each
+        entity through its CRUD object: identity providers and locations already in
+        the database are reused, flavors and images with the same UUID are created
+        once per provider and, when multiple user groups point to the same project,
+        only the last SLA is kept. User groups already belonging to an existing
+        identity provider and already existing locations are updated, after the bulk
+        write, through their CRUD objects.
         """
-        db_obj = super().create(obj_in=obj_in)
-        for item in obj_in.projects:
-            project.create(obj_in=item, provider=db_obj)
-        for item in obj_in.identity_providers:
-            identity_provider.create(obj_in=item, provider=db_obj)
-        for item in obj_in.regions:
-            region.create(obj_in=item, provider=db_obj)
+        writer = BulkWriter()
+        data = self.create_schema.parse_obj(obj_in).dict(exclude_none=True)
+        uid = writer.add_node(model=self.model, data=data)
+        diff = ProviderDiff(writer=writer, provider=(self.model, uid))
+        diff.apply(obj_in=obj_in)
+        writer.write()
+
+        db_obj = self.get(uid=uid)
+        diff.apply_deferred(provider=db_obj)
         return db_obj
 
     def remove(self, *, db_obj: Provider) -> bool:
         """Delete an existing provider and all its relationships.
 
-        At first delete its projects and regions. Then delete the identity providers who
-        point only to this provider. Finally delete the provider.
+        Delete its projects and regions and the identity providers who point only to
+        this provider (see remove_cascade).
         """
-        for item in db_obj.projects:
-            project.remove(db_obj=item)
-        for item in db_obj.regions:
-            region.remove(db_obj=item, from_provider=True)
-        for item in db_obj.identity_providers:
-            if len(item.providers) == 1:
-                identity_provider.remove(db_obj=item)
-        result = super().remove(db_obj=db_obj)
-        return result
+        return len(self.remove_cascade(db_obj=db_obj)) > 0
+
+    def remove_cascade(self, *, db_obj: Provider) -> Dict[str, int]:
+        """Delete the provider and the subgraph it exclusively owns with a single
+        statement and return the number of deleted nodes per label.
+
+        Shared nodes (identity providers used by other providers, SLAs pointing also
+        to projects of other providers, locations used by other regions) are only
+        disconnected.
+        """
+        return cascade_delete(
+            model=self.model, uid=db_obj.uid, root="providers", steps=PROVIDER_CASCADE
+        )
 
     def update(
         self,
@@ -74,109 +137,83 @@ class CRUDProvider(
         """Update Provider attributes.
 
         By default do not update relationships or default values. If force is True,
-        update linked projects, identity providers and apply default values when
-        explicit.
+        synchronize linked projects, identity providers and regions (see sync) and
+        apply default values when explicit.
         """
-        edit = False
         if force:
-            projects_updated = self.__update_projects(db_obj=db_obj, obj_in=obj_in)
-            idps_updated = self.__update_identity_providers(
-                db_obj=db_obj, obj_in=obj_in
-            )
-            regions_updated = self.__update_regions(db_obj=db_obj, obj_in=obj_in)
-            edit = projects_updated or idps_updated or regions_updated
+            return db_obj if self.sync(db_obj=db_obj, obj_in=obj_in) else None
 
         if isinstance(obj_in, ProviderCreateExtended):
             obj_in = ProviderUpdate.parse_obj(obj_in)
+        return super().update(db_obj=db_obj, obj_in=obj_in)
 
-        updated_data = super().update(db_obj=db_obj, obj_in=obj_in, force=force)
-        return db_obj if edit else updated_data
+    def sync(
+        self, *, db_obj: Provider, obj_in: ProviderCreateExtended
+    ) -> Dict[str, Dict[str, int]]:
+        """Make the stored provider, and its whole subgraph, match the received data.
 
-    def __update_projects(
-        self, *, obj_in: ProviderCreateExtended, db_obj: Provider
-    ) -> bool:
-        """Update provider linked projects.
+        Read the provider subgraph with a single query, compute in memory the items to
+        create, update and delete and write only them with batched statements, in a
+        single transaction (see ProviderDiff). Changes depending on data outside the
+        subgraph are then applied through the CRUD objects.
 
-        Connect new projects not already connect, leave untouched already linked ones
-        and delete old ones no more connected to the flavor.
+        Return, for each kind of change (created, updated, deleted, connected,
+        disconnected and, for the ones applied through the CRUD objects, delegated),
+        the number of items per label or relationship type. An empty summary means
+        nothing changed.
         """
-        edit = False
-        db_items = {db_item.uuid: db_item for db_item in db_obj.projects}
-        for item in obj_in.projects:
-            db_item = db_items.pop(item.uuid, None)
-            if not db_item:
-                project.create(obj_in=item, provider=db_obj)
-                edit = True
-            else:
-                updated_data = project.update(db_obj=db_item, obj_in=item, force=True)
-                if not edit and updated_data is not None:
-                    edit = True
-        for db_item in db_items.values():
-            project.remove(db_obj=db_item)
-            edit = True
-        return edit
-
-    def __update_identity_providers(
-        self, *, obj_in: ProviderCreateExtended, db_obj: Provider
-    ) -> bool:
-        """Update provider linked identity providers.
-
-        Connect new identity providers not already connect, leave untouched already
-        linked ones and delete/disconnect old ones no more connected to the provider.
+        tree = get_provider_tree()
+        db_item = read_tree(items=[db_obj], model=self.model, tree=tree)[0]
+        writer = BulkWriter()
+        diff = ProviderDiff(
+            writer=writer, provider=(self.model, db_obj.uid), db_item=db_item
+        )
+        diff.update_node(crud=self, obj_in=obj_in, db_item=db_item)
+        diff.apply(obj_in=obj_in)
+        summary = writer.get_summary()
+        writer.write()
+
+        delegated = diff.apply_deferred(provider=db_obj)
+        if delegated:
+            summary["delegated"] = delegated
+        if summary:
+            db_obj.refresh()
+        return summary
+
+    def save_snapshots(self, *, items: List[Provider]) -> None:
+        """Store the serialized extended reads, authenticated and public, of the
+        given providers.
+
+        Snapshots hold the body returned by GET /providers/{uid}?with_conn=true.
         """
-        edit = False
-        db_items = {db_item.endpoint: db_item for db_item in db_obj.identity_providers}
-        for item in obj_in.identity_providers:
-            db_item = db_items.pop(item.endpoint, None)
-            if not db_item:
-                identity_provider.create(obj_in=item, provider=db_obj)
-                edit = True
-            else:
-                updated_data = identity_provider.update(
-                    db_obj=db_item,
-                    obj_in=item,
-                    projects=db_obj.projects,
-                    provider=db_obj,
-                    force=True,
-                )
-                if not edit and updated_data is not None:
-                    edit = True
-        for db_item in db_items.values():
-            if len(db_item.providers) <= 1:
-                identity_provider.remove(db_obj=db_item)
-            else:
-                db_obj.identity_providers.disconnect(db_item)
-            edit = True
-        return edit
-
-    def __update_regions(
-        self, *, obj_in: ProviderCreateExtended, db_obj: Provider
-    ) -> bool:
-        """Update provider linked regions.
-
-        Connect new regions not already connect, leave untouched already linked ones and
-        delete old ones no more connected to the provider.
+        if not items:
+            return
+        extended = self.choose_out_schema(
+            items=items, auth=True, short=False, with_conn=True
+        )
+        extended_public = self.choose_out_schema(
+            items=items, auth=False, short=False, with_conn=True
+        )
+        for item, read, read_public in zip(items, extended, extended_public):
+            save_snapshot(
+                uid=item.uid,
+                extended=JSONResponse(jsonable_encoder(read)).body.decode(),
+                extended_public=JSONResponse(
+                    jsonable_encoder(read_public)
+                ).body.decode(),
+            )
+
+    def rebuild_snapshots(self) -> int:
+        """Delete all the provider snapshots and build them again.
+
+        Return the number of stored snapshots.
         """
-        edit = False
-        db_items = {db_item.name: db_item for db_item in db_obj.regions}
-        for item in obj_in.regions:
-            db_item = db_items.pop(item.name, None)
-            if not db_item:
-                region.create(obj_in=item, provider=db_obj)
-                edit = True
-            else:
-                updated_data = region.update(
-                    db_obj=db_item,
-                    obj_in=item,
-                    projects=db_obj.projects,
-                    force=True,
-                )
-                if not edit and updated_data is not None:
-                    edit = True
-        for db_item in db_items.values():
-            region.remove(db_obj=db_item, from_provider=True)
-            edit = True
-        return edit
+        delete_snapshots()
+        count = 0
+        for items in self.stream_multi():
+            self.save_snapshots(items=items)
+            count += len(items)
+        return count
 
 
 provider = CRUDProvider(
@@ -188,3 +225,32 @@ provider = CRUDProvider(
     read_extended_schema=ProviderReadExtended,
     read_extended_public_schema=ProviderReadExtendedPublic,
 )
+
+async_provider = AsyncCRUD(crud=provider)
+
+
+@register_write_hook
+def update_snapshots(db_obj: Optional[StructuredNode]) -> Callable[[Any], None]:
+    """Keep the snapshots of the providers affected by a CRUD write in sync.
+
+    The affected providers are looked up before the write, when updating or
+    removing an item, and after it, when the written item still exists. The
+    snapshots of the deleted providers are deleted, the other ones are rebuilt.
+    """
+    before = [] if db_obj is None else get_affected_provider_uids(node=db_obj)
+
+    def after(result: Any) -> None:
+        uids = list(before)
+        if isinstance(result, StructuredNode):
+            uids.extend(get_affected_provider_uids(node=result))
+        uids = list(dict.fromkeys(uids))
+        if not uids:
+            return
+        items = provider.get_multi(uid__in=uids)
+        found = {i.uid for i in items}
+        deleted = [i for i in uids if i not in found]
+        if deleted:
+            delete_snapshots(uids=deleted)
+        provider.save_snapshots(items=items)
+
+    return after
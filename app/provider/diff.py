@@ -0,0 +1,687 @@
+from collections import defaultdict
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel
+
+from app.bulk import BulkWriter, NodeRef
+from app.crud import CRUDBase
+from app.flavor.crud import flavor
+from app.identity_provider.crud import identity_provider
+from app.image.crud import image
+from app.location.crud import location
+from app.location.schemas import LocationCreate
+from app.network.crud import network
+from app.project.crud import project
+from app.projection import NamesTree, RelationsTree, get_names_tree
+from app.provider.models import Provider
+from app.provider.schemas_extended import (
+    FlavorCreateExtended,
+    IdentityProviderCreateExtended,
+    ImageCreateExtended,
+    NetworkCreateExtended,
+    ProviderCreateExtended,
+    RegionCreateExtended,
+    SLACreateExtended,
+    UserGroupCreateExtended,
+)
+from app.quota.crud import block_storage_quota, compute_quota, network_quota
+from app.region.crud import region
+from app.service.crud import (
+    block_storage_service,
+    compute_service,
+    identity_service,
+    network_service,
+)
+from app.service.enum import ServiceType
+from app.sla.crud import sla
+from app.user_group.crud import user_group
+
+# Relationships read to compare the stored provider with the received one.
+PROVIDER_TREE: NamesTree = {
+    "projects": {"quotas": {}, "sla": {"projects": {}}},
+    "identity_providers": {"providers": {}, "user_groups": {"slas": {"projects": {}}}},
+    "regions": {
+        "location": {"regions": {}},
+        "services": {
+            "flavors": {"services": {}},
+            "images": {"services": {}},
+            "networks": {},
+            "quotas": {"project": {}},
+        },
+    },
+}
+
+# Service and quota CRUD objects for each service type.
+SERVICES: Dict[str, Tuple[CRUDBase, Optional[CRUDBase]]] = {
+    ServiceType.BLOCK_STORAGE.value: (block_storage_service, block_storage_quota),
+    ServiceType.COMPUTE.value: (compute_service, compute_quota),
+    ServiceType.IDENTITY.value: (identity_service, None),
+    ServiceType.NETWORK.value: (network_service, network_quota),
+}
+
+DbItem = Dict[str, Any]
+
+
+@lru_cache
+def get_provider_tree() -> RelationsTree:
+    """Return the relationships to traverse to read a provider subgraph."""
+    return get_names_tree(models=[Provider], names=PROVIDER_TREE)
+
+
+class ProviderDiff:
+    """Queue on a bulk writer the changes turning the stored provider subgraph into
+    the received one.
+
+    The stored subgraph is the hydrated result of a projection following
+    PROVIDER_TREE; it is empty when the provider is new. Items are matched on the
+    keys used by the CRUD update methods and the same rules decide whether to create,
+    update, connect, disconnect or delete them. Changes depending on data outside
+    the subgraph (user groups of existing identity providers, SLAs pointing to a new
+    document, locations shared with other providers) are deferred to the CRUD
+    objects and applied after the bulk write.
+    """
+
+    def __init__(
+        self,
+        *,
+        writer: BulkWriter,
+        provider: NodeRef,
+        db_item: Optional[DbItem] = None,
+    ) -> None:
+        self.writer = writer
+        self.provider = provider
+        self.db_item = db_item or {
+            "projects": [],
+            "identity_providers": [],
+            "regions": [],
+        }
+        self.projects: Dict[str, NodeRef] = {}
+        self.new_projects: Set[str] = set()
+        self.slas: Dict[str, Tuple[NodeRef, SLACreateExtended]] = {}
+        self.locations: Dict[str, NodeRef] = {}
+        self.vm_items: Dict[str, Dict[str, NodeRef]] = {"flavors": {}, "images": {}}
+        self.deferred: List[Tuple[str, Callable[[Provider], Any]]] = []
+
+        # Flavors, images and locations are shared between services and regions:
+        # track their links to delete them only when no one is left.
+        self.links: Dict[str, Set[str]] = defaultdict(set)
+        self.unlinked: List[Tuple[NodeRef, str, NodeRef, bool]] = []
+        for db_region in self.db_item["regions"]:
+            db_location = db_region["location"]
+            if db_location is not None:
+                self.links[db_location["uid"]] = {
+                    i["uid"] for i in db_location["regions"]
+                }
+            for db_service in db_region["services"]:
+                for name, crud in (("flavors", flavor), ("images", image)):
+                    for db_vm_item in db_service[name]:
+                        uid = db_vm_item["uid"]
+                        self.vm_items[name][db_vm_item["uuid"]] = (crud.model, uid)
+                        self.links[uid] = {i["uid"] for i in db_vm_item["services"]}
+
+    def add_node(self, *, crud: CRUDBase, obj_in: BaseModel) -> NodeRef:
+        """Queue the creation of a node, with the data CRUDBase.create would use."""
+        obj_in = crud.create_schema.parse_obj(obj_in)
+        uid = self.writer.add_node(
+            model=crud.model, data=obj_in.dict(exclude_none=True)
+        )
+        return crud.model, uid
+
+    def update_node(
+        self, *, crud: CRUDBase, obj_in: BaseModel, db_item: DbItem
+    ) -> None:
+        """Queue the update of the stored properties differing from the received ones.
+
+        As done by a forced CRUDBase.update, default values are applied too and
+        properties derived from the other ones, if any, are recomputed.
+        """
+        data = crud.create_schema.parse_obj(obj_in).dict()
+        properties = dict(crud.model.__all_properties__)
+        changes = {
+            k: v
+            for k, v in data.items()
+            if k in properties and k != "uid" and db_item.get(k) != v
+        }
+        if changes and hasattr(crud.model, "derive_properties"):
+            changes.update(crud.model.derive_properties(data))
+        if changes:
+            self.writer.update_node(model=crud.model, uid=db_item["uid"], data=changes)
+
+    def apply(self, *, obj_in: ProviderCreateExtended) -> None:
+        """Queue the changes on projects, identity providers and regions."""
+        self.__diff_projects(items=obj_in.projects)
+        self.__diff_identity_providers(items=obj_in.identity_providers)
+        self.__diff_regions(items=obj_in.regions)
+        self.__remove_unlinked()
+        self.__add_slas()
+
+    def apply_deferred(self, *, provider: Provider) -> Dict[str, int]:
+        """Apply the deferred changes and return, per label, how many of them changed
+        the database.
+        """
+        changes: Dict[str, int] = defaultdict(int)
+        for label, func in self.deferred:
+            if func(provider) is not None:
+                changes[label] += 1
+        return dict(changes)
+
+    def __defer(self, *, crud: CRUDBase, func: Callable[[Provider], Any]) -> None:
+        """Register a change to apply through a CRUD object after the bulk write."""
+        self.deferred.append((crud.model.__label__, func))
+
+    def __diff_projects(self, *, items: List[BaseModel]) -> None:
+        """Create new projects, update existing ones and delete the missing ones with
+        their quotas and SLAs not pointing to other projects.
+        """
+        db_items = {i["uuid"]: i for i in self.db_item["projects"]}
+        for item in items:
+            db_item = db_items.pop(item.uuid, None)
+            if db_item is None:
+                item_ref = self.add_node(crud=project, obj_in=item)
+                self.writer.connect(
+                    source=item_ref, name="provider", target=self.provider
+                )
+                self.new_projects.add(item.uuid)
+            else:
+                item_ref = (project.model, db_item["uid"])
+                self.update_node(crud=project, obj_in=item, db_item=db_item)
+            self.projects[item.uuid] = item_ref
+
+        for db_item in db_items.values():
+            for db_quota in db_item["quotas"]:
+                # Quota types match the types of the services they apply to.
+                _, quota_crud = SERVICES[db_quota["type"]]
+                self.writer.delete_node(model=quota_crud.model, uid=db_quota["uid"])
+            db_sla = db_item["sla"]
+            if db_sla is not None and len(db_sla["projects"]) == 1:
+                self.writer.delete_node(model=sla.model, uid=db_sla["uid"])
+            self.writer.delete_node(model=project.model, uid=db_item["uid"])
+
+    def __diff_identity_providers(
+        self, *, items: List[IdentityProviderCreateExtended]
+    ) -> None:
+        """Connect new identity providers, update the linked ones and delete, or
+        disconnect when used by other providers, the missing ones.
+
+        Identity providers not linked to this provider but already in the database
+        are read with a single query and reused.
+        """
+        db_items = {i["endpoint"]: i for i in self.db_item["identity_providers"]}
+        endpoints = [i.endpoint for i in items if i.endpoint not in db_items]
+        others = {}
+        if endpoints:
+            others = {
+                i.endpoint: i
+                for i in identity_provider.get_multi(endpoint__in=endpoints)
+            }
+
+        for item in items:
+            db_item = db_items.pop(item.endpoint, None)
+            if db_item is not None:
+                self.__update_identity_provider(item=item, db_item=db_item)
+                continue
+            other = others.get(item.endpoint)
+            if other is None:
+                item_ref = self.add_node(crud=identity_provider, obj_in=item)
+                db_user_groups = {}
+            else:
+                item_ref = (identity_provider.model, other.uid)
+                db_user_groups = {i.name: i.uid for i in other.user_groups}
+            self.writer.connect(
+                source=item_ref,
+                name="providers",
+                target=self.provider,
+                properties=item.relationship.dict(),
+            )
+            for user_group_in in item.user_groups:
+                uid = db_user_groups.get(user_group_in.name)
+                if uid is None:
+                    self.__add_user_group(
+                        item=user_group_in, identity_provider=item_ref
+                    )
+                else:
+                    self.__defer_user_group_update(uid=uid, item=user_group_in)
+
+        for db_item in db_items.values():
+            item_ref = (identity_provider.model, db_item["uid"])
+            if len(db_item["providers"]) <= 1:
+                for db_user_group in db_item["user_groups"]:
+                    self.__remove_user_group(db_item=db_user_group)
+                self.writer.delete_node(model=item_ref[0], uid=item_ref[1])
+            else:
+                self.writer.disconnect(
+                    source=item_ref, name="providers", target=self.provider
+                )
+
+    def __update_identity_provider(
+        self, *, item: IdentityProviderCreateExtended, db_item: DbItem
+    ) -> None:
+        """Update the identity provider, its relationship with the provider and its
+        user groups.
+        """
+        item_ref = (identity_provider.model, db_item["uid"])
+        self.update_node(crud=identity_provider, obj_in=item, db_item=db_item)
+        db_rel = db_item["relationship"]
+        if (
+            db_rel.idp_name != item.relationship.idp_name
+            or db_rel.protocol != item.relationship.protocol
+        ):
+            self.writer.disconnect(
+                source=item_ref, name="providers", target=self.provider
+            )
+            self.writer.connect(
+                source=item_ref,
+                name="providers",
+                target=self.provider,
+                properties=item.relationship.dict(),
+            )
+
+        db_user_groups = {i["name"]: i for i in db_item["user_groups"]}
+        for user_group_in in item.user_groups:
+            db_user_group = db_user_groups.pop(user_group_in.name, None)
+            if db_user_group is None:
+                self.__add_user_group(item=user_group_in, identity_provider=item_ref)
+            else:
+                self.__update_user_group(item=user_group_in, db_item=db_user_group)
+        for db_user_group in db_user_groups.values():
+            self.__remove_user_group(db_item=db_user_group)
+
+    def __add_user_group(
+        self, *, item: UserGroupCreateExtended, identity_provider: NodeRef
+    ) -> None:
+        """Queue a user group and its SLA.
+
+        When the target project is already stored, it may already have an SLA to
+        replace: the user group is created through its CRUD object.
+        """
+        if item.sla.project not in self.new_projects:
+            self.__defer(
+                crud=user_group,
+                func=partial(
+                    self.__create_user_group, item=item, uid=identity_provider[1]
+                ),
+            )
+            return
+        item_ref = self.add_node(crud=user_group, obj_in=item)
+        self.writer.connect(
+            source=item_ref, name="identity_provider", target=identity_provider
+        )
+        # A project has only one SLA: the last one replaces the previous ones.
+        self.slas[item.sla.project] = (item_ref, item.sla)
+
+    def __update_user_group(
+        self, *, item: UserGroupCreateExtended, db_item: DbItem
+    ) -> None:
+        """Update the user group and its SLA pointing to this provider.
+
+        When there is no such SLA or it refers to another document, the user group is
+        updated through its CRUD object.
+        """
+        project_uids = {i[1] for i in self.projects.values()}
+        db_sla = next(
+            (
+                i
+                for i in db_item["slas"]
+                if any(p["uid"] in project_uids for p in i["projects"])
+            ),
+            None,
+        )
+        if db_sla is None or db_sla["doc_uuid"] != item.sla.doc_uuid:
+            self.__defer_user_group_update(uid=db_item["uid"], item=item)
+            return
+
+        self.update_node(crud=user_group, obj_in=item, db_item=db_item)
+        self.update_node(crud=sla, obj_in=item.sla, db_item=db_sla)
+        sla_ref = (sla.model, db_sla["uid"])
+        db_project = next(p for p in db_sla["projects"] if p["uid"] in project_uids)
+        if db_project["uuid"] != item.sla.project:
+            self.writer.disconnect(
+                source=sla_ref,
+                name="projects",
+                target=(project.model, db_project["uid"]),
+            )
+            self.writer.connect(
+                source=sla_ref, name="projects", target=self.projects[item.sla.project]
+            )
+
+    def __remove_user_group(self, *, db_item: DbItem) -> None:
+        """Queue the deletion of a user group and its SLAs."""
+        for db_sla in db_item["slas"]:
+            self.writer.delete_node(model=sla.model, uid=db_sla["uid"])
+        self.writer.delete_node(model=user_group.model, uid=db_item["uid"])
+
+    def __defer_user_group_update(
+        self, *, uid: str, item: UserGroupCreateExtended
+    ) -> None:
+        """Register a forced update of a stored user group."""
+        self.__defer(
+            crud=user_group,
+            func=partial(self.__update_stored_user_group, item=item, uid=uid),
+        )
+
+    def __add_slas(self) -> None:
+        """Queue the SLAs of the new user groups pointing to new projects."""
+        for project_uuid, (user_group_ref, sla_in) in self.slas.items():
+            sla_ref = self.add_node(crud=sla, obj_in=sla_in)
+            self.writer.connect(
+                source=sla_ref, name="user_group", target=user_group_ref
+            )
+            self.writer.connect(
+                source=sla_ref, name="projects", target=self.projects[project_uuid]
+            )
+
+    def __diff_regions(self, *, items: List[RegionCreateExtended]) -> None:
+        """Create new regions, update existing ones and delete the missing ones.
+
+        Locations already in the database are read with a single query and reused.
+        """
+        sites = [i.location.site for i in items if i.location is not None]
+        if sites:
+            self.locations = {
+                i.site: (location.model, i.uid)
+                for i in location.get_multi(site__in=sites)
+            }
+
+        db_items = {i["name"]: i for i in self.db_item["regions"]}
+        for item in items:
+            db_item = db_items.pop(item.name, None)
+            if db_item is None:
+                self.__add_region(item=item)
+            else:
+                self.__update_region(item=item, db_item=db_item)
+        for db_item in db_items.values():
+            self.__remove_region(db_item=db_item)
+
+    def __add_region(self, *, item: RegionCreateExtended) -> None:
+        """Queue a region, its location and its services."""
+        item_ref = self.add_node(crud=region, obj_in=item)
+        self.writer.connect(source=item_ref, name="provider", target=self.provider)
+        if item.location is not None:
+            self.__add_location(item=item.location, region=item_ref)
+        for service_in in self.__get_services(item=item):
+            self.__add_service(item=service_in, region=item_ref)
+
+    def __update_region(self, *, item: RegionCreateExtended, db_item: DbItem) -> None:
+        """Update the region, replace or update its location and create, update or
+        delete its services.
+        """
+        item_ref = (region.model, db_item["uid"])
+        self.update_node(crud=region, obj_in=item, db_item=db_item)
+
+        db_location = db_item["location"]
+        site = item.location.site if item.location is not None else None
+        if db_location is not None and db_location["site"] != site:
+            self.__unlink(
+                item=(location.model, db_location["uid"]),
+                name="regions",
+                target=item_ref,
+                disconnect=True,
+            )
+        if item.location is not None:
+            if db_location is None or db_location["site"] != site:
+                self.__add_location(item=item.location, region=item_ref)
+            else:
+                self.update_node(
+                    crud=location, obj_in=item.location, db_item=db_location
+                )
+
+        db_services = {(i["type"], i["endpoint"]): i for i in db_item["services"]}
+        for service_in in self.__get_services(item=item):
+            db_service = db_services.pop((service_in.type, service_in.endpoint), None)
+            if db_service is None:
+                self.__add_service(item=service_in, region=item_ref)
+                continue
+            crud, _ = SERVICES[service_in.type]
+            self.update_node(crud=crud, obj_in=service_in, db_item=db_service)
+            self.__diff_service_items(
+                item=service_in,
+                service=(crud.model, db_service["uid"]),
+                db_item=db_service,
+            )
+        for db_service in db_services.values():
+            self.__remove_service(db_item=db_service)
+
+    def __remove_region(self, *, db_item: DbItem) -> None:
+        """Queue the deletion of a region, its services and its location when not used
+        by other regions.
+        """
+        item_ref = (region.model, db_item["uid"])
+        for db_service in db_item["services"]:
+            self.__remove_service(db_item=db_service)
+        db_location = db_item["location"]
+        if db_location is not None:
+            self.__unlink(
+                item=(location.model, db_location["uid"]),
+                name="regions",
+                target=item_ref,
+                disconnect=False,
+            )
+        self.writer.delete_node(model=item_ref[0], uid=item_ref[1])
+
+    def __add_location(self, *, item: LocationCreate, region: NodeRef) -> None:
+        """Connect the region to the location with the same site, if any, otherwise
+        queue a new location.
+
+        Already existing locations are updated through their CRUD object.
+        """
+        item_ref = self.locations.get(item.site)
+        if item_ref is None:
+            item_ref = self.add_node(crud=location, obj_in=item)
+            self.locations[item.site] = item_ref
+        else:
+            self.__defer(crud=location, func=partial(self.__update_location, item=item))
+        self.__link(item=item_ref, name="regions", target=region)
+
+    def __get_services(self, *, item: RegionCreateExtended) -> List[BaseModel]:
+        """Return all the region services."""
+        return [
+            *item.block_storage_services,
+            *item.compute_services,
+            *item.identity_services,
+            *item.network_services,
+        ]
+
+    def __add_service(self, *, item: BaseModel, region: NodeRef) -> None:
+        """Queue a service, its connection to the region and its items."""
+        crud, _ = SERVICES[item.type]
+        item_ref = self.add_node(crud=crud, obj_in=item)
+        self.writer.connect(source=item_ref, name="region", target=region)
+        self.__diff_service_items(item=item, service=item_ref)
+
+    def __diff_service_items(
+        self, *, item: BaseModel, service: NodeRef, db_item: Optional[DbItem] = None
+    ) -> None:
+        """Create, update or delete the service flavors, images, networks and quotas."""
+        db_item = db_item or {}
+        for name, crud in (("flavors", flavor), ("images", image)):
+            self.__diff_vm_items(
+                crud=crud,
+                name=name,
+                items=getattr(item, name, []),
+                service=service,
+                db_items=db_item.get(name, []),
+            )
+        self.__diff_networks(
+            items=getattr(item, "networks", []),
+            service=service,
+            db_items=db_item.get("networks", []),
+        )
+        _, quota_crud = SERVICES[item.type]
+        if quota_crud is not None:
+            self.__diff_quotas(
+                crud=quota_crud,
+                items=item.quotas,
+                service=service,
+                db_items=db_item.get("quotas", []),
+            )
+
+    def __remove_service(self, *, db_item: DbItem) -> None:
+        """Queue the deletion of a service, its quotas and networks and its flavors and
+        images when not used by other services.
+        """
+        crud, quota_crud = SERVICES[db_item["type"]]
+        item_ref = (crud.model, db_item["uid"])
+        for db_quota in db_item["quotas"]:
+            self.writer.delete_node(model=quota_crud.model, uid=db_quota["uid"])
+        for name, vm_crud in (("flavors", flavor), ("images", image)):
+            for db_vm_item in db_item[name]:
+                self.__unlink(
+                    item=(vm_crud.model, db_vm_item["uid"]),
+                    name="services",
+                    target=item_ref,
+                    disconnect=False,
+                )
+        for db_network in db_item["networks"]:
+            self.writer.delete_node(model=network.model, uid=db_network["uid"])
+        self.writer.delete_node(model=item_ref[0], uid=item_ref[1])
+
+    def __diff_vm_items(
+        self,
+        *,
+        crud: CRUDBase,
+        name: str,
+        items: List[Union[FlavorCreateExtended, ImageCreateExtended]],
+        service: NodeRef,
+        db_items: List[DbItem],
+    ) -> None:
+        """Connect new flavors or images, update existing ones and disconnect the
+        missing ones.
+
+        Items with the same UUID are created once per provider: the already existing
+        ones are just connected to the service and the received projects. Items no
+        more used by any service are deleted.
+        """
+        db_items = {i["uuid"]: i for i in db_items}
+        for item in items:
+            db_item = db_items.pop(item.uuid, None)
+            if db_item is not None:
+                self.update_node(crud=crud, obj_in=item, db_item=db_item)
+                continue
+            item_ref = self.vm_items[name].get(item.uuid)
+            if item_ref is None:
+                item_ref = self.add_node(crud=crud, obj_in=item)
+                self.vm_items[name][item.uuid] = item_ref
+            self.__link(item=item_ref, name="services", target=service)
+            for project_uuid in item.projects:
+                project_ref = self.projects.get(project_uuid)
+                if project_ref is not None:
+                    self.writer.connect(
+                        source=item_ref, name="projects", target=project_ref
+                    )
+        for db_item in db_items.values():
+            self.__unlink(
+                item=(crud.model, db_item["uid"]),
+                name="services",
+                target=service,
+                disconnect=True,
+            )
+
+    def __diff_networks(
+        self,
+        *,
+        items: List[NetworkCreateExtended],
+        service: NodeRef,
+        db_items: List[DbItem],
+    ) -> None:
+        """Create new networks, update existing ones and delete the missing ones."""
+        db_items = {i["uuid"]: i for i in db_items}
+        for item in items:
+            db_item = db_items.pop(item.uuid, None)
+            if db_item is not None:
+                self.update_node(crud=network, obj_in=item, db_item=db_item)
+                continue
+            item_ref = self.add_node(crud=network, obj_in=item)
+            self.writer.connect(source=item_ref, name="service", target=service)
+            project_ref = self.projects.get(item.project)
+            if project_ref is not None:
+                self.writer.connect(source=item_ref, name="project", target=project_ref)
+        for db_item in db_items.values():
+            self.writer.delete_node(model=network.model, uid=db_item["uid"])
+
+    def __diff_quotas(
+        self,
+        *,
+        crud: CRUDBase,
+        items: List[BaseModel],
+        service: NodeRef,
+        db_items: List[DbItem],
+    ) -> None:
+        """Create new quotas, update existing ones and delete the missing ones.
+
+        Quotas are identified by their target project and by the 'per_user' flag.
+        Quotas not pointing to one of the provider projects are discarded.
+        """
+        db_items = {
+            (i["per_user"], i["project"]["uuid"] if i["project"] else None): i
+            for i in db_items
+        }
+        for item in items:
+            db_item = db_items.pop((item.per_user, item.project), None)
+            if db_item is not None:
+                self.update_node(crud=crud, obj_in=item, db_item=db_item)
+                continue
+            project_ref = self.projects.get(item.project)
+            if project_ref is not None:
+                item_ref = self.add_node(crud=crud, obj_in=item)
+                self.writer.connect(source=item_ref, name="service", target=service)
+                self.writer.connect(source=item_ref, name="project", target=project_ref)
+        for db_item in db_items.values():
+            self.writer.delete_node(model=crud.model, uid=db_item["uid"])
+
+    def __link(self, *, item: NodeRef, name: str, target: NodeRef) -> None:
+        """Queue the relationship between a shared item and its target."""
+        self.writer.connect(source=item, name=name, target=target)
+        self.links[item[1]].add(target[1])
+
+    def __unlink(
+        self, *, item: NodeRef, name: str, target: NodeRef, disconnect: bool
+    ) -> None:
+        """Register the removal of the relationship between a shared item and its
+        target.
+
+        'disconnect' is False when the target is deleted.
+        """
+        self.links[item[1]].discard(target[1])
+        self.unlinked.append((item, name, target, disconnect))
+
+    def __remove_unlinked(self) -> None:
+        """Queue the deletion of the shared items without links, and the deletion of
+        the relationships of the others.
+
+        Links are checked once all the changes have been computed, since an item
+        removed from a service or region can be added to another one.
+        """
+        for item, name, target, disconnect in self.unlinked:
+            if not self.links[item[1]]:
+                self.writer.delete_node(model=item[0], uid=item[1])
+            elif disconnect:
+                self.writer.disconnect(source=item, name=name, target=target)
+
+    @staticmethod
+    def __create_user_group(
+        provider: Provider, *, item: UserGroupCreateExtended, uid: str
+    ) -> Any:
+        """Create a user group of a stored identity provider."""
+        return user_group.create(
+            obj_in=item,
+            identity_provider=identity_provider.get(uid=uid),
+            projects=provider.projects,
+        )
+
+    @staticmethod
+    def __update_stored_user_group(
+        provider: Provider, *, item: UserGroupCreateExtended, uid: str
+    ) -> Any:
+        """Force the update of a stored user group and of its SLAs."""
+        return user_group.update(
+            db_obj=user_group.get(uid=uid),
+            obj_in=item,
+            projects=provider.projects,
+            force=True,
+        )
+
+    @staticmethod
+    def __update_location(provider: Provider, *, item: LocationCreate) -> Any:
+        """Update a stored location shared with the provider regions."""
+        return location.update(db_obj=location.get(site=item.site), obj_in=item)
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import List, Optional
+
+from neomodel import StructuredNode, db
+
+from app.projection import get_relations_tree, get_tree_paths
+from app.provider.models import Provider
+from app.provider.schemas_extended import (
+    ProviderReadExtended,
+    ProviderReadExtendedPublic,
+)
+
+SNAPSHOT_LABEL = "ProviderSnapshot"
+
+SNAPSHOT_CONSTRAINT = (
+    "CREATE CONSTRAINT provider_snapshot_provider_uid_unique IF NOT EXISTS "
+    f"FOR (s:{SNAPSHOT_LABEL}) REQUIRE s.provider_uid IS UNIQUE"
+)
+
+
+def save_snapshot(*, uid: str, extended: str, extended_public: str) -> None:
+    """Store the serialized extended reads, authenticated and public, of a provider."""
+    db.cypher_query(
+        f"MERGE (s:{SNAPSHOT_LABEL} {{provider_uid: $uid}}) "
+        "SET s.extended = $extended, s.extended_public = $extended_public",
+        {"uid": uid, "extended": extended, "extended_public": extended_public},
+    )
+
+
+def get_snapshot(*, uid: str, auth: bool) -> Optional[str]:
+    """Return the serialized extended read of a provider, if materialized."""
+    prop = "extended" if auth else "extended_public"
+    results, _ = db.cypher_query(
+        f"MATCH (s:{SNAPSHOT_LABEL} {{provider_uid: $uid}}) RETURN s.{prop}",
+        {"uid": uid},
+    )
+    return results[0][0] if results else None
+
+
+def delete_snapshots(*, uids: Optional[List[str]] = None) -> None:
+    """Delete the snapshots of the given providers, all of them if None."""
+    if uids is None:
+        db.cypher_query(f"MATCH (s:{SNAPSHOT_LABEL}) DELETE s")
+        return
+    db.cypher_query(
+        f"MATCH (s:{SNAPSHOT_LABEL}) WHERE s.provider_uid IN $uids DELETE s",
+        {"uids": uids},
+    )
+
+
+@lru_cache
+def get_affected_providers_query() -> str:
+    """Return the query finding the providers whose extended read contains a node.
+
+    The node is either a provider or is reached walking backwards one of the paths
+    of the extended read tree. Writes on a provider may change the identity
+    providers it shares, which are part of the extended read of the other providers
+    using them.
+    """
+    tree = get_relations_tree(
+        models=[Provider], schemas=[ProviderReadExtended, ProviderReadExtendedPublic]
+    )
+    shared = "-[:ALLOW_AUTH_THROUGH]->()<-[:ALLOW_AUTH_THROUGH]-"
+    lists = [
+        "CASE WHEN x:Provider THEN [x.uid] ELSE [] END",
+        f"[(x:Provider){shared}(p:Provider) | p.uid]",
+        *(f"[(p:Provider){i[:-2]}(x) | p.uid]" for i in get_tree_paths(tree=tree)),
+    ]
+    return f"MATCH (x) WHERE id(x) = $id RETURN {' + '.join(lists)}"
+
+
+def get_affected_provider_uids(*, node: StructuredNode) -> List[str]:
+    """Return the uids of the providers whose extended read contains the node."""
+    results, _ = db.cypher_query(get_affected_providers_query(), {"id": node.id})
+    return list(dict.fromkeys(results[0][0])) if results else []
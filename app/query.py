@@ -1,8 +1,12 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
 from datetime import datetime
 from enum import Enum
-from typing import Optional, get_origin
+from typing import Any, Dict, List, Optional, Tuple, get_origin
 
-from pydantic import BaseModel, Field, create_model, root_validator
+from fastapi import Header, HTTPException, status
+from pydantic import BaseModel, Field, create_model, root_validator, validator
 from pydantic.fields import SHAPE_LIST
 
 from app.models import BaseNodeQuery
@@ -18,11 +22,46 @@ class SchemaSize(BaseModel):
         default=False,
         description="Show all related items. This flag overwrite the `short` flag",
     )
+    fields: Optional[str] = Field(
+        default=None,
+        description="Comma separated list of attributes to return. The `uid` is \
+            always returned. Unknown attributes, relationships and attributes not \
+            visible to the user are ignored. This flag overwrite the `short` and \
+            `with_conn` flags",
+    )
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def is_ndjson_accepted(
+    accept: Optional[str] = Header(
+        default=None,
+        description=f"Set to `{NDJSON_MEDIA_TYPE}` to receive items as a stream \
+            of newline delimited JSON objects. Streamed items are read after the \
+            request transaction commits, in a database session of their own, so \
+            they may include changes committed in the meantime; the response has \
+            no `ETag`, `X-Total-Count` and `X-Next-Cursor` headers.",
+    ),
+) -> bool:
+    """Check if the client asks for a newline delimited JSON stream."""
+    if accept is None:
+        return False
+    media_types = [i.split(";")[0].strip() for i in accept.split(",")]
+    return NDJSON_MEDIA_TYPE in media_types
 
 
 class Pagination(BaseModel):
     page: int = 0
     size: Optional[int] = None
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Keyset pagination cursor. Pass an empty value to start \
+            reading from the first item, then the value returned in the \
+            `X-Next-Cursor` response header to read the following page. \
+            When set, `page` and `skip` are ignored and the sort rule \
+            stored in the cursor takes precedence over `sort`.",
+    )
 
     @root_validator(pre=True)
     def set_page_to_0(cls, values):
@@ -30,6 +69,49 @@ class Pagination(BaseModel):
             values["page"] = 0
         return values
 
+    @validator("cursor")
+    def check_cursor(cls, v: Optional[str]) -> Optional[str]:
+        """Reject malformed cursors with a `bad request` error."""
+        if v:
+            try:
+                decode_cursor(v)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid cursor '{v}'",
+                ) from e
+        return v
+
+
+def encode_cursor(*, sort: Optional[str], values: List[Any]) -> str:
+    """Encode the sort rule and the sort key values of the last returned item."""
+    data = json.dumps({"sort": sort, "values": values}, separators=(",", ":"))
+    return urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], List[Any]]:
+    """Decode a cursor into the sort rule and the sort key values it refers to.
+
+    An empty cursor corresponds to the first page: it has no sort rule and no values.
+    Raise a ValueError if the cursor is malformed.
+    """
+    if not cursor:
+        return None, []
+    try:
+        data = json.loads(urlsafe_b64decode(cursor.encode()))
+        sort, values = data["sort"], data["values"]
+    except (BinasciiError, KeyError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed cursor: {cursor}") from e
+    if sort is not None and not isinstance(sort, str):
+        raise ValueError(f"Malformed cursor sort rule: {sort}")
+    if not isinstance(values, list) or len(values) not in (1, 2):
+        raise ValueError(f"Malformed cursor values: {values}")
+    if not isinstance(values[-1], str) or not all(
+        v is None or isinstance(v, (str, int, float, bool)) for v in values
+    ):
+        raise ValueError(f"Malformed cursor values: {values}")
+    return sort, values
+
 
 class DbQueryCommonParams(BaseModel):
     """Model to add common query attributes."""
@@ -62,6 +144,93 @@ class DbQueryCommonParams(BaseModel):
         return values
 
 
+class CypherFilter(BaseModel):
+    """Raw Cypher condition, referring to the item node as {node}, and its
+    parameters.
+
+    Used for filters neomodel cannot express, such as relationship patterns.
+    """
+
+    condition: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class CypherSort(BaseModel):
+    """Raw Cypher expression, referring to the item node as {node}, sorting the items
+    in ascending order, and its parameters.
+
+    Used for sort keys neomodel cannot express, such as distances.
+    """
+
+    expression: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+def parse_floats(*, name: str, value: str, count: int) -> List[float]:
+    """Parse a comma separated list of floats with the given length.
+
+    Raise a `bad request` error if the value is malformed.
+    """
+    try:
+        values = [float(i) for i in value.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {name} '{value}': expected {count} comma separated "
+            "numbers",
+        )
+    return values
+
+
+class GeoQuery(BaseModel):
+    """Model to add proximity and bounding box filters on locations."""
+
+    near: Optional[str] = Field(
+        default=None,
+        description="Reference point, as `latitude,longitude`, of the `radius_km` \
+            filter and of the distance sorting.",
+    )
+    radius_km: Optional[float] = Field(
+        default=None, gt=0, description="Maximum distance (km) from the `near` point."
+    )
+    bbox: Optional[str] = Field(
+        default=None,
+        description="Bounding box, as `min_latitude,min_longitude,max_latitude,\
+            max_longitude`, containing the locations.",
+    )
+    sort_by_distance: bool = Field(
+        default=False,
+        description="Sort items by increasing distance from the `near` point. \
+            Ignored when using a cursor.",
+    )
+
+    @validator("near")
+    def check_near(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            parse_floats(name="near", value=v, count=2)
+        return v
+
+    @validator("bbox")
+    def check_bbox(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            parse_floats(name="bbox", value=v, count=4)
+        return v
+
+    @root_validator
+    def check_near_is_set(cls, values):
+        """Reject distance filters and sorting without a reference point."""
+        if values.get("near") is None and (
+            values.get("radius_km") is not None or values.get("sort_by_distance")
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'radius_km' and 'sort_by_distance' require 'near'",
+            )
+        return values
+
+
 def create_query_model(model_name: str, base_model: BaseModel):
     """Create a Query Model with the given model name and starting from the received
     base model.
@@ -1,10 +1,18 @@
 from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.crud_async import run_db_call
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 from app.quota.api.dependencies import (
     valid_block_storage_quota_id,
     valid_compute_quota_id,
@@ -13,7 +21,16 @@ from app.quota.api.dependencies import (
     validate_new_compute_quota_values,
     validate_new_network_quota_values,
 )
-from app.quota.crud import block_storage_quota, compute_quota, network_quota
+from app.quota.crud import (
+    async_block_storage_quota,
+    async_compute_quota,
+    async_network_quota,
+    block_storage_quota,
+    compute_quota,
+    get_quota_totals,
+    network_quota,
+)
+from app.quota.enum import QuotaGroupBy
 from app.quota.models import BlockStorageQuota, ComputeQuota, NetworkQuota
 from app.quota.schemas import (
     BlockStorageQuotaQuery,
@@ -31,6 +48,7 @@ from app.quota.schemas import (
     NetworkQuotaReadPublic,
     NetworkQuotaReadShort,
     NetworkQuotaUpdate,
+    QuotaTotals,
 )
 from app.quota.schemas_extended import (
     BlockStorageQuotaReadExtended,
@@ -40,11 +58,16 @@ from app.quota.schemas_extended import (
     NetworkQuotaReadExtended,
     NetworkQuotaReadExtendedPublic,
 )
+from app.transaction import TransactionRoute
 
-bs_router = APIRouter(prefix="/block_storage_quotas", tags=["block_storage_quotas"])
+router = APIRouter(prefix="/quotas", tags=["quotas"], route_class=TransactionRoute)
+bs_router = APIRouter(
+    prefix="/block_storage_quotas",
+    tags=["block_storage_quotas"],
+    route_class=TransactionRoute,
+)
 
 
-@db.read_transaction
 @bs_router.get(
     "/",
     response_model=Union[
@@ -59,18 +82,56 @@ bs_router = APIRouter(prefix="/block_storage_quotas", tags=["block_storage_quota
         It is possible to filter on quotas attributes and other \
         common query parameters.",
 )
-def get_block_storage_quotas(
+async def get_block_storage_quotas(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: BlockStorageQuotaQuery = Depends(),
 ):
-    items = block_storage_quota.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            block_storage_quota.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        (
+            items,
+            next_cursor,
+        ) = await async_block_storage_quota.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_block_storage_quota.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_block_storage_quota.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_block_storage_quota.count(**item.dict(exclude_none=True))
     )
-    items = block_storage_quota.paginate(items=items, page=page.page, size=page.size)
-    return block_storage_quota.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_block_storage_quota.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
@@ -112,7 +173,6 @@ def get_block_storage_quotas(
 #     )
 
 
-@db.read_transaction
 @bs_router.get(
     "/{quota_uid}",
     response_model=Union[
@@ -127,17 +187,22 @@ def get_block_storage_quotas(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_block_storage_quota(
+async def get_block_storage_quota(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: BlockStorageQuota = Depends(valid_block_storage_quota_id),
 ):
-    return block_storage_quota.choose_out_schema(
+    if size.fields is not None:
+        items = await async_block_storage_quota.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_block_storage_quota.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @bs_router.patch(
     "/{quota_uid}",
     status_code=status.HTTP_200_OK,
@@ -165,7 +230,6 @@ def put_block_storage_quota(
     return db_item
 
 
-@db.write_transaction
 @bs_router.delete(
     "/{quota_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -188,10 +252,11 @@ def delete_block_storage_quotas(
         )
 
 
-c_router = APIRouter(prefix="/compute_quotas", tags=["compute_quotas"])
+c_router = APIRouter(
+    prefix="/compute_quotas", tags=["compute_quotas"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @c_router.get(
     "/",
     response_model=Union[
@@ -206,18 +271,53 @@ c_router = APIRouter(prefix="/compute_quotas", tags=["compute_quotas"])
         It is possible to filter on quotas attributes and other \
         common query parameters.",
 )
-def get_compute_quotas(
+async def get_compute_quotas(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: ComputeQuotaQuery = Depends(),
 ):
-    items = compute_quota.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            compute_quota.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_compute_quota.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_compute_quota.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_compute_quota.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_compute_quota.count(**item.dict(exclude_none=True))
     )
-    items = compute_quota.paginate(items=items, page=page.page, size=page.size)
-    return compute_quota.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_compute_quota.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
@@ -259,7 +359,6 @@ def get_compute_quotas(
 #     )
 
 
-@db.read_transaction
 @c_router.get(
     "/{quota_uid}",
     response_model=Union[
@@ -274,17 +373,22 @@ def get_compute_quotas(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_compute_quota(
+async def get_compute_quota(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: ComputeQuota = Depends(valid_compute_quota_id),
 ):
-    return compute_quota.choose_out_schema(
+    if size.fields is not None:
+        items = await async_compute_quota.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_compute_quota.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @c_router.patch(
     "/{quota_uid}",
     status_code=status.HTTP_200_OK,
@@ -312,7 +416,6 @@ def put_compute_quota(
     return db_item
 
 
-@db.write_transaction
 @c_router.delete(
     "/{quota_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -333,10 +436,11 @@ def delete_compute_quotas(item: ComputeQuota = Depends(valid_compute_quota_id)):
         )
 
 
-n_router = APIRouter(prefix="/network_quotas", tags=["network_quotas"])
+n_router = APIRouter(
+    prefix="/network_quotas", tags=["network_quotas"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @n_router.get(
     "/",
     response_model=Union[
@@ -351,23 +455,57 @@ n_router = APIRouter(prefix="/network_quotas", tags=["network_quotas"])
         It is possible to filter on quotas attributes and other \
         common query parameters.",
 )
-def get_network_quotas(
+async def get_network_quotas(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: NetworkQuotaQuery = Depends(),
 ):
-    items = network_quota.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            network_quota.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_network_quota.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_network_quota.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_network_quota.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_network_quota.count(**item.dict(exclude_none=True))
     )
-    items = network_quota.paginate(items=items, page=page.page, size=page.size)
-    return network_quota.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_network_quota.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @n_router.get(
     "/{quota_uid}",
     response_model=Union[
@@ -382,17 +520,22 @@ def get_network_quotas(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_network_quota(
+async def get_network_quota(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: NetworkQuota = Depends(valid_network_quota_id),
 ):
-    return network_quota.choose_out_schema(
+    if size.fields is not None:
+        items = await async_network_quota.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_network_quota.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @n_router.patch(
     "/{quota_uid}",
     status_code=status.HTTP_200_OK,
@@ -420,7 +563,6 @@ def put_network_quota(
     return db_item
 
 
-@db.write_transaction
 @n_router.delete(
     "/{quota_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -439,3 +581,23 @@ def delete_network_quotas(item: NetworkQuota = Depends(valid_network_quota_id)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete item",
         )
+
+
+@router.get(
+    "/totals",
+    response_model=List[QuotaTotals],
+    dependencies=[Depends(check_read_access)],
+    summary="Read quota totals",
+    description="Retrieve the sum of the block storage, compute and \
+        network quota attributes. Quotas are grouped on the given keys \
+        (provider, region, service type and user group); quotas applying \
+        to each user are always summed apart from the ones applying to \
+        the whole project. Unlimited (-1) values are not summed: they are \
+        counted, per attribute, in `unlimited`.",
+)
+async def get_quotas_totals(
+    group_by: List[QuotaGroupBy] = Query(
+        default=[], description="Keys to group quotas on. All quotas when empty."
+    ),
+):
+    return await run_db_call(get_quota_totals, group_by=group_by)
@@ -1,12 +1,16 @@
 from typing import List, Optional, Union
 
+from neomodel import db
+
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.project.models import Project
 from app.provider.schemas_extended import (
     BlockStorageQuotaCreateExtended,
     ComputeQuotaCreateExtended,
     NetworkQuotaCreateExtended,
 )
+from app.quota.enum import QuotaGroupBy
 from app.quota.models import BlockStorageQuota, ComputeQuota, NetworkQuota
 from app.quota.schemas import (
     BlockStorageQuotaCreate,
@@ -24,6 +28,7 @@ from app.quota.schemas import (
     NetworkQuotaReadPublic,
     NetworkQuotaReadShort,
     NetworkQuotaUpdate,
+    QuotaTotals,
 )
 from app.quota.schemas_extended import (
     BlockStorageQuotaReadExtended,
@@ -249,3 +254,90 @@ network_quota = CRUDNetworkQuota(
     read_extended_schema=NetworkQuotaReadExtended,
     read_extended_public_schema=NetworkQuotaReadExtendedPublic,
 )
+
+async_block_storage_quota = AsyncCRUD(crud=block_storage_quota)
+async_compute_quota = AsyncCRUD(crud=compute_quota)
+async_network_quota = AsyncCRUD(crud=network_quota)
+
+
+# Quota attributes which can be summed (per volume limits can not).
+QUOTA_TOTAL_PROPERTIES = [
+    "cores",
+    "instances",
+    "ram",
+    "gigabytes",
+    "volumes",
+    "public_ips",
+    "networks",
+    "ports",
+    "security_groups",
+    "security_group_rules",
+]
+
+QUOTA_GROUP_KEYS = {
+    QuotaGroupBy.PROVIDER: [
+        "provider.uid AS provider_uid",
+        "provider.name AS provider_name",
+    ],
+    QuotaGroupBy.REGION: ["region.uid AS region_uid", "region.name AS region_name"],
+    QuotaGroupBy.SERVICE_TYPE: ["q.type AS service_type"],
+    QuotaGroupBy.USER_GROUP: [
+        "user_group.uid AS user_group_uid",
+        "user_group.name AS user_group_name",
+    ],
+}
+
+
+def build_quota_totals_query(*, group_by: List[QuotaGroupBy]) -> str:
+    """Return the query summing the quota attributes grouped on the given keys.
+
+    Only the relationships needed by the group keys are traversed. Quotas of
+    projects without SLA have no user group. Negative values mean unlimited: they
+    are counted apart and never summed.
+    """
+    query = "MATCH (q:Quota) "
+    if QuotaGroupBy.PROVIDER in group_by or QuotaGroupBy.REGION in group_by:
+        query += (
+            "MATCH (q)-[:APPLY_TO]->()<-[:SUPPLY]-(region:Region)"
+            "<-[:DIVIDED_INTO]-(provider:Provider) "
+        )
+    if QuotaGroupBy.USER_GROUP in group_by:
+        query += (
+            "OPTIONAL MATCH (q)<-[:USE_SERVICE_WITH]-()<-[:REFER_TO]-()"
+            "<-[:AGREE]-(user_group:UserGroup) "
+        )
+    keys = [k for i in QuotaGroupBy if i in group_by for k in QUOTA_GROUP_KEYS[i]]
+    keys.append("q.per_user AS per_user")
+    sums = [
+        f"sum(CASE WHEN q.{i} >= 0 THEN q.{i} END) AS {i}, "
+        f"count(CASE WHEN q.{i} >= 0 THEN 1 END) AS {i}_count, "
+        f"count(CASE WHEN q.{i} < 0 THEN 1 END) AS {i}_unlimited"
+        for i in QUOTA_TOTAL_PROPERTIES
+    ]
+    order = [i.split(" AS ")[1] for i in keys]
+    query += (
+        f"RETURN {', '.join(keys)}, count(q) AS quotas, {', '.join(sums)} "
+        f"ORDER BY {', '.join(order)}"
+    )
+    return query
+
+
+def get_quota_totals(*, group_by: List[QuotaGroupBy]) -> List[QuotaTotals]:
+    """Return the sums of the quota attributes grouped on the given keys.
+
+    Sums are computed by the database with a single query.
+    """
+    results, columns = db.cypher_query(build_quota_totals_query(group_by=group_by))
+    totals = []
+    for row in results:
+        data = dict(zip(columns, row))
+        data["totals"] = {
+            i: data[i] for i in QUOTA_TOTAL_PROPERTIES if data[f"{i}_count"] > 0
+        }
+        data["unlimited"] = {
+            i: data[f"{i}_unlimited"]
+            for i in QUOTA_TOTAL_PROPERTIES
+            if data[f"{i}_unlimited"] > 0
+        }
+        totals.append(QuotaTotals(**data))
+    return totals
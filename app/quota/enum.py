@@ -7,3 +7,12 @@ class QuotaType(Enum):
     BLOCK_STORAGE: str = "block-storage"
     COMPUTE: str = "compute"
     NETWORK: str = "network"
+
+
+class QuotaGroupBy(Enum):
+    """Possible keys to group quota totals on."""
+
+    PROVIDER: str = "provider"
+    REGION: str = "region"
+    SERVICE_TYPE: str = "service_type"
+    USER_GROUP: str = "user_group"
@@ -1,6 +1,6 @@
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
-from pydantic import Field, validator
+from pydantic import BaseModel, Field, validator
 
 from app.models import BaseNode, BaseNodeCreate, BaseNodeRead
 from app.query import create_query_model
@@ -165,3 +165,35 @@ class NetworkQuotaReadShort(BaseNodeRead, NetworkQuotaBase):
 
 
 NetworkQuotaQuery = create_query_model("NetworkQuotaQuery", NetworkQuotaBase)
+
+
+class QuotaTotals(BaseModel):
+    """Model with the sums of the quotas sharing the same group keys.
+
+    Keys the quotas are not grouped on are None. Quotas applying to each user are
+    never summed with the ones applying to the whole project.
+    """
+
+    provider_uid: Optional[str] = Field(default=None, description="Provider uid.")
+    provider_name: Optional[str] = Field(default=None, description="Provider name.")
+    region_uid: Optional[str] = Field(default=None, description="Region uid.")
+    region_name: Optional[str] = Field(default=None, description="Region name.")
+    service_type: Optional[QuotaType] = Field(
+        default=None, description="Type of the service the quotas apply to."
+    )
+    user_group_uid: Optional[str] = Field(
+        default=None,
+        description="User group uid. None for quotas of projects without SLA.",
+    )
+    user_group_name: Optional[str] = Field(default=None, description="User group name.")
+    per_user: bool = Field(description="Quotas to apply for each user")
+    quotas: int = Field(description="Number of summed quotas.")
+    totals: Dict[str, int] = Field(
+        description="Sum of each quota attribute, excluding unlimited (negative) \
+            values. Attributes with no limited value are omitted."
+    )
+    unlimited: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Number of quotas with an unlimited (negative) value for each \
+            attribute. Attributes with no unlimited value are omitted.",
+    )
@@ -1,15 +1,24 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.location.crud import location
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    GeoQuery,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 from app.region.api.dependencies import (
     valid_region_id,
     validate_new_region_values,
 )
-from app.region.crud import region
+from app.region.crud import async_region, region
 from app.region.models import Region
 from app.region.schemas import (
     RegionQuery,
@@ -22,11 +31,11 @@ from app.region.schemas_extended import (
     RegionReadExtended,
     RegionReadExtendedPublic,
 )
+from app.transaction import TransactionRoute
 
-router = APIRouter(prefix="/regions", tags=["regions"])
+router = APIRouter(prefix="/regions", tags=["regions"], route_class=TransactionRoute)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -39,25 +48,73 @@ router = APIRouter(prefix="/regions", tags=["regions"])
     summary="Read all regions",
     description="Retrieve all regions stored in the database. \
         It is possible to filter on regions attributes and other \
-        common query parameters.",
+        common query parameters. It is also possible to filter regions \
+        by their distance from a point or by a bounding box and to sort \
+        them by distance.",
 )
-def get_regions(
+async def get_regions(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: RegionQuery = Depends(),
+    geo: GeoQuery = Depends(),
 ):
-    items = region.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    cypher_filters, cypher_sort = location.get_geo_filters(
+        geo=geo, path="({node})-[:LOCATED_AT]->(location)"
+    )
+    if stream:
+        return StreamingResponse(
+            region.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                cypher_filters=cypher_filters,
+                cypher_sort=cypher_sort,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_region.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_region.get_multi(
+            cypher_filters=cypher_filters,
+            cypher_sort=cypher_sort,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_region.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_region.count(
+            cypher_filters=cypher_filters, **item.dict(exclude_none=True)
+        )
     )
-    items = region.paginate(items=items, page=page.page, size=page.size)
-    return region.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_region.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @router.get(
     "/{region_uid}",
     response_model=Union[
@@ -72,17 +129,22 @@ def get_regions(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_region(
+async def get_region(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: Region = Depends(valid_region_id),
 ):
-    return region.choose_out_schema(
+    if size.fields is not None:
+        items = await async_region.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_region.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{region_uid}",
     status_code=status.HTTP_200_OK,
@@ -113,7 +175,6 @@ def put_region(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{region_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
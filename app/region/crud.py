@@ -1,6 +1,8 @@
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
+from app.cascade import CascadeStep, cascade_delete
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.location.crud import location
 from app.project.models import Project
 from app.provider.models import Provider
@@ -30,6 +32,36 @@ from app.service.models import (
     NetworkService,
 )
 
+# Nodes owned by the deleted regions: their services, with quotas and networks, and
+# the flavors, images and locations not used by other services and regions.
+REGION_CASCADE = [
+    CascadeStep(name="services", source="regions", pattern="(s)-[:SUPPLY]->(x)"),
+    CascadeStep(name="quotas", source="services", pattern="(s)<-[:APPLY_TO]-(x)"),
+    CascadeStep(
+        name="flavors",
+        source="services",
+        pattern="(s)-[:AVAILABLE_VM_FLAVOR]->(x)",
+        condition="NOT EXISTS { MATCH (x)<-[:AVAILABLE_VM_FLAVOR]-(o) "
+        "WHERE NOT o IN services }",
+    ),
+    CascadeStep(
+        name="images",
+        source="services",
+        pattern="(s)-[:AVAILABLE_VM_IMAGE]->(x)",
+        condition="NOT EXISTS { MATCH (x)<-[:AVAILABLE_VM_IMAGE]-(o) "
+        "WHERE NOT o IN services }",
+    ),
+    CascadeStep(
+        name="networks", source="services", pattern="(s)-[:AVAILABLE_NETWORK]->(x)"
+    ),
+    CascadeStep(
+        name="locations",
+        source="regions",
+        pattern="(s)-[:LOCATED_AT]->(x)",
+        condition="NOT EXISTS { MATCH (x)<-[:LOCATED_AT]-(o) WHERE NOT o IN regions }",
+    ),
+]
+
 
 class CRUDRegion(
     CRUDBase[
@@ -77,30 +109,24 @@ class CRUDRegion(
         If the corresponding provider has no other regions, abort region deletion in
         favor of provider deletion.
 
-        At first delete its services. Then, if the location points only to this
-        provider, delete it. Finally delete the region.
+        Delete its services and, if they point only to this region, its location and
+        the flavors and images of its services (see remove_cascade).
         """
         if not from_provider:
             item = db_obj.provider.single()
             if len(item.regions) == 1:
                 return False
+        return len(self.remove_cascade(db_obj=db_obj)) > 0
 
-        for db_serv in db_obj.services:
-            if isinstance(db_serv, BlockStorageService):
-                block_storage_service.remove(db_obj=db_serv)
-            elif isinstance(db_serv, ComputeService):
-                compute_service.remove(db_obj=db_serv)
-            elif isinstance(db_serv, IdentityService):
-                identity_service.remove(db_obj=db_serv)
-            elif isinstance(db_serv, NetworkService):
-                network_service.remove(db_obj=db_serv)
-
-        item = db_obj.location.single()
-        if item and len(item.regions) == 1:
-            location.remove(db_obj=item)
+    def remove_cascade(self, *, db_obj: Region) -> Dict[str, int]:
+        """Delete the region and the subgraph it exclusively owns with a single
+        statement and return the number of deleted nodes per label.
 
-        result = super().remove(db_obj=db_obj)
-        return result
+        Shared flavors, images and locations are only disconnected.
+        """
+        return cascade_delete(
+            model=self.model, uid=db_obj.uid, root="regions", steps=REGION_CASCADE
+        )
 
     def update(
         self,
@@ -342,3 +368,5 @@ region = CRUDRegion(
     read_extended_schema=RegionReadExtended,
     read_extended_public_schema=RegionReadExtendedPublic,
 )
+
+async_region = AsyncCRUD(crud=region)
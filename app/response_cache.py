@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Hashable, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from starlette.responses import Response
+
+from app.config import get_settings
+
+
+class CachedResponse(NamedTuple):
+    expires_at: float
+    generation: int
+    status_code: int
+    body: bytes
+    raw_headers: List[Tuple[bytes, bytes]]
+
+
+class ResponseCacheStats(BaseModel):
+    """Model with the usage of the response cache of the current process."""
+
+    hits: int = Field(description="Requests answered by the cache.")
+    misses: int = Field(description="Cacheable requests which reached the database.")
+    size: int = Field(description="Number of cached responses.")
+    max_size: int = Field(description="Maximum number of cached responses.")
+    generation: int = Field(description="Number of committed write transactions.")
+
+
+class ResponseCache:
+    """Thread safe LRU cache of the responses of the read endpoints.
+
+    Each committed write bumps a single generation, whatever labels it wrote:
+    responses with connections or relationship filters read many labels, so a cached
+    response is served only if nothing has been written since the request producing
+    it began. Invalidation is therefore global.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def bump(self) -> None:
+        """Invalidate all the cached responses after a write."""
+        with self.lock:
+            self.generation += 1
+
+    def get(self, key: Hashable) -> Optional[Response]:
+        """Return a copy of the cached response, if still valid."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (
+                entry.expires_at <= monotonic() or entry.generation != self.generation
+            ):
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        response = Response(content=entry.body, status_code=entry.status_code)
+        response.raw_headers = list(entry.raw_headers)
+        return response
+
+    def set(self, key: Hashable, response: Response, generation: int) -> None:
+        """Store a response produced from the data of the given generation.
+
+        Responses of a generation already outdated are discarded.
+        """
+        entry = CachedResponse(
+            expires_at=monotonic() + self.ttl,
+            generation=generation,
+            status_code=response.status_code,
+            body=response.body,
+            raw_headers=list(response.raw_headers),
+        )
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self) -> ResponseCacheStats:
+        """Return the counters, the size of the cache and the generation."""
+        with self.lock:
+            return ResponseCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                size=len(self.entries),
+                max_size=self.max_size,
+                generation=self.generation,
+            )
+
+
+response_cache = ResponseCache(
+    max_size=get_settings().RESPONSE_CACHE_SIZE, ttl=get_settings().RESPONSE_CACHE_TTL
+)
@@ -7,6 +7,7 @@ from app.identity_provider.api.v1.endpoints import (
 )
 from app.image.api.v1.endpoints import router as image_router_v1
 from app.location.api.v1.endpoints import router as location_router_v1
+from app.matchmaking.api.v1.endpoints import router as matchmaking_router_v1
 from app.network.api.v1.endpoints import router as network_router_v1
 from app.project.api.v1.endpoints import router as project_router_v1
 from app.provider.api.v1.endpoints import router as provider_router_v1
@@ -15,7 +16,9 @@ from app.quota.api.v1.endpoints import (
 )
 from app.quota.api.v1.endpoints import c_router as compute_quota_router_v1
 from app.quota.api.v1.endpoints import n_router as network_quota_router_v1
+from app.quota.api.v1.endpoints import router as quota_router_v1
 from app.region.api.v1.endpoints import router as region_router_v1
+from app.search.api.v1.endpoints import router as search_router_v1
 from app.service.api.v1.endpoints import (
     bs_router as block_storage_service_router_v1,
 )
@@ -38,6 +41,7 @@ router_v1.include_router(provider_router_v1)
 router_v1.include_router(block_storage_quota_router_v1)
 router_v1.include_router(compute_quota_router_v1)
 router_v1.include_router(network_quota_router_v1)
+router_v1.include_router(quota_router_v1)
 router_v1.include_router(block_storage_service_router_v1)
 router_v1.include_router(compute_service_router_v1)
 router_v1.include_router(identity_service_router_v1)
@@ -45,3 +49,5 @@ router_v1.include_router(network_service_router_v1)
 router_v1.include_router(sla_router_v1)
 router_v1.include_router(user_group_router_v1)
 router_v1.include_router(region_router_v1)
+router_v1.include_router(search_router_v1)
+router_v1.include_router(matchmaking_router_v1)
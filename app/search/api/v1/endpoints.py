@@ -0,0 +1,44 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.auth.dependencies import check_read_access
+from app.crud_async import run_db_call
+from app.search.crud import search
+from app.search.schemas import SearchEntity, SearchHit
+from app.transaction import TransactionRoute
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=TransactionRoute)
+
+
+@router.get(
+    "/",
+    response_model=List[SearchHit],
+    dependencies=[Depends(check_read_access)],
+    summary="Search items by text",
+    description="Retrieve the providers, flavors, images, networks, projects, \
+        user groups and locations whose name, description, OS distribution \
+        or tags match the given words. Items are sorted by decreasing \
+        relevance; items matching more words rank higher. Query operators \
+        are matched as plain text and blank texts match nothing. It is \
+        possible to restrict the search to some entity types.",
+)
+async def search_items(
+    q: str = Query(min_length=1, description="Words to search."),
+    types: Optional[List[SearchEntity]] = Query(
+        default=None,
+        alias="type",
+        description="Entity types to search. All when empty.",
+    ),
+    skip: int = Query(default=0, ge=0, description="Number of hits to skip."),
+    limit: int = Query(
+        default=20, ge=1, le=100, description="Maximum number of returned hits."
+    ),
+):
+    return await run_db_call(
+        search,
+        text=q,
+        types=[i.value for i in types] if types else None,
+        skip=skip,
+        limit=limit,
+    )
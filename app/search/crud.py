@@ -0,0 +1,85 @@
+import re
+from typing import List, Optional
+
+from neomodel import db
+
+from app.flavor.models import Flavor
+from app.image.models import Image
+from app.location.models import Location
+from app.network.models import Network
+from app.project.models import Project
+from app.provider.models import Provider
+from app.search.schemas import SearchHit
+from app.user_group.models import UserGroup
+
+SEARCH_INDEX = "registry_search"
+SEARCH_MODELS = [Flavor, Image, Location, Network, Project, Provider, UserGroup]
+SEARCH_PROPERTIES = ["name", "site", "description", "os_distro", "tags"]
+
+# Characters with a meaning in the Lucene query syntax.
+LUCENE_SPECIAL_CHARS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+# Lucene boolean operators, recognized only when upper case.
+LUCENE_KEYWORDS = re.compile(r"\b(AND|OR|NOT)\b")
+
+
+def get_search_index_statement() -> str:
+    """Return the statement creating the full-text index used by the search.
+
+    A single index covers all the searched labels, so that hits of different types
+    are ranked together. Properties missing on a label are ignored.
+    """
+    labels = "|".join(i.__label__ for i in SEARCH_MODELS)
+    properties = ", ".join(f"n.{i}" for i in SEARCH_PROPERTIES)
+    return (
+        f"CREATE FULLTEXT INDEX {SEARCH_INDEX} IF NOT EXISTS "
+        f"FOR (n:{labels}) ON EACH [{properties}]"
+    )
+
+
+def escape_search_text(text: str) -> str:
+    """Escape the Lucene operators in a user provided text.
+
+    Words are matched as they are: items matching more words rank higher. Boolean
+    keywords are lower cased, which makes them plain words (the index is case
+    insensitive), and surrounding whitespace is removed.
+    """
+    text = LUCENE_SPECIAL_CHARS.sub(r"\\\1", text.strip())
+    return LUCENE_KEYWORDS.sub(lambda m: m.group(1).lower(), text)
+
+
+def search(
+    *, text: str, types: Optional[List[str]] = None, skip: int = 0, limit: int = 20
+) -> List[SearchHit]:
+    """Return the items matching the given text, sorted by decreasing relevance.
+
+    When 'types' is given, only items with one of these labels are returned. Blank
+    texts match nothing.
+    """
+    text = escape_search_text(text)
+    if not text:
+        return []
+    query = (
+        "CALL db.index.fulltext.queryNodes($index, $text) YIELD node, score "
+        "WHERE $types IS NULL OR any(l IN labels(node) WHERE l IN $types) "
+        "RETURN node, score ORDER BY score DESC SKIP $skip LIMIT $limit"
+    )
+    results, _ = db.cypher_query(
+        query,
+        {
+            "index": SEARCH_INDEX,
+            "text": text,
+            "types": types,
+            "skip": skip,
+            "limit": limit,
+        },
+        resolve_objects=True,
+    )
+    return [
+        SearchHit(
+            type=node.__label__,
+            uid=node.uid,
+            name=getattr(node, "name", None) or getattr(node, "site", None),
+            score=score,
+        )
+        for node, score in results
+    ]
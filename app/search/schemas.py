@@ -0,0 +1,30 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchEntity(str, Enum):
+    """Entity types covered by the full-text search."""
+
+    FLAVOR: str = "Flavor"
+    IMAGE: str = "Image"
+    LOCATION: str = "Location"
+    NETWORK: str = "Network"
+    PROJECT: str = "Project"
+    PROVIDER: str = "Provider"
+    USER_GROUP: str = "UserGroup"
+
+
+class SearchHit(BaseModel):
+    """Model with an item matching a full-text search.
+
+    Hits identify the item: use the endpoint of its entity type to read it.
+    """
+
+    type: SearchEntity = Field(description="Entity type of the item.")
+    uid: str = Field(description="Item unique ID.")
+    name: Optional[str] = Field(
+        default=None, description="Item name (site for locations)."
+    )
+    score: float = Field(description="Relevance of the item. Higher is better.")
@@ -1,21 +1,17 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
-
-# from app.identity_provider.crud import identity_provider
-# from app.identity_provider.schemas import (
-#     IdentityProviderRead,
-#     IdentityProviderReadPublic,
-#     IdentityProviderReadShort,
-# )
-# from app.identity_provider.schemas_extended import (
-#     IdentityProviderReadExtended,
-#     IdentityProviderReadExtendedPublic,
-# )
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 from app.service.api.dependencies import (
     valid_block_storage_service_id,
     valid_compute_service_id,
@@ -27,6 +23,10 @@ from app.service.api.dependencies import (
     validate_new_network_service_values,
 )
 from app.service.crud import (
+    async_block_storage_service,
+    async_compute_service,
+    async_identity_service,
+    async_network_service,
     block_storage_service,
     compute_service,
     identity_service,
@@ -71,10 +71,25 @@ from app.service.schemas_extended import (
     NetworkServiceReadExtendedPublic,
 )
 
-bs_router = APIRouter(prefix="/block_storage_services", tags=["block_storage_services"])
+# from app.identity_provider.crud import identity_provider
+# from app.identity_provider.schemas import (
+#     IdentityProviderRead,
+#     IdentityProviderReadPublic,
+#     IdentityProviderReadShort,
+# )
+# from app.identity_provider.schemas_extended import (
+#     IdentityProviderReadExtended,
+#     IdentityProviderReadExtendedPublic,
+# )
+from app.transaction import TransactionRoute
+
+bs_router = APIRouter(
+    prefix="/block_storage_services",
+    tags=["block_storage_services"],
+    route_class=TransactionRoute,
+)
 
 
-@db.read_transaction
 @bs_router.get(
     "/",
     response_model=Union[
@@ -89,23 +104,60 @@ bs_router = APIRouter(prefix="/block_storage_services", tags=["block_storage_ser
         It is possible to filter on services attributes and other \
         common query parameters.",
 )
-def get_block_storage_services(
+async def get_block_storage_services(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: BlockStorageServiceQuery = Depends(),
 ):
-    items = block_storage_service.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            block_storage_service.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        (
+            items,
+            next_cursor,
+        ) = await async_block_storage_service.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_block_storage_service.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_block_storage_service.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_block_storage_service.count(**item.dict(exclude_none=True))
     )
-    items = block_storage_service.paginate(items=items, page=page.page, size=page.size)
-    return block_storage_service.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_block_storage_service.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @bs_router.get(
     "/{service_uid}",
     response_model=Union[
@@ -120,17 +172,22 @@ def get_block_storage_services(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_block_storage_service(
+async def get_block_storage_service(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: BlockStorageService = Depends(valid_block_storage_service_id),
 ):
-    return block_storage_service.choose_out_schema(
+    if size.fields is not None:
+        items = await async_block_storage_service.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_block_storage_service.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @bs_router.patch(
     "/{service_uid}",
     status_code=status.HTTP_200_OK,
@@ -160,7 +217,6 @@ def put_block_storage_service(
     return db_item
 
 
-@db.write_transaction
 @bs_router.delete(
     "/{service_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -184,10 +240,11 @@ def delete_block_storage_services(
         )
 
 
-c_router = APIRouter(prefix="/compute_services", tags=["compute_services"])
+c_router = APIRouter(
+    prefix="/compute_services", tags=["compute_services"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @c_router.get(
     "/",
     response_model=Union[
@@ -202,23 +259,57 @@ c_router = APIRouter(prefix="/compute_services", tags=["compute_services"])
         It is possible to filter on services attributes and other \
         common query parameters.",
 )
-def get_compute_services(
+async def get_compute_services(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: ComputeServiceQuery = Depends(),
 ):
-    items = compute_service.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            compute_service.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_compute_service.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_compute_service.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_compute_service.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_compute_service.count(**item.dict(exclude_none=True))
     )
-    items = compute_service.paginate(items=items, page=page.page, size=page.size)
-    return compute_service.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_compute_service.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @c_router.get(
     "/{service_uid}",
     response_model=Union[
@@ -233,17 +324,22 @@ def get_compute_services(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_compute_service(
+async def get_compute_service(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: ComputeService = Depends(valid_compute_service_id),
 ):
-    return compute_service.choose_out_schema(
+    if size.fields is not None:
+        items = await async_compute_service.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_compute_service.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @c_router.patch(
     "/{service_uid}",
     status_code=status.HTTP_200_OK,
@@ -273,7 +369,6 @@ def put_compute_service(
     return db_item
 
 
-@db.write_transaction
 @c_router.delete(
     "/{service_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -295,10 +390,13 @@ def delete_compute_services(item: ComputeService = Depends(valid_compute_service
         )
 
 
-i_router = APIRouter(prefix="/identity_services", tags=["identity_services"])
+i_router = APIRouter(
+    prefix="/identity_services",
+    tags=["identity_services"],
+    route_class=TransactionRoute,
+)
 
 
-@db.read_transaction
 @i_router.get(
     "/",
     response_model=Union[
@@ -313,23 +411,57 @@ i_router = APIRouter(prefix="/identity_services", tags=["identity_services"])
         It is possible to filter on services attributes and other \
         common query parameters.",
 )
-def get_identity_services(
+async def get_identity_services(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: IdentityServiceQuery = Depends(),
 ):
-    items = identity_service.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            identity_service.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_identity_service.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_identity_service.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_identity_service.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_identity_service.count(**item.dict(exclude_none=True))
     )
-    items = identity_service.paginate(items=items, page=page.page, size=page.size)
-    return identity_service.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_identity_service.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @i_router.get(
     "/{service_uid}",
     response_model=Union[
@@ -344,17 +476,22 @@ def get_identity_services(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_identity_sservice(
+async def get_identity_sservice(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: IdentityService = Depends(valid_identity_service_id),
 ):
-    return identity_service.choose_out_schema(
+    if size.fields is not None:
+        items = await async_identity_service.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_identity_service.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @i_router.patch(
     "/{service_uid}",
     status_code=status.HTTP_200_OK,
@@ -384,7 +521,6 @@ def put_identity_sservice(
     return db_item
 
 
-@db.write_transaction
 @i_router.delete(
     "/{service_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -408,10 +544,11 @@ def delete_identity_sservices(
         )
 
 
-n_router = APIRouter(prefix="/network_services", tags=["network_services"])
+n_router = APIRouter(
+    prefix="/network_services", tags=["network_services"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @n_router.get(
     "/",
     response_model=Union[
@@ -426,23 +563,57 @@ n_router = APIRouter(prefix="/network_services", tags=["network_services"])
         It is possible to filter on services attributes and other \
         common query parameters.",
 )
-def get_network_services(
+async def get_network_services(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: NetworkServiceQuery = Depends(),
 ):
-    items = network_service.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            network_service.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_network_service.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_network_service.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_network_service.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_network_service.count(**item.dict(exclude_none=True))
     )
-    items = network_service.paginate(items=items, page=page.page, size=page.size)
-    return network_service.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_network_service.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
 
-@db.read_transaction
 @n_router.get(
     "/{service_uid}",
     response_model=Union[
@@ -457,17 +628,22 @@ def get_network_services(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_network_service(
+async def get_network_service(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: NetworkService = Depends(valid_network_service_id),
 ):
-    return network_service.choose_out_schema(
+    if size.fields is not None:
+        items = await async_network_service.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_network_service.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @n_router.patch(
     "/{service_uid}",
     status_code=status.HTTP_200_OK,
@@ -497,7 +673,6 @@ def put_network_service(
     return db_item
 
 
-@db.write_transaction
 @n_router.delete(
     "/{service_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
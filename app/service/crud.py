@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.flavor.crud import flavor
 from app.image.crud import image
 from app.network.crud import network
@@ -706,3 +707,8 @@ network_service = CRUDNetworkService(
     read_extended_schema=NetworkServiceReadExtended,
     read_extended_public_schema=NetworkServiceReadExtendedPublic,
 )
+
+async_compute_service = AsyncCRUD(crud=compute_service)
+async_block_storage_service = AsyncCRUD(crud=block_storage_service)
+async_identity_service = AsyncCRUD(crud=identity_service)
+async_network_service = AsyncCRUD(crud=network_service)
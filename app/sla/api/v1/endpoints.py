@@ -1,20 +1,25 @@
 from typing import List, Optional, Union
 
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+
 # from app.user_group.api.dependencies import valid_user_group_id
 # from app.user_group.models import UserGroup
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
-
-# from app.project.api.dependencies import project_has_no_sla
-# from app.project.models import Project
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 from app.sla.api.dependencies import (  # is_unique_sla,
     valid_sla_id,
     validate_new_sla_values,
 )
-from app.sla.crud import sla
+from app.sla.crud import async_sla, sla
 from app.sla.models import SLA
 from app.sla.schemas import (
     SLAQuery,
@@ -25,10 +30,13 @@ from app.sla.schemas import (
 )
 from app.sla.schemas_extended import SLAReadExtended, SLAReadExtendedPublic
 
-router = APIRouter(prefix="/slas", tags=["slas"])
+# from app.project.api.dependencies import project_has_no_sla
+# from app.project.models import Project
+from app.transaction import TransactionRoute
+
+router = APIRouter(prefix="/slas", tags=["slas"], route_class=TransactionRoute)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -43,18 +51,51 @@ router = APIRouter(prefix="/slas", tags=["slas"])
         It is possible to filter on SLAs attributes and other \
         common query parameters.",
 )
-def get_slas(
+async def get_slas(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: SLAQuery = Depends(),
 ):
-    items = sla.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    if stream:
+        return StreamingResponse(
+            sla.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_sla.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_sla.get_multi(
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_sla.get_next_cursor(items=items, comm=comm, page=page)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_sla.count(**item.dict(exclude_none=True))
     )
-    items = sla.paginate(items=items, page=page.page, size=page.size)
-    return sla.choose_out_schema(
+    if size.fields is not None:
+        return response
+    return await async_sla.choose_out_schema(
         items=items, auth=auth, short=size.short, with_conn=size.with_conn
     )
 
@@ -100,7 +141,6 @@ def get_slas(
 #     return sla.create(obj_in=item, project=project, user_group=user_group, force=True)
 
 
-@db.read_transaction
 @router.get(
     "/{sla_uid}",
     response_model=Union[
@@ -115,17 +155,22 @@ def get_slas(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_sla(
+async def get_sla(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: SLA = Depends(valid_sla_id),
 ):
-    return sla.choose_out_schema(
+    if size.fields is not None:
+        items = await async_sla.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_sla.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{sla_uid}",
     status_code=status.HTTP_200_OK,
@@ -155,7 +200,6 @@ def put_sla(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{sla_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
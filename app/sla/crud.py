@@ -1,6 +1,7 @@
 from typing import List, Optional, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.project.models import Project
 from app.provider.schemas_extended import SLACreateExtended
 from app.sla.models import SLA
@@ -98,3 +99,5 @@ sla = CRUDSLA(
     read_extended_schema=SLAReadExtended,
     read_extended_public_schema=SLAReadExtendedPublic,
 )
+
+async_sla = AsyncCRUD(crud=sla)
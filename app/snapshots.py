@@ -0,0 +1,21 @@
+import argparse
+
+from app.config import get_settings
+from app.provider.crud import provider
+
+
+def main() -> None:
+    """Build again the extended read snapshots of all the providers."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild the serialized extended reads of all the providers, "
+        "served by GET /providers/{uid}?with_conn=true."
+    )
+    parser.parse_args()
+
+    get_settings()
+    count = provider.rebuild_snapshots()
+    print(f"Rebuilt the snapshots of {count} providers.")
+
+
+if __name__ == "__main__":
+    main()
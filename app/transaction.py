@@ -0,0 +1,280 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import isclass
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Set
+
+from fastapi import status
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import (
+    is_async_gen_callable,
+    is_coroutine_callable,
+    is_gen_callable,
+)
+from fastapi.routing import APIRoute
+from neo4j import READ_ACCESS, WRITE_ACCESS
+from neomodel import config, db
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from app.auth.dependencies import get_access_level
+from app.pool import instrument_driver
+from app.response_cache import response_cache
+from app.version import (
+    bump_registry_version,
+    etag_matches,
+    make_etag,
+    registry_version,
+)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RequestTransaction:
+    """Neo4j transaction shared by all the database calls of a request.
+
+    The transaction is begun on the first query, so requests which never reach the
+    database (for example the ones rejected by the authentication checks) do not open
+    one. Read transactions are opened with the READ access mode: with a routing URI
+    scheme (neo4j, neo4j+s), the driver sends them to followers and read replicas.
+    """
+
+    def __init__(self, *, access_mode: str) -> None:
+        self.access_mode = access_mode
+        self.session = None
+        self.transaction = None
+        self.written_labels: Set[str] = set()
+        self.version: Optional[int] = None
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs):
+        """Run a query in the transaction, beginning it if needed.
+
+        Same signature of the driver's Transaction.run, so that neomodel can use this
+        object as its active transaction.
+        """
+        if self.transaction is None:
+            if not db.url:
+                db.set_connection(config.DATABASE_URL)
+            instrument_driver(db.driver)
+            self.session = db.driver.session(
+                database=db._database_name, default_access_mode=self.access_mode
+            )
+            self.transaction = self.session.begin_transaction()
+        return self.transaction.run(query, parameters, **kwargs)
+
+    @contextmanager
+    def bind(self) -> Iterator[None]:
+        """Make neomodel, in the current thread, run its queries in this transaction.
+
+        Code already running in an explicit transaction keeps using it.
+        """
+        if db._active_transaction is not None:
+            yield
+            return
+        db._active_transaction = self
+        try:
+            yield
+        finally:
+            db._active_transaction = None
+
+    def close(self, *, commit: bool) -> None:
+        """Commit or roll back the transaction, if begun, and close its session."""
+        if self.transaction is None:
+            return
+        try:
+            if commit:
+                self.transaction.commit()
+            else:
+                self.transaction.rollback()
+        finally:
+            self.session.close()
+            self.transaction = None
+            self.session = None
+
+
+current_transaction: ContextVar[Optional[RequestTransaction]] = ContextVar(
+    "current_transaction", default=None
+)
+
+
+class TransactionRoute(APIRoute):
+    """Route running all the database queries of a request in a single transaction.
+
+    GET, HEAD and OPTIONS requests use a read transaction, the other ones a write
+    transaction. The transaction is committed once the endpoint succeeded, before
+    sending the response, and rolled back on errors.
+
+    Successful GET responses are cached, per access level, until a write is committed
+    on any label or they expire. They carry an ETag derived from the registry version,
+    incremented by each write transaction and read in the request transaction:
+    requests with a matching If-None-Match get 304 without running the endpoint.
+
+    Sync endpoints and dependencies run in worker threads, while neomodel keeps the
+    active transaction in a thread local variable: each of them is wrapped to bind
+    the request transaction to the thread running it.
+
+    Streamed response bodies are produced after the commit, by queries running in a
+    session of their own: they do not match the registry version read by the
+    request, so streamed responses are never cached and carry no ETag.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        _bind_calls(dependant=self.dependant, wrapped={})
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def transaction_handler(request: Request) -> Response:
+            access_mode = (
+                READ_ACCESS if request.method in READ_METHODS else WRITE_ACCESS
+            )
+            transaction = RequestTransaction(access_mode=access_mode)
+            token = current_transaction.set(transaction)
+            cache_key = etag = response = None
+            try:
+                if request.method == "GET":
+                    cache_key = await get_cache_key(request)
+                    version = await run_in_threadpool(
+                        in_request_transaction(registry_version.get)
+                    )
+                    etag = make_etag(version=version, key=cache_key)
+                    generation = response_cache.generation
+                    response = get_unchanged_response(
+                        request=request, cache_key=cache_key, etag=etag
+                    )
+                if response is None:
+                    response = await run_endpoint(
+                        handler=handler, request=request, transaction=transaction
+                    )
+                else:
+                    etag = None
+            except BaseException:
+                await run_in_threadpool(transaction.close, commit=False)
+                raise
+            finally:
+                current_transaction.reset(token)
+            await run_in_threadpool(transaction.close, commit=True)
+            if transaction.written_labels:
+                registry_version.set(transaction.version)
+                response_cache.bump()
+            if (
+                etag is not None
+                and response.status_code == status.HTTP_200_OK
+                and not isinstance(response, StreamingResponse)
+            ):
+                if response_cache.enabled:
+                    response_cache.set(cache_key, response, generation)
+                response.headers["ETag"] = etag
+            return response
+
+        return transaction_handler
+
+
+async def run_endpoint(
+    *, handler: Callable, request: Request, transaction: RequestTransaction
+) -> Response:
+    """Run the endpoint and, if it wrote something, increment the registry version
+    in its transaction.
+    """
+    response = await handler(request)
+    if transaction.written_labels:
+        transaction.version = await run_in_threadpool(
+            in_request_transaction(bump_registry_version)
+        )
+    return response
+
+
+async def get_cache_key(request: Request) -> Hashable:
+    """Return the key identifying the response of a GET request, used by the response
+    cache and the ETags.
+
+    Query parameters are sorted, so that the same query written in a different order
+    gets the same key. The access level is resolved from the token, validated
+    through the token cache, so that invalid tokens never get a cached response.
+    """
+    access_level = await run_in_threadpool(
+        get_access_level, request.headers.get("Authorization")
+    )
+    return (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        request.headers.get("Accept", ""),
+        access_level,
+    )
+
+
+def get_unchanged_response(
+    *, request: Request, cache_key: Hashable, etag: str
+) -> Optional[Response]:
+    """Return the response of a GET request answered without running the endpoint.
+
+    It is a 304 when the If-None-Match header matches the current ETag, the cached
+    response otherwise, if any.
+    """
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    if not response_cache.enabled:
+        return None
+    response = response_cache.get(cache_key)
+    if response is not None:
+        response.headers["ETag"] = etag
+    return response
+
+
+def record_write(labels: Iterable[str]) -> None:
+    """Mark the given labels as written.
+
+    Within a request the registry version is incremented once, in the request
+    transaction, and the cached responses are invalidated once it is committed.
+    Otherwise both happen immediately.
+    """
+    transaction = current_transaction.get()
+    if transaction is None:
+        registry_version.set(bump_registry_version())
+        response_cache.bump()
+    else:
+        transaction.written_labels.update(labels)
+
+
+def _bind_calls(*, dependant: Dependant, wrapped: Dict[Callable, Callable]) -> None:
+    """Wrap the sync functions of the dependency tree to run them in the request
+    transaction.
+
+    The same function is always replaced by the same wrapper, so that FastAPI keeps
+    caching dependencies used multiple times.
+    """
+    for sub_dependant in dependant.dependencies:
+        _bind_calls(dependant=sub_dependant, wrapped=wrapped)
+    call = dependant.call
+    if (
+        call is None
+        or isclass(call)
+        or is_coroutine_callable(call)
+        or is_gen_callable(call)
+        or is_async_gen_callable(call)
+    ):
+        return
+    if call not in wrapped:
+        wrapped[call] = in_request_transaction(call)
+    dependant.call = wrapped[call]
+
+
+def in_request_transaction(call: Callable) -> Callable:
+    """Return a function calling the given one in the request transaction, if any.
+
+    The returned function must run in the thread executing the database queries.
+    """
+
+    @wraps(call)
+    def wrapper(*args, **kwargs):
+        transaction = current_transaction.get()
+        if transaction is None:
+            return call(*args, **kwargs)
+        with transaction.bind():
+            return call(*args, **kwargs)
+
+    return wrapper
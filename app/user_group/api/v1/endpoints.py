@@ -1,11 +1,18 @@
 from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from neomodel import db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth.dependencies import check_read_access, check_write_access
 from app.provider.enum import ProviderType
-from app.provider.schemas import ProviderQuery
+from app.query import (
+    NDJSON_MEDIA_TYPE,
+    DbQueryCommonParams,
+    Pagination,
+    SchemaSize,
+    is_ndjson_accepted,
+)
 
 # from app.flavor.crud import flavor
 # from app.flavor.schemas import FlavorRead, FlavorReadPublic, FlavorReadShort
@@ -19,8 +26,7 @@ from app.provider.schemas import ProviderQuery
 # from app.image.schemas_extended import ImageReadExtended, ImageReadExtendedPublic
 # from app.provider.crud import provider
 # from app.provider.schemas import ProviderRead, ProviderReadPublic, ProviderReadShort
-from app.query import DbQueryCommonParams, Pagination, SchemaSize
-from app.region.schemas import RegionQuery
+from app.transaction import TransactionRoute
 
 # from app.service.schemas import (
 #     BlockStorageServiceRead,
@@ -45,7 +51,7 @@ from app.user_group.api.dependencies import (
     valid_user_group_id,
     validate_new_user_group_values,
 )
-from app.user_group.crud import user_group
+from app.user_group.crud import async_user_group, user_group
 from app.user_group.models import UserGroup
 from app.user_group.schemas import (
     UserGroupQuery,
@@ -59,10 +65,11 @@ from app.user_group.schemas_extended import (
     UserGroupReadExtendedPublic,
 )
 
-router = APIRouter(prefix="/user_groups", tags=["user_groups"])
+router = APIRouter(
+    prefix="/user_groups", tags=["user_groups"], route_class=TransactionRoute
+)
 
 
-@db.read_transaction
 @router.get(
     "/",
     response_model=Union[
@@ -75,92 +82,83 @@ router = APIRouter(prefix="/user_groups", tags=["user_groups"])
     summary="Read all user groups",
     description="Retrieve all user groups stored in the database. \
         It is possible to filter on user groups attributes and other \
-        common query parameters.",
+        common query parameters. When filtering by provider or region, \
+        user groups with connections only list the SLAs and the projects \
+        matching them.",
 )
-def get_user_groups(
+async def get_user_groups(
+    response: Response,
     auth: bool = Depends(check_read_access),
     comm: DbQueryCommonParams = Depends(),
     page: Pagination = Depends(),
     size: SchemaSize = Depends(),
+    stream: bool = Depends(is_ndjson_accepted),
     item: UserGroupQuery = Depends(),
     idp_endpoint: Optional[str] = None,
     provider_name: Optional[str] = None,
     provider_type: Optional[ProviderType] = None,
     region_name: Optional[str] = None,
 ):
-    items = user_group.get_multi(
-        **comm.dict(exclude_none=True), **item.dict(exclude_none=True)
+    schema_options = {
+        "provider_name": provider_name,
+        "provider_type": provider_type.value if provider_type else None,
+        "region_name": region_name,
+    }
+    cypher_filters = user_group.get_relationship_filters(
+        idp_endpoint=idp_endpoint, **schema_options
     )
-    if idp_endpoint:
-        items = filter(
-            lambda x: x.identity_provider.single().endpoint == idp_endpoint, items
+    if stream:
+        return StreamingResponse(
+            user_group.stream_out_schema(
+                auth=auth,
+                short=size.short,
+                with_conn=size.with_conn,
+                schema_options=schema_options,
+                cypher_filters=cypher_filters,
+                **comm.dict(exclude_none=True),
+                **page.dict(exclude_none=True),
+                **item.dict(exclude_none=True),
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if size.fields is not None:
+        items, next_cursor = await async_user_group.get_multi_fields_with_cursor(
+            auth=auth,
+            fields=size.fields,
+            cypher_filters=cypher_filters,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        response = JSONResponse(jsonable_encoder(items))
+    else:
+        items = await async_user_group.get_multi(
+            cypher_filters=cypher_filters,
+            **comm.dict(exclude_none=True),
+            **page.dict(exclude_none=True),
+            **item.dict(exclude_none=True),
+        )
+        next_cursor = await async_user_group.get_next_cursor(
+            items=items, comm=comm, page=page
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(
+        await async_user_group.count(
+            cypher_filters=cypher_filters, **item.dict(exclude_none=True)
         )
-
-    if provider_type:
-        provider_type = provider_type.value
-    provider_query = ProviderQuery(name=provider_name, type=provider_type)
-    items = filter_on_provider_attr(items=items, provider_query=provider_query)
-
-    region_query = RegionQuery(name=region_name)
-    items = filter_on_region_attr(items=items, region_query=region_query)
-
-    items = user_group.paginate(items=items, page=page.page, size=page.size)
-    return user_group.choose_out_schema(
-        items=items, auth=auth, short=size.short, with_conn=size.with_conn
+    )
+    if size.fields is not None:
+        return response
+    return await async_user_group.choose_out_schema(
+        items=items,
+        auth=auth,
+        short=size.short,
+        with_conn=size.with_conn,
+        **schema_options,
     )
 
 
-def filter_on_provider_attr(
-    items: List[UserGroup], provider_query: ProviderQuery
-) -> List[UserGroup]:
-    """
-    Filter projects based on provider access.
-    """
-    attrs = provider_query.dict(exclude_none=True)
-    if not attrs:
-        return items
-
-    for item in items:
-        for sla in item.slas:
-            for project in sla.projects:
-                if not project.provider.get_or_none(**attrs):
-                    sla.projects = sla.projects.exclude(uid=project.uid)
-            if len(sla.projects) == 0:
-                item.slas = item.slas.exclude(uid=sla.uid)
-        if len(item.slas) == 0:
-            items.remove(item)
-
-    return items
-
-
-def filter_on_region_attr(
-    items: List[UserGroup], region_query: RegionQuery
-) -> List[UserGroup]:
-    """
-    Filter projects based on region access.
-    """
-    attrs = region_query.dict(exclude_none=True)
-    if not attrs:
-        return items
-
-    for item in items:
-        for sla in item.slas:
-            for project in sla.projects:
-                for quota in project.quotas:
-                    service = quota.service.single()
-                    if not service.region.get_or_none(**attrs):
-                        project.quotas = project.quotas.exclude(uid=quota.uid)
-                if len(project.quotas) == 0:
-                    sla.projects = sla.projects.exclude(uid=project.uid)
-            if len(sla.projects) == 0:
-                item.slas = item.slas.exclude(uid=sla.uid)
-        if len(item.slas) == 0:
-            items.remove(item)
-
-    return items
-
-
-@db.read_transaction
 @router.get(
     "/{user_group_uid}",
     response_model=Union[
@@ -175,17 +173,22 @@ def filter_on_region_attr(
         If no entity matches the given *uid*, the endpoint \
         raises a `not found` error.",
 )
-def get_user_group(
+async def get_user_group(
     auth: bool = Depends(check_read_access),
     size: SchemaSize = Depends(),
     item: UserGroup = Depends(valid_user_group_id),
 ):
-    return user_group.choose_out_schema(
+    if size.fields is not None:
+        items = await async_user_group.choose_out_fields(
+            items=[item], auth=auth, fields=size.fields
+        )
+        return JSONResponse(jsonable_encoder(items[0]))
+    items = await async_user_group.choose_out_schema(
         items=[item], auth=auth, short=size.short, with_conn=size.with_conn
-    )[0]
+    )
+    return items[0]
 
 
-@db.write_transaction
 @router.patch(
     "/{user_group_uid}",
     status_code=status.HTTP_200_OK,
@@ -216,7 +219,6 @@ def put_user_group(
     return db_item
 
 
-@db.write_transaction
 @router.delete(
     "/{user_group_uid}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -1,9 +1,12 @@
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from app.crud import CRUDBase
+from app.crud_async import AsyncCRUD
 from app.identity_provider.models import IdentityProvider
 from app.project.models import Project
+from app.projection import read_extended
 from app.provider.schemas_extended import UserGroupCreateExtended
+from app.query import CypherFilter
 from app.sla.crud import sla
 from app.user_group.models import UserGroup
 from app.user_group.schemas import (
@@ -33,6 +36,129 @@ class CRUDUserGroup(
 ):
     """User Group Create, Read, Update and Delete operations."""
 
+    def get_relationship_filters(
+        self,
+        *,
+        idp_endpoint: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        provider_type: Optional[str] = None,
+        region_name: Optional[str] = None,
+    ) -> List[CypherFilter]:
+        """Return the Cypher filters selecting user groups by related items.
+
+        Select user groups belonging to the identity provider with the given endpoint
+        and having an SLA pointing to a project which belongs to the provider with the
+        given name and type and which has quotas on services of the region with the
+        given name. All the conditions are evaluated by the database.
+        """
+        filters = []
+        if idp_endpoint is not None:
+            filters.append(
+                CypherFilter(
+                    condition="EXISTS { MATCH ({node})-[:BELONG_TO]->(idp) "
+                    "WHERE idp.endpoint = $idp_endpoint }",
+                    params={"idp_endpoint": idp_endpoint},
+                )
+            )
+
+        project_condition, params = self.__get_project_condition(
+            provider_name=provider_name,
+            provider_type=provider_type,
+            region_name=region_name,
+        )
+        if project_condition is not None:
+            project_condition = project_condition.replace("{project}", "project")
+            filters.append(
+                CypherFilter(
+                    condition="EXISTS { MATCH ({node})-[:AGREE]->()-[:REFER_TO]->"
+                    f"(project) WHERE {project_condition} }}",
+                    params=params,
+                )
+            )
+        return filters
+
+    def choose_out_schema(
+        self,
+        *,
+        items: List[UserGroup],
+        auth: bool,
+        short: bool,
+        with_conn: bool,
+        provider_name: Optional[str] = None,
+        provider_type: Optional[str] = None,
+        region_name: Optional[str] = None,
+    ) -> Union[
+        List[UserGroupReadPublic],
+        List[UserGroupReadShort],
+        List[UserGroupRead],
+        List[UserGroupReadExtendedPublic],
+        List[UserGroupReadExtended],
+    ]:
+        """Serialize the given user groups.
+
+        When the user groups have been selected by provider or region, extended
+        schemas only contain the SLAs and the projects matching them, as done by
+        get_relationship_filters.
+        """
+        project_condition, params = self.__get_project_condition(
+            provider_name=provider_name,
+            provider_type=provider_type,
+            region_name=region_name,
+        )
+        if not with_conn or project_condition is None:
+            return super().choose_out_schema(
+                items=items, auth=auth, short=short, with_conn=with_conn
+            )
+        schema = self.read_extended_schema if auth else self.read_extended_public_schema
+        conditions = {
+            "slas": "EXISTS { MATCH ({node})-[:REFER_TO]->(project) WHERE "
+            f"{project_condition.replace('{project}', 'project')} }}",
+            "slas.projects": project_condition.replace("{project}", "{node}"),
+        }
+        return read_extended(
+            items=items,
+            model=self.model,
+            schema=schema,
+            conditions=conditions,
+            params=params,
+        )
+
+    def __get_project_condition(
+        self,
+        *,
+        provider_name: Optional[str] = None,
+        provider_type: Optional[str] = None,
+        region_name: Optional[str] = None,
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Return the Cypher condition on a project, referred as '{project}',
+        belonging to the provider with the given name and type and having quotas on
+        services of the region with the given name, and the parameters it uses.
+
+        The condition is None when no value is given.
+        """
+        conditions = []
+        params = {}
+        provider_attrs = {"name": provider_name, "type": provider_type}
+        provider_attrs = {k: v for k, v in provider_attrs.items() if v is not None}
+        if provider_attrs:
+            matches = " AND ".join(
+                f"provider.{k} = $provider_{k}" for k in provider_attrs.keys()
+            )
+            conditions.append(
+                "EXISTS { MATCH ({project})<-[:BOOK_PROJECT_FOR_SLA]-(provider) "
+                f"WHERE {matches} }}"
+            )
+            params.update({f"provider_{k}": v for k, v in provider_attrs.items()})
+        if region_name is not None:
+            conditions.append(
+                "EXISTS { MATCH ({project})-[:USE_SERVICE_WITH]->()-[:APPLY_TO]->()"
+                "<-[:SUPPLY]-(region) WHERE region.name = $region_name }"
+            )
+            params["region_name"] = region_name
+        if not conditions:
+            return None, params
+        return " AND ".join(conditions), params
+
     def create(
         self,
         *,
@@ -156,3 +282,5 @@ user_group = CRUDUserGroup(
     read_extended_schema=UserGroupReadExtended,
     read_extended_public_schema=UserGroupReadExtendedPublic,
 )
+
+async_user_group = AsyncCRUD(crud=user_group)
@@ -0,0 +1,101 @@
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Hashable, Optional
+
+from neomodel import db
+
+from app.config import get_settings
+from app.response_cache import response_cache
+
+REGISTRY_VERSION_LABEL = "RegistryVersion"
+
+READ_VERSION_QUERY = f"MATCH (v:{REGISTRY_VERSION_LABEL}) RETURN max(v.version)"
+BUMP_VERSION_QUERY = (
+    f"MERGE (v:{REGISTRY_VERSION_LABEL} {{name: 'registry'}}) "
+    "SET v.version = coalesce(v.version, 0) + 1 RETURN v.version"
+)
+# Concurrent first writes would otherwise MERGE distinct version nodes.
+REGISTRY_VERSION_CONSTRAINT = (
+    "CREATE CONSTRAINT registry_version_name_unique IF NOT EXISTS "
+    f"FOR (v:{REGISTRY_VERSION_LABEL}) REQUIRE v.name IS UNIQUE"
+)
+
+
+class RegistryVersion:
+    """In-process copy of the registry version persisted in the database.
+
+    The version is incremented by every write transaction. With a TTL of 0 the
+    version is read on every call, in the active transaction if any. Otherwise
+    writes committed by this process update the copy immediately, the ones committed
+    by other processes are seen once the copy is older than the TTL: within the TTL
+    the copy also covers reads lagging behind those writes. The version read from
+    the database is then kept even if lower, for example after the database has
+    been restored or wiped. When the read version changed, the cached responses are
+    invalidated.
+    """
+
+    def __init__(self, *, ttl: float) -> None:
+        self.ttl = ttl
+        self.version: Optional[int] = None
+        self.read_at: Optional[float] = None
+        self.lock = Lock()
+
+    def get(self) -> int:
+        """Return the registry version, reading it from the database when stale."""
+        with self.lock:
+            if self.read_at is not None and monotonic() - self.read_at < self.ttl:
+                return self.version
+        results, _ = db.cypher_query(READ_VERSION_QUERY)
+        version = results[0][0] or 0
+        with self.lock:
+            changed = self.version is not None and version != self.version
+            self.version = version
+            self.read_at = monotonic()
+        if changed:
+            response_cache.bump()
+        return version
+
+    def set(self, version: int) -> None:
+        """Store the version reached by a write committed by this process."""
+        with self.lock:
+            if self.version is None or version > self.version:
+                self.version = version
+                self.read_at = monotonic()
+
+
+registry_version = RegistryVersion(ttl=get_settings().REGISTRY_VERSION_TTL)
+
+
+def bump_registry_version() -> int:
+    """Increment the persisted registry version and return the new one.
+
+    The query runs in the active transaction, if any, so the version changes only if
+    the written data is committed.
+    """
+    results, _ = db.cypher_query(BUMP_VERSION_QUERY)
+    return results[0][0]
+
+
+def make_etag(*, version: int, key: Hashable) -> str:
+    """Return the strong ETag of a response of the given registry version.
+
+    The request key (path, query, accepted media type and access level) is part of
+    the tag, so different representations never share it.
+    """
+    digest = sha256(repr(key).encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if the If-None-Match header matches the given ETag.
+
+    If-None-Match uses the weak comparison: W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
@@ -0,0 +1,118 @@
+from time import time
+from typing import Generator
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from flaat.user_infos import UserInfos
+from starlette.responses import JSONResponse
+
+from app import main
+from app.auth import dependencies
+from app.auth.cache import TokenCache, TokenCacheStats
+from app.main import app
+from app.pool import PoolStats
+from app.response_cache import ResponseCache, ResponseCacheStats
+
+
+@pytest.fixture
+def metrics_client() -> Generator:
+    """Client of the metrics endpoints, which do not query the database."""
+    with TestClient(app) as c:
+        yield c
+
+
+def accept_tokens(monkeypatch: pytest.MonkeyPatch, *, email: str) -> TokenCache:
+    """Accept any token as the one of the user with the given email and return the
+    token cache in use.
+    """
+    cache = TokenCache(max_size=8, negative_ttl=30)
+    monkeypatch.setattr(dependencies, "token_cache", cache)
+    monkeypatch.setattr(main, "token_cache", cache)
+    monkeypatch.setattr(dependencies, "admin_emails", frozenset(["admin-email"]))
+    monkeypatch.setattr(
+        dependencies.flaat,
+        "get_user_infos_from_access_token",
+        lambda token: UserInfos(
+            access_token_info=None,
+            user_info={"sub": "sub", "iss": "iss", "email": email},
+            introspection_info={"exp": time() + 60},
+        ),
+    )
+    return cache
+
+
+@pytest.fixture
+def read_only_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Accept any token as the one of a user without write access."""
+    accept_tokens(monkeypatch, email="reader-email")
+
+
+@pytest.fixture
+def write_user(monkeypatch: pytest.MonkeyPatch) -> TokenCache:
+    """Accept any token as the one of a user with write access."""
+    return accept_tokens(monkeypatch, email="admin-email")
+
+
+def test_read_pool_stats(
+    metrics_client: TestClient, skip_token_validation: None
+) -> None:
+    """Pool metrics are returned to users with write access."""
+    response = metrics_client.get(
+        "/metrics/neo4j-pool",
+        headers={"authorization": "Bearer token"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    stats = PoolStats(**response.json())
+    assert stats.acquisition_wait.buckets["+Inf"] == stats.acquisition_wait.count
+
+
+def test_read_token_cache_stats(
+    metrics_client: TestClient, write_user: TokenCache
+) -> None:
+    """Token cache metrics count the validations served from the cache."""
+    headers = {"authorization": "Bearer token"}
+    response = metrics_client.get("/metrics/token-cache", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    stats = TokenCacheStats(**response.json())
+    assert (stats.hits, stats.misses, stats.size) == (0, 1, 1)
+
+    response = metrics_client.get("/metrics/token-cache", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    stats = TokenCacheStats(**response.json())
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+
+def test_read_response_cache_stats(
+    monkeypatch: pytest.MonkeyPatch, metrics_client: TestClient, write_user: TokenCache
+) -> None:
+    """Response cache metrics report the hits, the misses and the generation."""
+    cache = ResponseCache(max_size=4, ttl=60)
+    cache.set("key", JSONResponse({}), cache.generation)
+    cache.get("key")
+    cache.get("missing")
+    cache.bump()
+    monkeypatch.setattr(main, "response_cache", cache)
+
+    response = metrics_client.get(
+        "/metrics/response-cache", headers={"authorization": "Bearer token"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert ResponseCacheStats(**response.json()) == ResponseCacheStats(
+        hits=1, misses=1, size=1, max_size=4, generation=1
+    )
+
+
+@pytest.mark.parametrize(
+    "url", ["/metrics/neo4j-pool", "/metrics/token-cache", "/metrics/response-cache"]
+)
+def test_metrics_require_write_access(
+    url: str, metrics_client: TestClient, read_only_user: None
+) -> None:
+    """Anonymous users and users without write access can not read metrics."""
+    response = metrics_client.get(url)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = metrics_client.get(url, headers={"authorization": "Bearer token"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["detail"] == "Write access required"
@@ -0,0 +1,109 @@
+import json
+from typing import Generator
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from neomodel import clear_neo4j_database, db
+
+from app.config import get_settings
+from app.flavor.models import Flavor
+from app.query import NDJSON_MEDIA_TYPE
+from app.version import (
+    RegistryVersion,
+    bump_registry_version,
+    etag_matches,
+    make_etag,
+)
+from tests.utils.flavor import create_random_flavor_patch
+
+
+def test_make_etag() -> None:
+    """Tags change with the registry version and with the request."""
+    etag = make_etag(version=1, key=("/flavors/", (), "", "read"))
+    assert etag.startswith('"1-') and etag.endswith('"')
+    assert etag != make_etag(version=2, key=("/flavors/", (), "", "read"))
+    assert etag != make_etag(version=1, key=("/flavors/", (), "", "anonymous"))
+
+
+def test_etag_matches() -> None:
+    """If-None-Match lists, weak tags and wildcards are supported."""
+    assert etag_matches('"1-a"', '"1-a"')
+    assert etag_matches('"0-b", W/"1-a"', '"1-a"')
+    assert etag_matches("*", '"1-a"')
+    assert not etag_matches('"0-a"', '"1-a"')
+    assert not etag_matches(None, '"1-a"')
+
+
+def test_conditional_get(
+    db_public_flavor: Flavor, api_client_read_write: TestClient
+) -> None:
+    """Matching tags get 304 until the registry changes."""
+    settings = get_settings()
+    url = f"{settings.API_V1_STR}/flavors/"
+    response = api_client_read_write.get(url, params={"with_conn": True})
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = api_client_read_write.get(
+        url, params={"with_conn": True}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    data = create_random_flavor_patch()
+    data.is_public = db_public_flavor.is_public
+    response = api_client_read_write.patch(
+        f"{url}{db_public_flavor.uid}", json=json.loads(data.json())
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = api_client_read_write.get(
+        url, params={"with_conn": True}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_conditional_get_after_external_write(
+    db_public_flavor: Flavor, api_client_read_write: TestClient
+) -> None:
+    """Writes committed by other processes change the tag at the next request."""
+    settings = get_settings()
+    url = f"{settings.API_V1_STR}/flavors/{db_public_flavor.uid}"
+    etag = api_client_read_write.get(url).headers["ETag"]
+
+    # Increment the persisted version without updating the in-process copy.
+    bump_registry_version()
+    response = api_client_read_write.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_version_reset(setup_and_teardown_db: Generator) -> None:
+    """A lower version read from the database replaces the in-process copy once
+    it is older than the TTL.
+    """
+    version = RegistryVersion(ttl=0)
+    version.set(bump_registry_version())
+    assert version.get() == 1
+
+    clear_neo4j_database(db)
+    assert version.get() == 0
+
+    version = RegistryVersion(ttl=60)
+    version.set(5)
+    assert version.get() == 5
+
+
+def test_streamed_response_has_no_etag(
+    db_public_flavor: Flavor, api_client_read_write: TestClient
+) -> None:
+    """Streamed bodies are read after the commit: they get no ETag."""
+    settings = get_settings()
+    response = api_client_read_write.get(
+        f"{settings.API_V1_STR}/flavors/", headers={"Accept": NDJSON_MEDIA_TYPE}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert "ETag" not in response.headers
+    assert "X-Total-Count" not in response.headers
@@ -8,6 +8,7 @@ from app.config import get_settings
 from app.flavor.models import Flavor
 from app.flavor.schemas import FlavorBase, FlavorRead, FlavorReadShort
 from app.flavor.schemas_extended import FlavorReadExtended
+from app.query import NDJSON_MEDIA_TYPE, encode_cursor
 from tests.utils.flavor import (
     create_random_flavor_patch,
     validate_read_extended_flavor_attrs,
@@ -222,6 +223,194 @@ def test_read_flavors_with_pagination(
     assert len(content) == 0
 
 
+def test_read_flavors_with_cursor(
+    db_public_flavor: Flavor,
+    db_private_flavor: Flavor,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read all flavors using keyset pagination.
+
+    Follow the cursor returned in the response headers until the last page.
+    """
+    settings = get_settings()
+    sorted_items = sorted([db_public_flavor, db_private_flavor], key=lambda x: x.uid)
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1, "cursor": ""}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert len(content) == 1
+    assert content[0]["uid"] == sorted_items[0].uid
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1, "cursor": cursor}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert len(content) == 1
+    assert content[0]["uid"] == sorted_items[1].uid
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1, "cursor": cursor}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert len(content) == 0
+    assert "X-Next-Cursor" not in response.headers
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1, "cursor": "invalid"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    cursor = encode_cursor(sort="vcpus", values=["many", sorted_items[0].uid])
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1, "cursor": cursor}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_read_flavors_total_count(
+    db_public_flavor: Flavor,
+    db_private_flavor: Flavor,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read a page of flavors.
+
+    The total number of matching flavors is returned in the response headers.
+    """
+    settings = get_settings()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"size": 1}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/", params={"uid": db_public_flavor.uid}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count"] == "1"
+
+
+def test_read_flavors_as_stream(
+    db_public_flavor: Flavor,
+    db_private_flavor: Flavor,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read all flavors as newline delimited JSON."""
+    settings = get_settings()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/",
+        params={"sort": "uid"},
+        headers={"Accept": NDJSON_MEDIA_TYPE},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"].startswith(NDJSON_MEDIA_TYPE)
+    content = [json.loads(i) for i in response.text.splitlines()]
+    sorted_items = sorted([db_public_flavor, db_private_flavor], key=lambda x: x.uid)
+    assert [i["uid"] for i in content] == [i.uid for i in sorted_items]
+
+
+def test_read_flavors_as_stream_with_invalid_sort(
+    db_public_flavor: Flavor, api_client_read_only: TestClient
+) -> None:
+    """Execute GET operations to read flavors as newline delimited JSON with
+    tampered cursors and unknown sort rules.
+
+    Errors are reported before streaming: no truncated 200 responses.
+    """
+    settings = get_settings()
+    uid = db_public_flavor.uid
+
+    for params in [
+        {"size": 1, "cursor": encode_cursor(sort="-unknown", values=["x", uid])},
+        {"size": 1, "cursor": encode_cursor(sort="vcpus", values=["many", uid])},
+        {"sort": "unknown"},
+        {"sort": "services"},
+    ]:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/flavors/",
+            params=params,
+            headers={"Accept": NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_read_flavors_fields(
+    db_public_flavor: Flavor,
+    db_private_flavor: Flavor,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read only some attributes of all flavors."""
+    settings = get_settings()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/",
+        params={"fields": "name,vcpus,ram", "sort": "uid"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    sorted_items = sorted([db_public_flavor, db_private_flavor], key=lambda x: x.uid)
+    assert content == [
+        {"uid": i.uid, "name": i.name, "vcpus": i.vcpus, "ram": i.ram}
+        for i in sorted_items
+    ]
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/{db_public_flavor.uid}",
+        params={"fields": "name"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "uid": db_public_flavor.uid,
+        "name": db_public_flavor.name,
+    }
+
+
+def test_read_flavors_fields_with_cursor(
+    db_public_flavor: Flavor,
+    db_private_flavor: Flavor,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read only some attributes of all flavors using
+    keyset pagination.
+
+    The sort attribute is not requested: it is not returned, but the next cursor
+    and the total count are.
+    """
+    settings = get_settings()
+    sorted_items = sorted(
+        [db_public_flavor, db_private_flavor], key=lambda x: x.name, reverse=True
+    )
+
+    cursor = ""
+    for item in sorted_items:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/flavors/",
+            params={"fields": "vcpus", "sort": "-name", "size": 1, "cursor": cursor},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"uid": item.uid, "vcpus": item.vcpus}]
+        assert response.headers["X-Total-Count"] == "2"
+        cursor = response.headers["X-Next-Cursor"]
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/flavors/",
+        params={"fields": "vcpus", "size": 1, "cursor": cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+    assert response.headers["X-Total-Count"] == "2"
+
+
 def test_read_flavors_with_conn(
     db_public_flavor: Flavor,
     db_private_flavor: Flavor,
@@ -268,6 +268,39 @@ def test_read_locations_short(
     )
 
 
+def test_read_locations_fields(
+    db_location: Location,
+    db_location2: Location,
+    client: TestClient,
+) -> None:
+    """Execute GET operations to read only some attributes of all locations.
+
+    Anonymous users get only the requested attributes of the public read schema:
+    not public, internal and unknown attributes are ignored.
+    """
+    settings = get_settings()
+    fields = "site,country,country_code,coordinates,regions,unknown"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/locations/", params={"fields": fields, "sort": "uid"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    sorted_items = sorted([db_location, db_location2], key=lambda x: x.uid)
+    assert response.json() == [
+        {"uid": i.uid, "site": i.site, "country": i.country} for i in sorted_items
+    ]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/locations/{db_location.uid}", params={"fields": fields}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "uid": db_location.uid,
+        "site": db_location.site,
+        "country": db_location.country,
+    }
+
+
 def test_read_location(
     db_location: Location,
     client: TestClient,
@@ -0,0 +1,55 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.matchmaking.crud import build_match_query
+from app.matchmaking.schemas import MatchRequirements
+
+
+def test_build_match_query() -> None:
+    """Filters on unset requirements are omitted."""
+    query = build_match_query(by_uid=True, requirements=MatchRequirements())
+    assert "$user_group_uid" in query
+    assert "$idp_endpoint" not in query
+    assert "$region_name" not in query
+    assert "Location" not in query
+    assert "$os_distro" not in query
+
+    query = build_match_query(
+        by_uid=False,
+        requirements=MatchRequirements(
+            region_name="region", country="Italy", os_distro="ubuntu"
+        ),
+    )
+    assert "$user_group_uid" not in query
+    assert "$idp_endpoint" in query
+    assert "$region_name" in query
+    assert "$country" in query
+    assert "$os_distro" in query
+
+
+def test_read_candidates_no_auth(client: TestClient) -> None:
+    """Anonymous users can't read candidates."""
+    settings = get_settings()
+    response = client.get(
+        f"{settings.API_V1_STR}/matchmaking/", params={"user_group_uid": "uid"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_read_candidates_without_user_group(api_client_read_only: TestClient) -> None:
+    """The user group must be identified by uid or by name and identity provider."""
+    settings = get_settings()
+    for params in [
+        {},
+        {"user_group_name": "name"},
+        {
+            "user_group_uid": "uid",
+            "idp_endpoint": "https://idp",
+            "user_group_name": "n",
+        },
+    ]:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/matchmaking/", params=params
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -8,6 +8,7 @@ from app.config import get_settings
 from app.project.models import Project
 from app.project.schemas import ProjectBase, ProjectRead, ProjectReadShort
 from app.project.schemas_extended import ProjectReadExtended
+from app.query import NDJSON_MEDIA_TYPE
 from tests.utils.project import (
     create_random_project_patch,
     validate_read_extended_project_attrs,
@@ -236,6 +237,51 @@ def test_read_projects_with_conn(
     )
 
 
+def test_read_projects_as_stream(
+    db_project: Project, db_project2: Project, api_client_read_only: TestClient
+) -> None:
+    """Execute GET operations to read all projects as newline delimited JSON."""
+    settings = get_settings()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/projects/",
+        params={"sort": "uid"},
+        headers={"Accept": NDJSON_MEDIA_TYPE},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"].startswith(NDJSON_MEDIA_TYPE)
+    content = [json.loads(i) for i in response.text.splitlines()]
+    sorted_items = sorted([db_project, db_project2], key=lambda x: x.uid)
+    assert [i["uid"] for i in content] == [i.uid for i in sorted_items]
+
+
+def test_read_projects_as_stream_filtered_by_region(
+    db_project_with_single_compute_quota: Project, api_client_read_only: TestClient
+) -> None:
+    """Execute GET operations to read all projects, with their relationships, as
+    newline delimited JSON.
+
+    As in the standard reads, a region name keeps only the quotas on that region.
+    """
+    settings = get_settings()
+    db_quota = db_project_with_single_compute_quota.quotas.single()
+    db_region = db_quota.service.single().region.single()
+
+    for region_name, quotas in [
+        (db_region.name, [db_quota.uid]),
+        (f"not-{db_region.name}", []),
+    ]:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/projects/",
+            params={"with_conn": True, "region_name": region_name},
+            headers={"Accept": NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        content = [json.loads(i) for i in response.text.splitlines()]
+        assert [i["uid"] for i in content] == [db_project_with_single_compute_quota.uid]
+        assert [i["uid"] for i in content[0]["quotas"]] == quotas
+
+
 def test_read_projects_short(
     db_project: Project, db_project2: Project, api_client_read_only: TestClient
 ) -> None:
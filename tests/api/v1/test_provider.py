@@ -1,14 +1,18 @@
 import json
+from typing import Generator
 from uuid import uuid4
 
 from fastapi import status
 from fastapi.testclient import TestClient
 
 from app.config import get_settings
+from app.provider.crud import provider
 from app.provider.models import Provider
 from app.provider.schemas import ProviderBase, ProviderRead, ProviderReadShort
 from app.provider.schemas_extended import ProviderReadExtended
+from app.query import NDJSON_MEDIA_TYPE, encode_cursor
 from tests.utils.provider import (
+    create_random_provider_located_at,
     create_random_provider_patch,
     validate_read_extended_provider_attrs,
     validate_read_provider_attrs,
@@ -231,6 +235,118 @@ def test_read_providers_with_pagination(
     assert len(content) == 0
 
 
+def test_read_providers_with_cursor(
+    db_provider_with_single_project: Provider,
+    db_provider_with_multiple_projects: Provider,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read all providers using keyset pagination.
+
+    Follow the cursor returned in the response headers, sorting on a descending
+    non-uid attribute, until the last page.
+    """
+    settings = get_settings()
+    sorted_items = sorted(
+        [db_provider_with_single_project, db_provider_with_multiple_projects],
+        key=lambda x: x.name,
+        reverse=True,
+    )
+
+    cursor = ""
+    for item in sorted_items:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/providers/",
+            params={"size": 1, "sort": "-name", "cursor": cursor},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        content = response.json()
+        assert len(content) == 1
+        assert content[0]["uid"] == item.uid
+        cursor = response.headers["X-Next-Cursor"]
+
+    # The sort rule stored in the cursor takes precedence over the given one
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/providers/",
+        params={"size": 1, "sort": "name", "cursor": cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert len(content) == 0
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_read_providers_with_tampered_cursor(
+    db_provider_with_single_project: Provider, api_client_read_only: TestClient
+) -> None:
+    """Execute GET operations to read providers with well encoded cursors holding
+    unknown sort attributes or not valid values.
+
+    Reject them with a `bad request` error.
+    """
+    settings = get_settings()
+    uid = db_provider_with_single_project.uid
+    name = db_provider_with_single_project.name
+
+    for cursor in [
+        encode_cursor(sort="-unknown", values=[name, uid]),
+        encode_cursor(sort="regions", values=[name, uid]),
+        encode_cursor(sort="name", values=[{"name": name}, uid]),
+        encode_cursor(sort="name", values=[name, 0]),
+        encode_cursor(sort=None, values=[]),
+    ]:
+        response = api_client_read_only.get(
+            f"{settings.API_V1_STR}/providers/", params={"size": 1, "cursor": cursor}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_read_providers_total_count_with_geo_filters(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Execute GET operations to read a page of providers near a point.
+
+    The total number of matching providers, returned in the response headers,
+    applies the same geographic filters of the returned items: providers with many
+    regions near the point are counted once.
+    """
+    settings = get_settings()
+    bari_and_rome = provider.create(
+        obj_in=create_random_provider_located_at(
+            coordinates=[(41.12, 16.87), (41.9, 12.5)]
+        )
+    )
+    naples = provider.create(
+        obj_in=create_random_provider_located_at(coordinates=[(40.85, 14.27)])
+    )
+    provider.create(
+        obj_in=create_random_provider_located_at(coordinates=[(45.46, 9.19)])
+    )
+    params = {"near": "41.9,12.5", "radius_km": 400, "sort_by_distance": True}
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/providers/", params=params
+    )
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert [i["uid"] for i in content] == [bari_and_rome.uid, naples.uid]
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/providers/", params={**params, "size": 1}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/providers/",
+        params={**params, "name": naples.name},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["uid"] for i in response.json()] == [naples.uid]
+    assert response.headers["X-Total-Count"] == "1"
+
+
 def test_read_providers_with_conn(
     db_provider_with_single_project: Provider,
     db_provider_with_multiple_projects: Provider,
@@ -263,6 +379,37 @@ def test_read_providers_with_conn(
     )
 
 
+def test_read_providers_as_stream_with_conn(
+    db_provider_with_single_project: Provider,
+    db_provider_with_multiple_projects: Provider,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read all providers, with their relationships, as
+    newline delimited JSON.
+
+    Relationships are read after the request transaction, batch by batch.
+    """
+    settings = get_settings()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/providers/",
+        params={"with_conn": True, "sort": "uid"},
+        headers={"Accept": NDJSON_MEDIA_TYPE},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"].startswith(NDJSON_MEDIA_TYPE)
+    content = [json.loads(i) for i in response.text.splitlines()]
+    sorted_items = sorted(
+        [db_provider_with_single_project, db_provider_with_multiple_projects],
+        key=lambda x: x.uid,
+    )
+    assert len(content) == len(sorted_items)
+    for obj_out, db_item in zip(content, sorted_items):
+        validate_read_extended_provider_attrs(
+            obj_out=ProviderReadExtended(**obj_out), db_item=db_item
+        )
+
+
 def test_read_providers_short(
     db_provider_with_single_project: Provider,
     db_provider_with_multiple_projects: Provider,
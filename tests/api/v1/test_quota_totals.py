@@ -0,0 +1,233 @@
+from datetime import date
+from typing import Generator, Tuple
+from uuid import uuid4
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.project.models import Project
+from app.provider.models import Provider
+from app.quota.crud import build_quota_totals_query
+from app.quota.enum import QuotaGroupBy, QuotaType
+from app.quota.models import BlockStorageQuota, ComputeQuota, NetworkQuota, Quota
+from app.quota.schemas import QuotaTotals
+from app.region.models import Region
+from app.service.enum import ServiceType
+from app.service.models import BlockStorageService, NetworkService, Service
+from app.sla.models import SLA
+from app.user_group.models import UserGroup
+from tests.utils.utils import random_lower_string
+
+
+def test_build_quota_totals_query() -> None:
+    """Only the relationships needed by the group keys are traversed."""
+    query = build_quota_totals_query(group_by=[])
+    assert "Region" not in query
+    assert "UserGroup" not in query
+    assert "ORDER BY per_user" in query
+
+    query = build_quota_totals_query(
+        group_by=[QuotaGroupBy.USER_GROUP, QuotaGroupBy.REGION]
+    )
+    assert "MATCH (q)-[:APPLY_TO]" in query
+    assert "OPTIONAL MATCH" in query
+    assert "ORDER BY region_uid, region_name, user_group_uid" in query
+    assert "sum(CASE WHEN q.gigabytes >= 0 THEN q.gigabytes END)" in query
+
+
+def test_read_totals_invalid_group_by(client: TestClient) -> None:
+    """Unknown group keys are rejected."""
+    settings = get_settings()
+    response = client.get(
+        f"{settings.API_V1_STR}/quotas/totals", params={"group_by": "project"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_read_totals_by_service_type(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Quotas are summed per type; per user quotas are summed apart."""
+    settings = get_settings()
+    compute = QuotaType.COMPUTE.value
+    ComputeQuota(type=compute, cores=2, ram=1024).save()
+    ComputeQuota(type=compute, cores=4, instances=3).save()
+    ComputeQuota(type=compute, cores=8, per_user=True).save()
+    NetworkQuota(type=QuotaType.NETWORK.value, ports=10).save()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/quotas/totals", params={"group_by": "service_type"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    totals = [QuotaTotals(**i) for i in response.json()]
+    assert [(i.service_type, i.per_user, i.quotas) for i in totals] == [
+        (QuotaType.COMPUTE, False, 2),
+        (QuotaType.COMPUTE, True, 1),
+        (QuotaType.NETWORK, False, 1),
+    ]
+    assert totals[0].totals == {"cores": 6, "instances": 3, "ram": 1024}
+    assert totals[1].totals == {"cores": 8}
+    assert totals[2].totals == {"ports": 10}
+    assert totals[0].provider_uid is None
+    assert totals[0].unlimited == {}
+
+
+def create_quota_on(*, quota: Quota, service: Service, project: Project) -> Quota:
+    """Save the quota and connect it to the given service and project."""
+    quota.save()
+    quota.service.connect(service)
+    project.quotas.connect(quota)
+    return quota
+
+
+def create_region_with_service(
+    *, provider: Provider, service: Service
+) -> Tuple[Region, Service]:
+    """Save a region of the given provider supplying the given service."""
+    region = Region(name=random_lower_string()).save()
+    provider.regions.connect(region)
+    service.save()
+    region.services.connect(service)
+    return region, service
+
+
+def create_quotas_graph() -> Tuple[Provider, Provider, UserGroup]:
+    """Two providers with a region each.
+
+    The first region supplies a block storage service with two quotas, one of them
+    unlimited, of a project agreed by a user group. The second one supplies a network
+    service with a quota of a project without SLA.
+    """
+    block_storage_type = ServiceType.BLOCK_STORAGE.value
+    network_type = ServiceType.NETWORK.value
+    provider1 = Provider(name="provider1", type="openstack").save()
+    provider2 = Provider(name="provider2", type="openstack").save()
+    _, block_storage_service = create_region_with_service(
+        provider=provider1,
+        service=BlockStorageService(
+            name=random_lower_string(),
+            endpoint=random_lower_string(),
+            type=block_storage_type,
+        ),
+    )
+    _, network_service = create_region_with_service(
+        provider=provider2,
+        service=NetworkService(
+            name=random_lower_string(),
+            endpoint=random_lower_string(),
+            type=network_type,
+        ),
+    )
+
+    project1 = Project(name=random_lower_string(), uuid=uuid4().hex).save()
+    project2 = Project(name=random_lower_string(), uuid=uuid4().hex).save()
+    user_group = UserGroup(name=random_lower_string()).save()
+    sla = SLA(
+        doc_uuid=uuid4().hex, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1)
+    ).save()
+    user_group.slas.connect(sla)
+    sla.projects.connect(project1)
+
+    create_quota_on(
+        quota=BlockStorageQuota(type=block_storage_type, gigabytes=1000, volumes=5),
+        service=block_storage_service,
+        project=project1,
+    )
+    create_quota_on(
+        quota=BlockStorageQuota(type=block_storage_type, gigabytes=-1, volumes=-1),
+        service=block_storage_service,
+        project=project1,
+    )
+    create_quota_on(
+        quota=NetworkQuota(type=network_type, ports=10),
+        service=network_service,
+        project=project2,
+    )
+    return provider1, provider2, user_group
+
+
+def test_read_totals_by_provider(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Quotas are summed per provider; unlimited values are counted apart."""
+    settings = get_settings()
+    provider1, provider2, _ = create_quotas_graph()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/quotas/totals", params={"group_by": "provider"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    totals = sorted(
+        [QuotaTotals(**i) for i in response.json()], key=lambda x: x.provider_name
+    )
+    assert [(i.provider_uid, i.quotas) for i in totals] == [
+        (provider1.uid, 2),
+        (provider2.uid, 1),
+    ]
+    assert totals[0].totals == {"gigabytes": 1000, "volumes": 5}
+    assert totals[0].unlimited == {"gigabytes": 1, "volumes": 1}
+    assert totals[1].totals == {"ports": 10}
+    assert totals[1].unlimited == {}
+    assert totals[0].region_uid is None
+
+
+def test_read_totals_by_region(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Quotas are summed per region and provider."""
+    settings = get_settings()
+    provider1, provider2, _ = create_quotas_graph()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/quotas/totals",
+        params={"group_by": ["provider", "region"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    totals = sorted(
+        [QuotaTotals(**i) for i in response.json()], key=lambda x: x.provider_name
+    )
+    assert [(i.region_uid, i.quotas) for i in totals] == [
+        (provider1.regions.single().uid, 2),
+        (provider2.regions.single().uid, 1),
+    ]
+    assert totals[0].totals == {"gigabytes": 1000, "volumes": 5}
+    assert totals[0].unlimited == {"gigabytes": 1, "volumes": 1}
+
+
+def test_read_totals_by_user_group(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Quotas are summed per user group; quotas of projects without SLA have none."""
+    settings = get_settings()
+    _, _, user_group = create_quotas_graph()
+
+    response = api_client_read_only.get(
+        f"{settings.API_V1_STR}/quotas/totals", params={"group_by": "user_group"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    totals = [QuotaTotals(**i) for i in response.json()]
+    assert [(i.user_group_uid, i.user_group_name, i.quotas) for i in totals] == [
+        (user_group.uid, user_group.name, 2),
+        (None, None, 1),
+    ]
+    assert totals[0].totals == {"gigabytes": 1000, "volumes": 5}
+    assert totals[1].totals == {"ports": 10}
+
+
+def test_read_totals_of_unlimited_quotas(
+    setup_and_teardown_db: Generator, api_client_read_only: TestClient
+) -> None:
+    """Attributes set only to unlimited values have no total."""
+    settings = get_settings()
+    block_storage = QuotaType.BLOCK_STORAGE.value
+    BlockStorageQuota(type=block_storage, gigabytes=-1).save()
+    BlockStorageQuota(type=block_storage, gigabytes=-1, volumes=3).save()
+
+    response = api_client_read_only.get(f"{settings.API_V1_STR}/quotas/totals")
+    assert response.status_code == status.HTTP_200_OK
+    totals = [QuotaTotals(**i) for i in response.json()]
+    assert len(totals) == 1
+    assert totals[0].quotas == 2
+    assert totals[0].totals == {"volumes": 3}
+    assert totals[0].unlimited == {"gigabytes": 2}
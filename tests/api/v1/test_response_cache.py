@@ -0,0 +1,90 @@
+import json
+from time import sleep
+from typing import Generator
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from app.config import get_settings
+from app.flavor.models import Flavor
+from app.response_cache import ResponseCache, response_cache
+from app.transaction import record_write
+from app.version import registry_version
+from tests.utils.flavor import create_random_flavor_patch
+
+
+@pytest.fixture
+def empty_cache() -> Generator:
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def test_generation() -> None:
+    """Writes on any label invalidate the cached responses."""
+    cache = ResponseCache(max_size=2, ttl=60)
+    cache.set("key", JSONResponse({"a": 1}), cache.generation)
+    response = cache.get("key")
+    assert response.body == b'{"a":1}'
+    assert response.headers["content-type"] == "application/json"
+
+    cache.bump()
+    assert cache.get("key") is None
+    assert cache.get_stats().generation == 1
+
+    outdated = cache.generation
+    cache.bump()
+    cache.set("key", JSONResponse({"a": 1}), outdated)
+    assert cache.get("key") is None
+
+
+def test_ttl_and_lru() -> None:
+    """Expired and least recently used responses are evicted."""
+    cache = ResponseCache(max_size=2, ttl=0.01)
+    cache.set("key", JSONResponse({}), cache.generation)
+    sleep(0.02)
+    assert cache.get("key") is None
+
+    cache = ResponseCache(max_size=2, ttl=60)
+    for key in ["a", "b"]:
+        cache.set(key, JSONResponse({}), cache.generation)
+    cache.get("a")
+    cache.set("c", JSONResponse({}), cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_record_write_outside_requests(setup_and_teardown_db: Generator) -> None:
+    """Writes made outside requests invalidate the responses immediately."""
+    generation = response_cache.generation
+    version = registry_version.get()
+    record_write(Flavor.inherited_labels())
+    assert response_cache.generation == generation + 1
+    assert registry_version.get() == version + 1
+
+
+def test_patch_invalidates_cache(
+    empty_cache: None, db_public_flavor: Flavor, api_client_read_write: TestClient
+) -> None:
+    """Responses are served from the cache until a write is committed through the
+    API.
+    """
+    settings = get_settings()
+    url = f"{settings.API_V1_STR}/flavors/{db_public_flavor.uid}"
+    first = api_client_read_write.get(url, params={"short": True})
+    second = api_client_read_write.get(url, params={"short": True})
+    assert second.json() == first.json()
+    assert response_cache.get_stats().hits == 1
+
+    data = create_random_flavor_patch()
+    data.is_public = db_public_flavor.is_public
+    response = api_client_read_write.patch(url, json=json.loads(data.json()))
+    assert response.status_code == status.HTTP_200_OK
+
+    response = api_client_read_write.get(url, params={"short": True})
+    assert response.json()["name"] == data.name
+    stats = response_cache.get_stats()
+    assert (stats.hits, stats.misses) == (1, 2)
@@ -0,0 +1,72 @@
+from typing import Generator
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from neomodel import db
+
+from app.config import get_settings
+from app.flavor.models import Flavor
+from app.image.models import Image
+from app.search.crud import escape_search_text, get_search_index_statement
+from app.search.schemas import SearchHit
+
+
+@pytest.fixture
+def search_index(setup_and_teardown_db: Generator) -> None:
+    db.cypher_query(get_search_index_statement())
+    db.cypher_query("CALL db.awaitIndexes()")
+
+
+def test_escape_search_text() -> None:
+    """Lucene operators in the text are matched literally."""
+    assert escape_search_text("ubuntu 22.04") == "ubuntu 22.04"
+    assert escape_search_text("a:b (c)") == "a\\:b \\(c\\)"
+    assert escape_search_text(" ubuntu OR ") == "ubuntu or"
+    assert escape_search_text("NOT ORACLE AND") == "not ORACLE and"
+    assert escape_search_text("  ") == ""
+
+
+def test_search(search_index: None, client: TestClient) -> None:
+    """Hits of different types are ranked together."""
+    settings = get_settings()
+    image = Image(name="ubuntu-22", uuid="1", os_distro="ubuntu").save()
+    flavor = Flavor(name="gpu-large", uuid="2", description="ubuntu gpu").save()
+    db.cypher_query("CALL db.awaitIndexes()")
+
+    response = client.get(f"{settings.API_V1_STR}/search/", params={"q": "ubuntu gpu"})
+    assert response.status_code == status.HTTP_200_OK
+    hits = [SearchHit(**i) for i in response.json()]
+    assert [i.uid for i in hits] == [flavor.uid, image.uid]
+    assert hits[0].type == "Flavor"
+    assert hits[0].score >= hits[1].score
+
+    response = client.get(
+        f"{settings.API_V1_STR}/search/", params={"q": "ubuntu", "type": "Image"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["uid"] for i in response.json()] == [image.uid]
+
+
+def test_search_empty_text(client: TestClient) -> None:
+    """Empty texts are rejected."""
+    settings = get_settings()
+    response = client.get(f"{settings.API_V1_STR}/search/", params={"q": ""})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_search_operators(search_index: None, client: TestClient) -> None:
+    """Dangling boolean keywords are searched as words and blank texts match
+    nothing.
+    """
+    settings = get_settings()
+    image = Image(name="ubuntu-22", uuid="1", os_distro="ubuntu").save()
+    db.cypher_query("CALL db.awaitIndexes()")
+
+    response = client.get(f"{settings.API_V1_STR}/search/", params={"q": "ubuntu OR"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["uid"] for i in response.json()] == [image.uid]
+
+    response = client.get(f"{settings.API_V1_STR}/search/", params={"q": " "})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
@@ -5,6 +5,7 @@ from fastapi import status
 from fastapi.testclient import TestClient
 
 from app.config import get_settings
+from app.query import NDJSON_MEDIA_TYPE
 from app.user_group.models import UserGroup
 from app.user_group.schemas import (
     UserGroupBase,
@@ -332,6 +333,39 @@ def test_read_user_group_with_provider_name(
     )
 
 
+def test_read_user_group_with_provider_name_and_shared_sla(
+    db_user_group_with_sla_with_multiple_projects: UserGroup,
+    api_client_read_only: TestClient,
+) -> None:
+    """Execute GET operations to read user groups filtered by provider.
+
+    SLAs only list the projects of the given provider, in standard and streamed
+    responses."""
+    settings = get_settings()
+
+    db_sla = db_user_group_with_sla_with_multiple_projects.slas.single()
+    db_project = db_sla.projects.all()[1]
+    db_provider = db_project.provider.single()
+    url = f"{settings.API_V1_STR}/user_groups/"
+    params = {"with_conn": True, "provider_name": db_provider.name}
+    response = api_client_read_only.get(url, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert len(content) == 1
+    obj_out = UserGroupReadExtended(**content[0])
+    assert [i.uid for i in obj_out.slas] == [db_sla.uid]
+    assert [i.uid for i in obj_out.slas[0].projects] == [db_project.uid]
+
+    response = api_client_read_only.get(
+        url, params=params, headers={"Accept": NDJSON_MEDIA_TYPE}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    lines = response.text.splitlines()
+    assert len(lines) == 1
+    obj_out = UserGroupReadExtended(**json.loads(lines[0]))
+    assert [i.uid for i in obj_out.slas[0].projects] == [db_project.uid]
+
+
 def test_read_user_group_with_provider_type(
     db_user_group: UserGroup, api_client_read_only: TestClient
 ) -> None:
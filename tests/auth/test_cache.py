@@ -0,0 +1,109 @@
+from time import time
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+from flaat.exceptions import FlaatException, FlaatUnauthenticated
+from flaat.user_infos import UserInfos
+
+from app.auth import dependencies
+from app.auth.cache import TokenCache
+
+
+def get_user_infos(*, exp: Optional[float]) -> UserInfos:
+    introspection_info = None if exp is None else {"exp": exp}
+    return UserInfos(
+        access_token_info=None,
+        user_info={"sub": "sub", "iss": "iss"},
+        introspection_info=introspection_info,
+    )
+
+
+def test_valid_token() -> None:
+    """Valid tokens are cached until they expire."""
+    cache = TokenCache(max_size=2, negative_ttl=30)
+    user_infos = get_user_infos(exp=time() + 60)
+    assert cache.get("token") == (False, None)
+    cache.set("token", user_infos)
+    assert cache.get("token") == (True, user_infos)
+    assert "token" not in cache.entries
+
+    cache.set("expired", get_user_infos(exp=time() - 1))
+    cache.set("unknown", get_user_infos(exp=None))
+    assert cache.get("expired") == (False, None)
+    assert cache.get("unknown") == (False, None)
+
+    stats = cache.get_stats()
+    assert (stats.hits, stats.negative_hits, stats.misses, stats.size) == (1, 0, 3, 1)
+
+
+def test_invalid_token() -> None:
+    """Invalid tokens are cached for the negative TTL."""
+    cache = TokenCache(max_size=2, negative_ttl=30)
+    cache.set("token", None)
+    assert cache.get("token") == (True, None)
+    assert cache.get_stats().negative_hits == 1
+
+    cache = TokenCache(max_size=2, negative_ttl=0)
+    cache.set("token", None)
+    assert cache.get("token") == (False, None)
+
+
+def test_lru_eviction() -> None:
+    """The least recently used token is evicted first."""
+    cache = TokenCache(max_size=2, negative_ttl=30)
+    cache.set("a", None)
+    cache.set("b", None)
+    cache.get("a")
+    cache.set("c", None)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, None)
+    assert cache.get("c") == (True, None)
+
+
+def test_identity_provider_called_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each token reaches the identity provider once, valid or not."""
+    monkeypatch.setattr(
+        dependencies, "token_cache", TokenCache(max_size=8, negative_ttl=30)
+    )
+    calls = []
+
+    def validate(token: str) -> UserInfos:
+        calls.append(token)
+        if token == "invalid":
+            raise FlaatUnauthenticated("Invalid token")
+        return get_user_infos(exp=time() + 60)
+
+    monkeypatch.setattr(
+        dependencies.flaat, "get_user_infos_from_access_token", validate
+    )
+    for _ in range(2):
+        user_infos = dependencies.get_user_infos("valid")
+        assert user_infos.subject == "sub"
+        with pytest.raises(HTTPException) as e:
+            dependencies.get_user_infos("invalid")
+        assert e.value.status_code == 401
+    assert calls == ["valid", "invalid"]
+
+
+def test_validation_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tokens which could not be validated get 401 and are validated again by the
+    following requests.
+    """
+    monkeypatch.setattr(
+        dependencies, "token_cache", TokenCache(max_size=8, negative_ttl=30)
+    )
+    calls = []
+
+    def validate(token: str) -> UserInfos:
+        calls.append(token)
+        raise FlaatException("User info endpoint failed")
+
+    monkeypatch.setattr(
+        dependencies.flaat, "get_user_infos_from_access_token", validate
+    )
+    for _ in range(2):
+        with pytest.raises(HTTPException) as e:
+            dependencies.get_user_infos("token")
+        assert e.value.status_code == 401
+    assert calls == ["token", "token"]
@@ -0,0 +1,133 @@
+import json
+from threading import Thread
+from time import sleep, time
+from typing import Any, Dict, List
+
+import jwt
+import pytest
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flaat.exceptions import FlaatUnauthenticated
+
+from app.auth import jwks
+from app.auth.jwks import LocalJWTVerifier
+
+ISSUER = "https://idp.example.org"
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class MockResponse:
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self.data
+
+
+@pytest.fixture
+def requested_urls(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Serve the discovery document and the JWKS of the mock issuer."""
+    urls = []
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+
+    def get(url: str, timeout: float) -> MockResponse:
+        urls.append(url)
+        if url == f"{ISSUER}/.well-known/openid-configuration":
+            return MockResponse({"issuer": ISSUER, "jwks_uri": f"{ISSUER}/jwks"})
+        return MockResponse({"keys": [{**jwk, "kid": "key1", "use": "sig"}]})
+
+    monkeypatch.setattr(jwks.requests, "get", get)
+    return urls
+
+
+def get_verifier() -> LocalJWTVerifier:
+    return LocalJWTVerifier(
+        trusted_issuers=[f"{ISSUER}/"],
+        timeout=1,
+        refresh_interval=3600,
+        min_refresh_interval=3600,
+    )
+
+
+def encode(*, key=private_key, kid: str = "key1", **claims) -> str:
+    payload = {"iss": ISSUER, "sub": "sub", "exp": time() + 60, **claims}
+    return jwt.encode(payload, key, algorithm="RS256", headers={"kid": kid})
+
+
+def test_verify(requested_urls: List[str]) -> None:
+    """Keys are fetched once; claims are available to the access checks."""
+    verifier = get_verifier()
+    for _ in range(2):
+        user_infos = verifier.verify(encode(email="admin@example.org"))
+        assert user_infos.subject == "sub"
+        assert user_infos.get("email") == "admin@example.org"
+        assert user_infos.valid_for_secs > 0
+    assert requested_urls == [
+        f"{ISSUER}/.well-known/openid-configuration",
+        f"{ISSUER}/jwks",
+    ]
+
+
+def test_invalid_tokens(requested_urls: List[str]) -> None:
+    """Expired tokens and tokens with a wrong signature are rejected."""
+    verifier = get_verifier()
+    with pytest.raises(FlaatUnauthenticated):
+        verifier.verify(encode(exp=time() - 60))
+    with pytest.raises(FlaatUnauthenticated):
+        verifier.verify(encode(key=other_key))
+
+
+def test_not_verifiable_locally(requested_urls: List[str]) -> None:
+    """Opaque tokens, untrusted issuers and unknown keys are left to the issuer."""
+    verifier = get_verifier()
+    assert verifier.verify("opaque-token") is None
+    assert verifier.verify(encode(iss="https://other.example.org")) is None
+    assert requested_urls == []
+    assert verifier.verify(encode(kid="key2")) is None
+
+
+def test_failed_first_fetch(monkeypatch: pytest.MonkeyPatch) -> None:
+    """After a failed first fetch, tokens are not verified locally and the issuer
+    is not contacted again before the minimum refresh interval.
+    """
+    urls = []
+
+    def get(url: str, timeout: float) -> MockResponse:
+        urls.append(url)
+        raise requests.ConnectionError("unreachable")
+
+    monkeypatch.setattr(jwks.requests, "get", get)
+    verifier = get_verifier()
+    for _ in range(3):
+        assert verifier.verify(encode()) is None
+    assert urls == [f"{ISSUER}/.well-known/openid-configuration"]
+
+
+def test_concurrent_first_fetch(
+    requested_urls: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Concurrent first verifications share the same fetch."""
+    verifier = get_verifier()
+    get = jwks.requests.get
+
+    def slow_get(url: str, timeout: float) -> MockResponse:
+        sleep(0.05)
+        return get(url, timeout)
+
+    monkeypatch.setattr(jwks.requests, "get", slow_get)
+    results = []
+    threads = [
+        Thread(target=lambda: results.append(verifier.verify(encode())))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(i is not None for i in results) and len(results) == 4
+    assert len(requested_urls) == 2
@@ -5,9 +5,11 @@ import jwt
 import pytest
 from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi.testclient import TestClient
+from flaat import ENV_VAR_AUTHN_OVERRIDE, ENV_VAR_AUTHZ_OVERRIDE
 from neomodel import clear_neo4j_database, db
 
 from app.main import app
+from app.response_cache import response_cache
 
 
 def refactor(string: str) -> str:
@@ -24,9 +26,18 @@ pytest.register_assert_rewrite("tests.utils")
 
 @pytest.fixture
 def setup_and_teardown_db() -> Generator:
+    # Wiping the database bypasses the CRUD layer: invalidate the cached responses.
     clear_neo4j_database(db)
+    response_cache.bump()
     yield
     clear_neo4j_database(db)
+    response_cache.bump()
+
+
+@pytest.fixture
+def no_response_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Disable the response cache, for fixtures writing the database directly."""
+    monkeypatch.setattr(response_cache, "max_size", 0)
 
 
 # API specific fixtures
@@ -81,14 +92,25 @@ def client(setup_and_teardown_db: Generator) -> Generator:
         yield c
 
 
+@pytest.fixture
+def skip_token_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Accept the mock tokens, not issued by a trusted identity provider, as flaat
+    does when these variables are set.
+    """
+    monkeypatch.setenv(ENV_VAR_AUTHN_OVERRIDE, "YES")
+    monkeypatch.setenv(ENV_VAR_AUTHZ_OVERRIDE, "YES")
+
+
 @pytest.fixture()
-def api_client_read_only(client: TestClient) -> TestClient:
+def api_client_read_only(client: TestClient, skip_token_validation: None) -> TestClient:
     client.headers = {"authorization": f"Bearer {get_mock_token()}"}
     yield client
 
 
 @pytest.fixture()
-def api_client_read_write(client: TestClient) -> TestClient:
+def api_client_read_write(
+    client: TestClient, skip_token_validation: None
+) -> TestClient:
     client.headers = {
         "authorization": f"Bearer {get_mock_token()}",
         "accept": "application/json",
@@ -4,6 +4,7 @@ from uuid import uuid4
 from app.flavor.crud import flavor
 from app.flavor.models import Flavor
 from app.project.crud import project
+from app.query import encode_cursor
 from app.service.crud import compute_service
 from app.service.models import ComputeService
 from tests.utils.flavor import (
@@ -138,6 +139,127 @@ def test_get_items_with_skip(
     assert len(stored_items) == 1
 
 
+def test_get_paginated_items(
+    db_public_flavor: Flavor, db_private_flavor: Flavor
+) -> None:
+    """Test the 'page' and 'size' attributes, merged with 'skip' and 'limit', in GET
+    operations.
+    """
+    sorted_items = sorted(flavor.get_multi(), key=lambda x: x.uid)
+
+    stored_items = flavor.get_multi(sort="uid", page=0, size=1)
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == sorted_items[0].uid
+
+    stored_items = flavor.get_multi(sort="uid", page=1, size=1)
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == sorted_items[1].uid
+
+    stored_items = flavor.get_multi(sort="uid", page=2, size=1)
+    assert len(stored_items) == 0
+
+    stored_items = flavor.get_multi(sort="uid", skip=1, page=0, size=2)
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == sorted_items[1].uid
+
+    stored_items = flavor.get_multi(sort="uid", limit=1, page=1, size=1)
+    assert len(stored_items) == 0
+
+
+def test_get_items_with_cursor(
+    db_public_flavor: Flavor, db_private_flavor: Flavor
+) -> None:
+    """Test the 'cursor' attribute in GET operations.
+
+    Items following the cursor are returned sorted on the cursor's sort rule.
+    """
+    sorted_items = sorted(flavor.get_multi(), key=lambda x: x.name, reverse=True)
+
+    stored_items = flavor.get_multi(sort="-name", size=1, cursor="")
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == sorted_items[0].uid
+
+    cursor = encode_cursor(
+        sort="-name", values=[sorted_items[0].name, sorted_items[0].uid]
+    )
+    stored_items = flavor.get_multi(size=1, cursor=cursor)
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == sorted_items[1].uid
+
+    cursor = encode_cursor(
+        sort="-name", values=[sorted_items[1].name, sorted_items[1].uid]
+    )
+    stored_items = flavor.get_multi(size=1, cursor=cursor)
+    assert len(stored_items) == 0
+
+
+def test_get_items_fields_with_cursor(
+    db_public_flavor: Flavor, db_private_flavor: Flavor
+) -> None:
+    """Retrieve only some attributes of multiple Flavors using keyset pagination.
+
+    The next cursor points to the last returned item even if the sort attribute is
+    not requested.
+    """
+    sorted_items = sorted(flavor.get_multi(), key=lambda x: x.name, reverse=True)
+
+    items, cursor = flavor.get_multi_fields_with_cursor(
+        auth=True, fields="vcpus", sort="-name", size=1, cursor=""
+    )
+    assert items == [{"uid": sorted_items[0].uid, "vcpus": sorted_items[0].vcpus}]
+    assert cursor == encode_cursor(
+        sort="-name", values=[sorted_items[0].name, sorted_items[0].uid]
+    )
+
+    items, cursor = flavor.get_multi_fields_with_cursor(
+        auth=True, fields="name", size=1, cursor=cursor
+    )
+    assert items == [{"uid": sorted_items[1].uid, "name": sorted_items[1].name}]
+    assert cursor is not None
+
+    items, cursor = flavor.get_multi_fields_with_cursor(
+        auth=True, fields="name", size=1, cursor=cursor
+    )
+    assert items == []
+    assert cursor is None
+
+    _, cursor = flavor.get_multi_fields_with_cursor(
+        auth=True, fields="name", sort="-name", size=1
+    )
+    assert cursor is None
+
+
+def test_stream_items(db_public_flavor: Flavor, db_private_flavor: Flavor) -> None:
+    """Retrieve Flavors in batches."""
+    batches = list(flavor.stream_multi(batch_size=1, sort="uid"))
+    assert len(batches) == 2
+    assert [i[0].uid for i in batches] == [i.uid for i in flavor.get_multi(sort="uid")]
+
+    batches = list(flavor.stream_multi(limit=0))
+    assert len(batches) == 0
+
+
+def test_get_items_fields(db_public_flavor: Flavor, db_private_flavor: Flavor) -> None:
+    """Retrieve only some attributes of multiple Flavors.
+
+    The uid is always returned; unknown attributes and relationships are ignored.
+    """
+    stored_items = flavor.get_multi_fields(
+        auth=True, fields="name,vcpus,services,unknown", sort="uid"
+    )
+    sorted_items = sorted([db_public_flavor, db_private_flavor], key=lambda x: x.uid)
+    assert stored_items == [
+        {"uid": i.uid, "name": i.name, "vcpus": i.vcpus} for i in sorted_items
+    ]
+
+
+def test_count_items(db_public_flavor: Flavor, db_private_flavor: Flavor) -> None:
+    """Count Flavors, with and without filters."""
+    assert flavor.count() == 2
+    assert flavor.count(uid=db_public_flavor.uid) == 1
+    assert flavor.count(uid=uuid4().hex) == 0
+
+
 def test_patch_item(db_private_flavor: Flavor) -> None:
     """Update the attributes of an existing Flavor, without updating its
     relationships.
@@ -3,6 +3,8 @@ from uuid import uuid4
 
 from app.location.crud import location
 from app.location.models import Location
+from app.location.schemas import LocationCreate
+from app.query import GeoQuery
 from app.region.crud import region
 from app.region.models import Region
 from tests.utils.location import (
@@ -119,6 +121,86 @@ def test_get_items_with_skip(db_location: Location, db_location2: Location) -> N
     assert len(stored_items) == 1
 
 
+def test_get_items_fields(db_location: Location, db_location2: Location) -> None:
+    """Retrieve only some attributes of multiple Locations.
+
+    Only stored attributes of the read schema of the user access level are returned:
+    the internal coordinates point, the country code, computed and not public, the
+    relationships and unknown attributes are ignored.
+    """
+    fields = "site,latitude,coordinates,country_code,regions,unknown"
+    sorted_items = sorted([db_location, db_location2], key=lambda x: x.uid)
+
+    for auth in (True, False):
+        stored_items = location.get_multi_fields(auth=auth, fields=fields, sort="uid")
+        assert stored_items == [
+            {"uid": i.uid, "site": i.site, "latitude": i.latitude} for i in sorted_items
+        ]
+
+    stored_items = location.choose_out_fields(
+        items=[db_location], auth=False, fields=fields
+    )
+    assert stored_items == [
+        {
+            "uid": db_location.uid,
+            "site": db_location.site,
+            "latitude": db_location.latitude,
+        }
+    ]
+
+
+def test_coordinates(db_region: Region) -> None:
+    """The coordinates point follows latitude and longitude."""
+    item_in = create_random_location()
+    item = location.create(obj_in=item_in, region=db_region)
+    item.refresh()
+    assert item.coordinates.latitude == item_in.latitude
+    assert item.coordinates.longitude == item_in.longitude
+
+    patch_in = create_random_location_patch()
+    item = location.update(db_obj=item, obj_in=patch_in)
+    item.refresh()
+    assert item.coordinates.latitude == patch_in.latitude
+    assert item.coordinates.longitude == patch_in.longitude
+
+    item_in = create_random_location(default=True)
+    item = location.create(obj_in=item_in, region=db_region)
+    assert item.coordinates is None
+
+
+def test_get_items_near(db_region: Region) -> None:
+    """Filter and sort locations by their distance from a point."""
+    bari = location.create(
+        obj_in=LocationCreate(
+            site="bari", country="Italy", latitude=41.12, longitude=16.87
+        ),
+        region=db_region,
+    )
+    rome = location.create(
+        obj_in=LocationCreate(
+            site="rome", country="Italy", latitude=41.9, longitude=12.5
+        ),
+        region=db_region,
+    )
+
+    filters, sort = location.get_geo_filters(
+        geo=GeoQuery(near="41.12,16.87", radius_km=100)
+    )
+    stored_items = location.get_multi(cypher_filters=filters, cypher_sort=sort)
+    assert [i.uid for i in stored_items] == [bari.uid]
+    assert location.count(cypher_filters=filters) == 1
+
+    filters, sort = location.get_geo_filters(
+        geo=GeoQuery(near="41.9,12.5", sort_by_distance=True)
+    )
+    stored_items = location.get_multi(cypher_filters=filters, cypher_sort=sort)
+    assert [i.uid for i in stored_items] == [rome.uid, bari.uid]
+
+    filters, sort = location.get_geo_filters(geo=GeoQuery(bbox="41,16,42,17"))
+    stored_items = location.get_multi(cypher_filters=filters, cypher_sort=sort)
+    assert [i.uid for i in stored_items] == [bari.uid]
+
+
 def test_patch_item(db_location: Location) -> None:
     """Update the attributes of an existing Location, without updating its
     relationships.
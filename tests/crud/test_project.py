@@ -1,10 +1,14 @@
 from typing import Generator
 from uuid import uuid4
 
+from app.flavor.models import Flavor
 from app.project.crud import project
 from app.project.models import Project
+from app.project.schemas_extended import ProjectReadExtended
+from app.projection import read_extended
 from app.provider.crud import provider
 from app.provider.models import Provider
+from app.query import encode_cursor
 from app.quota.crud import block_storage_quota, compute_quota
 from app.quota.models import ComputeQuota
 from app.sla.crud import sla
@@ -90,6 +94,79 @@ def test_get_items_with_skip(db_project: Project, db_project2: Project) -> None:
     assert len(stored_items) == 1
 
 
+def test_get_paginated_items(db_project: Project, db_project2: Project) -> None:
+    """Test 'sort', 'skip', 'limit', 'page' and 'size', merged in a single window,
+    in GET operations.
+    """
+    sorted_items = sorted([db_project, db_project2], key=lambda x: x.name)
+
+    stored_items = project.get_multi(sort="-name", skip=1, limit=1)
+    assert [i.uid for i in stored_items] == [sorted_items[0].uid]
+
+    stored_items = project.get_multi(sort="name", page=1, size=1)
+    assert [i.uid for i in stored_items] == [sorted_items[1].uid]
+
+    stored_items = project.get_multi(sort="name", skip=1, page=1, size=1)
+    assert len(stored_items) == 0
+
+
+def test_get_items_with_cursor(db_project: Project, db_project2: Project) -> None:
+    """Test the 'cursor' attribute, with a descending sort rule, in GET operations.
+
+    The sort rule stored in the cursor takes precedence over the given one.
+    """
+    sorted_items = sorted([db_project, db_project2], key=lambda x: x.name)
+
+    stored_items = project.get_multi(sort="-name", size=1, cursor="")
+    assert [i.uid for i in stored_items] == [sorted_items[1].uid]
+
+    cursor = encode_cursor(
+        sort="-name", values=[sorted_items[1].name, sorted_items[1].uid]
+    )
+    stored_items = project.get_multi(sort="name", size=1, cursor=cursor)
+    assert [i.uid for i in stored_items] == [sorted_items[0].uid]
+
+    cursor = encode_cursor(
+        sort="-name", values=[sorted_items[0].name, sorted_items[0].uid]
+    )
+    stored_items = project.get_multi(size=1, cursor=cursor)
+    assert len(stored_items) == 0
+
+
+def test_read_extended_items_filtered_by_region(
+    db_project_with_single_compute_quota: Project,
+) -> None:
+    """Read an extended Project keeping only the quotas on the given region."""
+    db_quota = db_project_with_single_compute_quota.quotas.single()
+    db_region = db_quota.service.single().region.single()
+    items = project.choose_out_schema(
+        items=[db_project_with_single_compute_quota],
+        auth=True,
+        short=False,
+        with_conn=True,
+    )
+    assert [i.uid for i in items[0].quotas] == [db_quota.uid]
+
+    items = project.choose_out_schema(
+        items=[db_project_with_single_compute_quota],
+        auth=True,
+        short=False,
+        with_conn=True,
+        region_name=db_region.name,
+    )
+    assert [i.uid for i in items[0].quotas] == [db_quota.uid]
+
+    items = project.choose_out_schema(
+        items=[db_project_with_single_compute_quota],
+        auth=True,
+        short=False,
+        with_conn=True,
+        region_name=f"not-{db_region.name}",
+    )
+    assert items[0].uid == db_project_with_single_compute_quota.uid
+    assert len(items[0].quotas) == 0
+
+
 def test_patch_item(db_project: Project) -> None:
     """Update the attributes of an existing Project, without updating its
     relationships.
@@ -282,3 +359,22 @@ def test_delete_item_with_compute_quotas(
     assert not project.get(uid=db_project_with_single_compute_quota.uid)
     assert provider.get(uid=db_provider.uid)
     assert not compute_quota.get(uid=db_quota.uid)
+
+
+def test_read_extended_items_with_private_flavors(
+    db_private_flavor: Flavor,
+) -> None:
+    """Read an extended Project with its private flavors.
+
+    The generic projection, without the lists computing them, falls back to the
+    schema from_orm.
+    """
+    db_project = db_private_flavor.projects.single()
+    for auth in [True, False]:
+        items = project.choose_out_schema(
+            items=[db_project], auth=auth, short=False, with_conn=True
+        )
+        assert [i.uid for i in items[0].flavors] == [db_private_flavor.uid]
+
+    items = read_extended(items=[db_project], model=Project, schema=ProjectReadExtended)
+    assert [i.uid for i in items[0].flavors] == [db_private_flavor.uid]
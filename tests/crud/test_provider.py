@@ -1,17 +1,34 @@
 from typing import Generator
 from uuid import uuid4
 
+from app.flavor.crud import flavor
 from app.identity_provider.crud import identity_provider
+from app.location.crud import location
 from app.project.crud import project
+from app.project.schemas import ProjectUpdate
+from app.projection import prefetch_relations
 from app.provider.crud import provider
 from app.provider.models import Provider
+from app.provider.schemas_extended import RegionCreateExtended
+from app.provider.snapshot import (
+    delete_snapshots,
+    get_affected_provider_uids,
+    get_snapshot,
+)
+from app.query import GeoQuery
 from app.region.crud import region
+from tests.utils.compute_service import create_random_compute_service
 from tests.utils.provider import (
     create_random_provider,
+    create_random_provider_located_at,
     create_random_provider_patch,
     validate_create_provider_attrs,
+    validate_provider_snapshot,
 )
 
+# Path from a provider to its locations, as used by the provider list endpoint.
+LOCATION_PATH = "({node})-[:DIVIDED_INTO]->()-[:LOCATED_AT]->(location)"
+
 
 def test_create_item(setup_and_teardown_db: Generator) -> None:
     """Create a Provider."""
@@ -70,6 +87,29 @@ def test_create_item_with_everything(setup_and_teardown_db: Generator) -> None:
     validate_create_provider_attrs(obj_in=item_in, db_item=item)
 
 
+def test_create_item_with_flavor_shared_between_regions(
+    setup_and_teardown_db: Generator,
+) -> None:
+    """Create a Provider whose regions share a flavor.
+
+    The flavor is created once and connected to both services.
+    """
+    service_in = create_random_compute_service(with_flavors=True)
+    service2_in = create_random_compute_service()
+    service2_in.flavors = service_in.flavors
+    item_in = create_random_provider()
+    item_in.regions = [
+        RegionCreateExtended(name="region1", compute_services=[service_in]),
+        RegionCreateExtended(name="region2", compute_services=[service2_in]),
+    ]
+    item = provider.create(obj_in=item_in)
+    validate_create_provider_attrs(obj_in=item_in, db_item=item)
+
+    db_flavors = flavor.get_multi(uuid=service_in.flavors[0].uuid)
+    assert len(db_flavors) == 1
+    assert len(db_flavors[0].services) == 2
+
+
 def test_get_item(db_provider: Provider) -> None:
     """Retrieve a Provider from its UID."""
     item = provider.get(uid=db_provider.uid)
@@ -129,6 +169,97 @@ def test_get_items_with_skip(db_provider: Provider, db_provider2: Provider) -> N
     assert len(stored_items) == 1
 
 
+def test_read_extended_items(
+    db_provider_with_single_idp: Provider, db_provider_with_single_region: Provider
+) -> None:
+    """Read Providers with their relationships.
+
+    The single query projection returns the same data read through the ORM.
+    """
+    items = [db_provider_with_single_idp, db_provider_with_single_region]
+    read_items = provider.choose_out_schema(
+        items=items, auth=True, short=False, with_conn=True
+    )
+    assert len(read_items) == len(items)
+    for item, read_item in zip(items, read_items):
+        assert read_item == provider.read_extended_schema.from_orm(item)
+
+
+def test_read_items_with_prefetched_relations(
+    db_provider_with_single_idp: Provider, db_provider_with_single_region: Provider
+) -> None:
+    """Read Providers after prefetching their relationships for the whole page.
+
+    Serialized data match the ones read lazily through the ORM.
+    """
+    items = [db_provider_with_single_idp, db_provider_with_single_region]
+    prefetch_relations(
+        items=items, model=Provider, schema=provider.read_extended_schema
+    )
+    for item in items:
+        assert provider.read_extended_schema.from_orm(
+            item
+        ) == provider.read_extended_schema.from_orm(provider.get(uid=item.uid))
+
+
+def test_get_paginated_items(setup_and_teardown_db: Generator) -> None:
+    """Test 'sort', 'skip', 'limit', 'page' and 'size', merged in a single window,
+    in GET operations.
+    """
+    db_items = [provider.create(obj_in=create_random_provider()) for _ in range(3)]
+    sorted_items = sorted(db_items, key=lambda x: x.name, reverse=True)
+
+    stored_items = provider.get_multi(sort="-name", skip=1, limit=1)
+    assert [i.uid for i in stored_items] == [sorted_items[1].uid]
+
+    stored_items = provider.get_multi(sort="-name", page=1, size=2)
+    assert [i.uid for i in stored_items] == [sorted_items[2].uid]
+
+    stored_items = provider.get_multi(sort="-name", skip=1, page=0, size=1)
+    assert [i.uid for i in stored_items] == [sorted_items[1].uid]
+
+
+def test_get_items_sorted_by_distance(setup_and_teardown_db: Generator) -> None:
+    """Paginate Providers sorted by the distance of their locations.
+
+    The Cypher sort is pushed down with the window; the Cypher filters apply to both
+    the items and their count.
+    """
+    bari = provider.create(
+        obj_in=create_random_provider_located_at(coordinates=[(41.12, 16.87)])
+    )
+    rome = provider.create(
+        obj_in=create_random_provider_located_at(coordinates=[(41.9, 12.5)])
+    )
+    milan = provider.create(
+        obj_in=create_random_provider_located_at(coordinates=[(45.46, 9.19)])
+    )
+
+    filters, sort = location.get_geo_filters(
+        geo=GeoQuery(near="41.9,12.5", sort_by_distance=True), path=LOCATION_PATH
+    )
+    stored_items = provider.get_multi(cypher_filters=filters, cypher_sort=sort)
+    assert [i.uid for i in stored_items] == [rome.uid, bari.uid, milan.uid]
+
+    stored_items = provider.get_multi(
+        cypher_filters=filters, cypher_sort=sort, sort="name", skip=1, limit=1
+    )
+    assert [i.uid for i in stored_items] == [bari.uid]
+
+    stored_items = provider.get_multi(
+        cypher_filters=filters, cypher_sort=sort, page=1, size=2
+    )
+    assert [i.uid for i in stored_items] == [milan.uid]
+
+    filters, sort = location.get_geo_filters(
+        geo=GeoQuery(near="41.9,12.5", radius_km=400, sort_by_distance=True),
+        path=LOCATION_PATH,
+    )
+    stored_items = provider.get_multi(cypher_filters=filters, cypher_sort=sort)
+    assert [i.uid for i in stored_items] == [rome.uid, bari.uid]
+    assert provider.count(cypher_filters=filters) == 2
+
+
 def test_patch_item(db_provider: Provider) -> None:
     """Update the attributes of an existing Provider, without updating its
     relationships.
@@ -371,6 +502,24 @@ def test_force_update_without_changing_regions(
     assert item.regions.single() == db_region
 
 
+def test_sync_sends_only_changes(setup_and_teardown_db: Generator) -> None:
+    """Resend a whole Provider, as done by the population scripts.
+
+    When nothing changed, the summary is empty and nothing is written. Otherwise only
+    the changed items are written.
+    """
+    item_in = create_random_provider(
+        with_projects=True, with_identity_providers=True, with_regions=True
+    )
+    db_item = provider.create(obj_in=item_in)
+    assert provider.sync(db_obj=db_item, obj_in=item_in) == {}
+    assert provider.update(db_obj=db_item, obj_in=item_in, force=True) is None
+
+    item_in.regions[0].description = uuid4().hex
+    assert provider.sync(db_obj=db_item, obj_in=item_in) == {"updated": {"Region": 1}}
+    validate_create_provider_attrs(obj_in=item_in, db_item=db_item)
+
+
 def test_delete_item(db_provider: Provider) -> None:
     """Delete an existing Provider."""
     assert provider.remove(db_obj=db_provider)
@@ -421,3 +570,95 @@ def test_delete_item_with_shared_idp(db_provider_with_shared_idp: Provider) -> N
     assert provider.remove(db_obj=db_provider_with_shared_idp)
     assert not provider.get(uid=db_provider_with_shared_idp.uid)
     assert identity_provider.get(uid=db_idp.uid)
+
+
+def test_delete_item_counts(setup_and_teardown_db: Generator) -> None:
+    """Delete an existing Provider with its whole subgraph.
+
+    The cascade delete reports the number of deleted nodes per label.
+    """
+    item_in = create_random_provider(
+        with_projects=True, with_identity_providers=True, with_regions=True
+    )
+    db_item = provider.create(obj_in=item_in)
+    counts = provider.remove_cascade(db_obj=db_item)
+    assert counts["Provider"] == 1
+    assert counts["Project"] == len(item_in.projects)
+    assert counts["Region"] == len(item_in.regions)
+    assert counts["IdentityProvider"] == len(item_in.identity_providers)
+    assert counts["ComputeService"] == len(item_in.regions[0].compute_services)
+    assert not provider.get(uid=db_item.uid)
+
+
+def test_create_item_snapshot(setup_and_teardown_db: Generator) -> None:
+    """Create a Provider and store its serialized extended reads."""
+    item_in = create_random_provider(
+        with_projects=True, with_identity_providers=True, with_regions=True
+    )
+    db_item = provider.create(obj_in=item_in)
+    validate_provider_snapshot(db_item=db_item)
+
+
+def test_patch_item_snapshot(db_provider: Provider) -> None:
+    """Update the attributes of an existing Provider and rebuild its snapshot."""
+    provider.rebuild_snapshots()
+    patch_in = create_random_provider_patch()
+    item = provider.update(db_obj=db_provider, obj_in=patch_in)
+    validate_provider_snapshot(db_item=item)
+    assert patch_in.description in get_snapshot(uid=item.uid, auth=True)
+
+
+def test_force_update_item_shared_snapshot(
+    db_provider_with_shared_idp: Provider,
+) -> None:
+    """Force the update of a Provider adding user groups to a shared identity
+    provider.
+
+    The snapshots of the providers sharing that identity provider are rebuilt.
+    """
+    provider.rebuild_snapshots()
+    db_idp = db_provider_with_shared_idp.identity_providers.single()
+    item_in = create_random_provider(with_projects=True, with_identity_providers=True)
+    item_in.identity_providers[0].endpoint = db_idp.endpoint
+    item = provider.update(
+        db_obj=db_provider_with_shared_idp, obj_in=item_in, force=True
+    )
+    assert item
+    for db_item in db_idp.providers.all():
+        validate_provider_snapshot(db_item=db_item)
+
+
+def test_delete_item_snapshot(db_provider_with_shared_idp: Provider) -> None:
+    """Delete an existing Provider and its snapshot.
+
+    The snapshots of the providers sharing its identity providers are rebuilt.
+    """
+    provider.rebuild_snapshots()
+    db_idp = db_provider_with_shared_idp.identity_providers.single()
+    others = [
+        i for i in db_idp.providers.all() if i.uid != db_provider_with_shared_idp.uid
+    ]
+    assert provider.remove(db_obj=db_provider_with_shared_idp)
+    assert get_snapshot(uid=db_provider_with_shared_idp.uid, auth=True) is None
+    for other in others:
+        validate_provider_snapshot(db_item=other)
+
+
+def test_update_related_item_snapshot(setup_and_teardown_db: Generator) -> None:
+    """Update an item of the Provider extended read and rebuild the snapshot."""
+    db_item = provider.create(obj_in=create_random_provider(with_projects=True))
+    db_project = db_item.projects.single()
+    assert get_affected_provider_uids(node=db_project) == [db_item.uid]
+    assert project.update(
+        db_obj=db_project, obj_in=ProjectUpdate(description=uuid4().hex)
+    )
+    validate_provider_snapshot(db_item=db_item)
+
+
+def test_rebuild_snapshots(setup_and_teardown_db: Generator) -> None:
+    """Delete all the snapshots and build them again."""
+    db_item = provider.create(obj_in=create_random_provider(with_projects=True))
+    delete_snapshots()
+    assert get_snapshot(uid=db_item.uid, auth=True) is None
+    assert provider.rebuild_snapshots() == 1
+    validate_provider_snapshot(db_item=db_item)
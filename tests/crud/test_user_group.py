@@ -117,6 +117,28 @@ def test_get_items_with_skip(
     assert len(stored_items) == 1
 
 
+def test_get_items_with_relationship_filters(db_user_group: UserGroup) -> None:
+    """Retrieve User Groups filtering on related Identity Provider and Provider."""
+    db_idp = db_user_group.identity_provider.single()
+    db_provider = db_user_group.slas.single().projects.single().provider.single()
+
+    cypher_filters = user_group.get_relationship_filters(
+        idp_endpoint=db_idp.endpoint,
+        provider_name=db_provider.name,
+        provider_type=db_provider.type,
+    )
+    stored_items = user_group.get_multi(cypher_filters=cypher_filters)
+    assert len(stored_items) == 1
+    assert stored_items[0].uid == db_user_group.uid
+    assert user_group.count(cypher_filters=cypher_filters) == 1
+
+    cypher_filters = user_group.get_relationship_filters(
+        provider_name=db_provider.name + "-other"
+    )
+    assert len(user_group.get_multi(cypher_filters=cypher_filters)) == 0
+    assert user_group.count(cypher_filters=cypher_filters) == 0
+
+
 def test_patch_item(db_user_group: UserGroup) -> None:
     """Update the attributes of an existing User Group.
 
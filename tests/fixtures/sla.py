@@ -24,7 +24,9 @@ def db_sla3(db_user_group3: UserGroup) -> SLA:
 
 
 @pytest.fixture
-def db_sla_with_multiple_projects(db_sla: SLA, db_project2: Project) -> SLA:
+def db_sla_with_multiple_projects(
+    db_sla: SLA, db_project2: Project, no_response_cache: None
+) -> SLA:
     db_sla.projects.connect(db_project2)
     assert len(db_sla.projects) == 2
     assert (
@@ -0,0 +1,113 @@
+from threading import Lock, Thread
+from typing import Any, List
+from weakref import WeakSet
+
+import pytest
+from neomodel import config, db
+
+from app import pool
+from app.config import NEOMODEL_POOL_OPTIONS, Settings
+from app.pool import WaitHistogram, get_pool_stats, instrument_driver
+
+
+class FakeConnection:
+    def __init__(self, *, in_use: bool) -> None:
+        self.in_use = in_use
+
+
+class FakePoolConfig:
+    max_connection_pool_size = 10
+
+
+class FakePool:
+    """Pool exposing the attributes read by get_pool_stats."""
+
+    def __init__(self, *, in_use: int, idle: int) -> None:
+        self.pool_config = FakePoolConfig()
+        self.lock = Lock()
+        self.connections = {
+            "address": [FakeConnection(in_use=True) for _ in range(in_use)]
+            + [FakeConnection(in_use=False) for _ in range(idle)]
+        }
+        self.acquired = 0
+
+    def acquire(self) -> str:
+        self.acquired += 1
+        return "connection"
+
+
+class FakeDriver:
+    def __init__(self, pool: FakePool) -> None:
+        self._pool = pool
+
+
+@pytest.fixture
+def fake_pools(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Track only the pools of the test and measure waits from scratch."""
+    monkeypatch.setattr(pool, "_pools", WeakSet())
+    monkeypatch.setattr(pool, "acquisition_wait", WaitHistogram())
+
+
+def test_shared_driver() -> None:
+    """Threads connecting to the same database share the driver of the process."""
+    drivers: List[Any] = []
+
+    def connect() -> None:
+        db.set_connection(config.DATABASE_URL)
+        drivers.append(db.driver)
+
+    threads = [Thread(target=connect) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(drivers) == 3
+    assert all(i is drivers[0] for i in drivers)
+
+
+def test_wait_histogram() -> None:
+    """Bucket counts are cumulative, as in Prometheus histograms."""
+    histogram = WaitHistogram(buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.01, 0.05, 2.0):
+        histogram.observe(seconds)
+    buckets, count, total = histogram.get_cumulative_counts()
+    assert buckets == {"0.01": 2, "0.1": 3, "1.0": 3, "+Inf": 4}
+    assert count == 4
+    assert total == pytest.approx(2.065)
+
+
+def test_get_pool_stats(fake_pools: None) -> None:
+    """Connections of every tracked pool are summed; waits are measured on each
+    acquisition.
+    """
+    pools = [FakePool(in_use=2, idle=1), FakePool(in_use=0, idle=3)]
+    for i in pools:
+        instrument_driver(FakeDriver(i))
+        instrument_driver(FakeDriver(i))
+    assert pools[0].acquire() == "connection"
+    assert pools[0].acquired == 1
+
+    stats = get_pool_stats()
+    assert stats.drivers == 2
+    assert stats.max_size == 10
+    assert (stats.in_use, stats.idle) == (2, 4)
+    assert stats.acquisition_wait.count == 1
+    assert stats.acquisition_wait.buckets["+Inf"] == 1
+
+
+def test_pool_settings_forwarded_to_neomodel(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pool settings are forwarded to the neomodel options used by the driver."""
+    monkeypatch.setattr(config, "DATABASE_URL", config.DATABASE_URL)
+    for option in NEOMODEL_POOL_OPTIONS.values():
+        monkeypatch.setattr(config, option, getattr(config, option, None))
+
+    Settings(
+        NEO4J_MAX_CONNECTION_POOL_SIZE=7,
+        NEO4J_CONNECTION_ACQUISITION_TIMEOUT=1.5,
+        NEO4J_MAX_CONNECTION_LIFETIME=30,
+        NEO4J_KEEP_ALIVE=False,
+    )
+    assert config.MAX_CONNECTION_POOL_SIZE == 7
+    assert config.CONNECTION_ACQUISITION_TIMEOUT == 1.5
+    assert config.MAX_CONNECTION_LIFETIME == 30
+    assert config.KEEP_ALIVE is False
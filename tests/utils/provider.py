@@ -1,6 +1,10 @@
+import json
 from random import choice
-from typing import Union
+from typing import List, Tuple, Union
 
+from fastapi.encoders import jsonable_encoder
+
+from app.provider.crud import provider
 from app.provider.enum import ProviderStatus, ProviderType
 from app.provider.models import Provider
 from app.provider.schemas import (
@@ -15,10 +19,12 @@ from app.provider.schemas_extended import (
     ProviderReadExtended,
     ProviderReadExtendedPublic,
 )
+from app.provider.snapshot import get_snapshot
 from tests.utils.identity_provider import (
     create_random_identity_provider,
     validate_create_identity_provider_attrs,
 )
+from tests.utils.location import create_random_location
 from tests.utils.project import (
     create_random_project,
     validate_create_project_attrs,
@@ -68,6 +74,20 @@ def create_random_provider(
     return ProviderCreateExtended(name=name, type=type, **kwargs)
 
 
+def create_random_provider_located_at(
+    *, coordinates: List[Tuple[float, float]]
+) -> ProviderCreateExtended:
+    """Provider with a region located at each of the given (lat, lon) points."""
+    item_in = create_random_provider()
+    for latitude, longitude in coordinates:
+        region_in = create_random_region()
+        region_in.location = create_random_location()
+        region_in.location.latitude = latitude
+        region_in.location.longitude = longitude
+        item_in.regions.append(region_in)
+    return item_in
+
+
 def create_random_provider_patch(*, default: bool = False) -> ProviderUpdate:
     if default:
         return ProviderUpdate()
@@ -192,3 +212,13 @@ def validate_read_extended_public_provider_attrs(
     assert db_item.uid == obj_out.uid
     validate_public_attrs(obj_in=obj_out, db_item=db_item)
     validate_rels(obj_out=obj_out, db_item=db_item)
+
+
+def validate_provider_snapshot(*, db_item: Provider) -> None:
+    """Check the stored snapshots match the extended reads of the provider."""
+    for auth in [True, False]:
+        items = provider.choose_out_schema(
+            items=[db_item], auth=auth, short=False, with_conn=True
+        )
+        snapshot = get_snapshot(uid=db_item.uid, auth=auth)
+        assert json.loads(snapshot) == jsonable_encoder(items[0])